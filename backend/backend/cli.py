@@ -0,0 +1,98 @@
+"""Command line tools of the backend"""
+
+import argparse
+import os
+import sys
+from typing import Optional
+from backend.dao.factory import create_dao, create_mysql_config
+from backend.services.bulk_import import ImportFormat, import_tasks
+
+
+def import_file(argv: Optional[list[str]] = None):
+    """Launched with `poetry run import-tasks FILE`.
+
+    Add the tasks of a CSV or NDJSON file to the database chosen by the environment variables,
+    as the backend does. See TaskImporter for the format of the files.
+
+    The tasks are written to the database directly: the caches of a running backend, which
+    see only the mutations made through it, keep serving the previous responses. Use
+    `POST /import` to import into a running backend.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Import tasks from a CSV or NDJSON file",
+        epilog="The tasks are written to the database directly. A running backend with "
+        "its response or statistics cache enabled does not see them until it is "
+        "restarted: use POST /import to import into a running backend instead.",
+    )
+    parser.add_argument("file", help="File to be imported, '-' for the standard input")
+    parser.add_argument(
+        "--format",
+        choices=[import_format.value for import_format in ImportFormat],
+        default=None,
+        help="Format of the file. By default, CSV for .csv files, NDJSON otherwise",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of tasks added in each transaction",
+    )
+    args = parser.parse_args(argv)
+
+    if args.format is not None:
+        import_format = ImportFormat(args.format)
+    elif args.file.endswith(".csv"):
+        import_format = ImportFormat.CSV
+    else:
+        import_format = ImportFormat.NDJSON
+
+    dao, _ = create_dao()
+    if args.file == "-":
+        report = import_tasks(dao, sys.stdin, import_format, args.batch_size)
+    else:
+        with open(args.file, encoding="utf-8-sig", newline="") as file:
+            report = import_tasks(dao, file, import_format, args.batch_size)
+
+    print(
+        f"Imported {report.imported} tasks in {report.seconds:.1f} s "
+        f"({report.tasks_per_second:.0f} tasks/s), rejected {report.rejected} rows"
+    )
+    for row in report.rejected_rows:
+        print(f"  line {row.line}: {row.error}")
+    if report.rejected > len(report.rejected_rows):
+        print(f"  ... and {report.rejected - len(report.rejected_rows)} more")
+
+
+def migrate(argv: Optional[list[str]] = None):
+    """Launched with `poetry run migrate`, once before starting the backend.
+
+    Bring the schema of the MySQL database chosen by the environment variables to the version
+    expected by the backend. The SQLite and memory backends have no migrations.
+    """
+
+    parser = argparse.ArgumentParser(description="Apply the migrations of the schema")
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Only print the version of the schema, without changing it",
+    )
+    args = parser.parse_args(argv)
+
+    if os.environ.get("DAO_BACKEND", "mysql") != "mysql":
+        print("Only the MySQL backend has migrations")
+        return
+
+    # Imported here so that the other backends do not need the MySQL connector
+    # pylint: disable=import-outside-toplevel
+    from backend.dao.mysql_dao import Mysql
+    from backend.dao.mysql_migrations import SCHEMA_VERSION
+
+    dao = Mysql(create_mysql_config())
+    try:
+        if not args.status:
+            for migration in dao.migrate():
+                print(f"Applied migration {migration.version}: {migration.description}")
+        print(f"Schema at version {dao.schema_version()} of {SCHEMA_VERSION}")
+    finally:
+        dao.close()
@@ -0,0 +1,307 @@
+"""Module that contains a DAO decorator caching the reads of another DAO."""
+
+from collections import OrderedDict
+from collections.abc import Collection, Generator
+from dataclasses import dataclass
+import datetime
+import threading
+import time
+from typing import Any, Hashable, Optional
+from backend.dao.interfaces import (
+    DAO,
+    ORDER_BY_ID,
+    SearchCursor,
+    TaskCursor,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+)
+
+_MISSING = object()
+
+# Key of the cached result of get_all_tasks
+_ALL_TASKS = ("all",)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of the counters of a cache."""
+
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+class LRUCache:
+    """Thread-safe cache with bounded size and time to live.
+
+    When the cache is full, the least recently used entry is evicted. Entries older than the
+    time to live are treated as missing.
+    """
+
+    _entries: "OrderedDict[Hashable, tuple[float, Any]]"
+    _max_size: int
+    _ttl: float
+    _lock: threading.Lock
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        """
+        Parameters
+        ----------
+        max_size: int
+            Maximum number of entries in the cache.
+        ttl: float
+            Seconds after which an entry expires.
+        """
+
+        if max_size < 1:
+            raise ValueError("The cache must hold at least one entry")
+
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the value cached for a key, or _MISSING if there is none."""
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                    self._evictions += 1
+                self._misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value in the cache, evicting the least recently used entry if full."""
+
+        expires = time.monotonic() + self._ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Remove a key from the cache, if present."""
+
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+
+        with self._lock:
+            return CacheStats(
+                size=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+            )
+
+
+class CachingDAO:
+    """Implementation of the DAO protocol that caches the reads of another DAO.
+
+    The results of get_task_by_id and get_all_tasks are cached. Every write through this DAO
+    invalidates the cached tasks it wrote and the cached list of all tasks, so that the next
+    reads load them again. The tasks returned by the writes are not cached: two interleaved
+    updates of a task could return after one another in either order. Writes done by other
+    processes are seen once the cached entries expire.
+
+    The cached tasks are immutable records, shared between callers.
+    """
+
+    _dao: DAO
+    _cache: LRUCache
+    _generation: int
+    _lock: threading.Lock
+
+    def __init__(self, dao: DAO, max_size: int = 1024, ttl: float = 60.0):
+        """
+        Parameters
+        ----------
+        dao: class (DAO)
+            Data Access Object (DAO) whose reads are cached.
+        max_size: int
+            Maximum number of cached results.
+        ttl: float
+            Seconds after which a cached result expires.
+        """
+
+        self._dao = dao
+        self._cache = LRUCache(max_size=max_size, ttl=ttl)
+        # Incremented by every write. A read started before a write must not fill the cache,
+        # otherwise it could store data older than the write.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def dao(self) -> DAO:
+        """The wrapped DAO."""
+        return self._dao
+
+    def cache_stats(self) -> CacheStats:
+        """Return the hit, miss and eviction counters of the cache."""
+        return self._cache.stats()
+
+    def __read(self, key: Hashable, load) -> Any:
+        value = self._cache.get(key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                self._cache.put(key, value)
+        return value
+
+    def __written(self, task_ids: Collection[int]):
+        with self._lock:
+            self._generation += 1
+            self._cache.invalidate(_ALL_TASKS)
+            for task_id in task_ids:
+                self._cache.invalidate(("task", task_id))
+
+    def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database. See DAO.get_task_by_id.
+        The whole task is cached and returned, whatever the requested fields.
+        """
+        # pylint: disable=unused-argument
+        return self.__read(("task", task_id), lambda: self._dao.get_task_by_id(task_id))
+
+    def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database. See DAO.get_all_tasks.
+        The whole tasks are cached and returned, whatever the requested fields.
+        """
+        # pylint: disable=unused-argument
+        return list(self.__read(_ALL_TASKS, self._dao.get_all_tasks))
+
+    def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions. See DAO.get_tasks.
+        The results are not cached.
+        """
+        return self._dao.get_tasks(filters, order_by, descending, first, after, fields)
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Generator[list[TaskOutput], None, None]:
+        """Return an iterator over the tasks satisfying some conditions, in chunks. See
+        DAO.iter_tasks. The results are not cached.
+        """
+        return self._dao.iter_tasks(filters, fields, chunk_size)
+
+    def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks matching a text, by relevance. See DAO.search_tasks.
+        The results are not cached.
+        """
+        return self._dao.search_tasks(text, first, after, fields)
+
+    def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled between two moments. See DAO.get_scheduled_tasks.
+        The results are not cached.
+        """
+        return self._dao.get_scheduled_tasks(start, end, fields)
+
+    def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks, by date, goal and status. See
+        DAO.task_stats. The results are not cached.
+        """
+        return self._dao.task_stats(filters)
+
+    def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it. See DAO.add_task."""
+        added_task = self._dao.add_task(task)
+        self.__written([added_task.id])
+        return added_task
+
+    def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it. See DAO.rm_task."""
+        try:
+            return self._dao.rm_task(task_id, fields)
+        finally:
+            self.__written([task_id])
+
+    def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return it. See DAO.update_task."""
+        try:
+            return self._dao.update_task(task_id, new_fields, fields)
+        finally:
+            self.__written([task_id])
+
+    def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks in a single transaction. See DAO.add_tasks."""
+        results = self._dao.add_tasks(tasks)
+        self.__written(
+            [result["task"].id for result in results if result["task"] is not None]
+        )
+        return results
+
+    def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks in a single transaction. See DAO.rm_tasks."""
+        try:
+            return self._dao.rm_tasks(task_ids)
+        finally:
+            self.__written(task_ids)
+
+    def update_tasks(self, updates: list[tuple[int, TaskUpdate]]) -> list[TaskResult]:
+        """Update several tasks in a single transaction. See DAO.update_tasks."""
+        try:
+            return self._dao.update_tasks(updates)
+        finally:
+            self.__written([task_id for task_id, _ in updates])
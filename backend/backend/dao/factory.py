@@ -0,0 +1,81 @@
+"""Module that creates the DAO chosen by the environment variables."""
+
+import logging
+import os
+from typing import TYPE_CHECKING
+from backend.dao.interfaces import DAO
+from backend.dao.memory_dao import Memory
+from backend.dao.sqlite_dao import Sqlite, SqliteConfig
+
+if TYPE_CHECKING:
+    from backend.dao.mysql_dao import MysqlConfig
+
+
+def max_exports() -> int:
+    """Return the maximum number of exports running at the same time in a worker, given by
+    the environment variable EXPORT_MAX_CONCURRENCY."""
+    return int(os.environ.get("EXPORT_MAX_CONCURRENCY", "2"))
+
+
+def create_mysql_config() -> "MysqlConfig":
+    """Return the configuration of the MySQL database given by the environment variables.
+
+    With several workers, see backend.main.serve, each worker has its share of the connection
+    budget DATABASE_MAX_CONNECTIONS, which includes the connections of its exports.
+    """
+
+    # Imported here so that the other backends do not need the MySQL connector
+    # pylint: disable=import-outside-toplevel
+    from backend.dao.mysql_dao import MysqlConfig
+
+    config = MysqlConfig(
+        host="mysql",
+        password=os.environ["DATABASE_PASSWORD"],
+        fast_mode=os.environ.get("MYSQL_FAST_MODE", "1") == "1",
+    )
+
+    # Connections of all the worker processes, split evenly among them
+    max_connections = os.environ.get("DATABASE_MAX_CONNECTIONS")
+    if max_connections:
+        workers = int(os.environ.get("WORKERS", "1"))
+        if int(max_connections) < workers:
+            logging.warning(
+                "%s connections for %d workers: each worker has one connection",
+                max_connections,
+                workers,
+            )
+        # Each running export has its own connection, see Mysql.iter_tasks
+        config.pool_max_size = max(1, int(max_connections) // workers - max_exports())
+        config.pool_min_size = min(config.pool_min_size, config.pool_max_size)
+    return config
+
+
+def create_dao() -> tuple[DAO, int]:
+    """Create the blocking DAO chosen by the environment variable DAO_BACKEND.
+
+    The backend is "mysql" (default), "sqlite" or "memory". Return the DAO with the number of
+    calls it can serve concurrently. No connection to MySQL is opened here.
+    """
+
+    backend = os.environ.get("DAO_BACKEND", "mysql")
+    dao_instance: DAO
+    if backend == "mysql":
+        # pylint: disable=import-outside-toplevel
+        from backend.dao.mysql_dao import Mysql
+
+        config = create_mysql_config()
+        dao_instance = Mysql(config=config)
+        max_workers = config.pool_max_size
+    elif backend == "sqlite":
+        sqlite_config = SqliteConfig(path=os.environ.get("SQLITE_PATH", "tasks.db"))
+        dao_instance = Sqlite(config=sqlite_config)
+        # Readers run in parallel, each thread with its own connection
+        max_workers = 8
+    elif backend == "memory":
+        dao_instance = Memory()
+        # All the calls take the same lock: more threads would only wait for it
+        max_workers = 1
+    else:
+        raise ValueError(f"Unknown DAO backend '{backend}'")
+
+    return dao_instance, max_workers
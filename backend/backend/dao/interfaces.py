@@ -1,7 +1,8 @@
 """Module that contains the internal data formats used in this backend."""
 
+from collections.abc import AsyncGenerator, Collection, Generator
 import datetime
-from typing import Protocol
+from typing import NamedTuple, Optional, Protocol
 from typing_extensions import TypedDict
 
 
@@ -22,10 +23,21 @@ class TaskInput(OptionalFields):
     status: str
 
 
-class TaskOutput(TaskInput):
-    """Task format as sent to the outside world."""
+class TaskOutput(NamedTuple):
+    """Task format as sent to the outside world.
+
+    It is a compact immutable record, shared by the DAO and the API layers without copies. The
+    fields not requested to a DAO (see DAO.get_task_by_id) may be None.
+    """
 
     id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[datetime.date] = None
+    start_time: Optional[datetime.time] = None
+    end_time: Optional[datetime.time] = None
+    goal: Optional[str] = None
+    status: Optional[str] = None
 
 
 class TaskUpdate(OptionalFields, total=False):
@@ -37,22 +49,289 @@ class TaskUpdate(OptionalFields, total=False):
     status: str
 
 
+# Fields of a task that can be written by the clients, in the order of the tasks table
+TASK_FIELDS = (
+    "title",
+    "description",
+    "date",
+    "start_time",
+    "end_time",
+    "goal",
+    "status",
+)
+
+
+def projected_fields(fields: Optional[Collection[str]]) -> tuple[str, ...]:
+    """Return the fields of a projection in the order of TASK_FIELDS.
+
+    Raises a ValueError for unknown fields.
+
+    Parameters
+    ----------
+    fields: collection of str
+        Fields requested to a DAO, in addition to the id. If None, all the fields.
+    """
+
+    if fields is None:
+        return TASK_FIELDS
+    unknown = set(fields) - set(TASK_FIELDS) - {"id"}
+    if unknown:
+        raise ValueError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in TASK_FIELDS if field in fields)
+
+
+class TaskNotFoundError(LookupError):
+    """Raised by a DAO when the requested task does not exist."""
+
+    task_id: int
+
+    def __init__(self, task_id: int):
+        super().__init__(f"No task with id {task_id}")
+        self.task_id = task_id
+
+
+class TaskResult(TypedDict):
+    """Outcome of one item of a batch operation.
+    Exactly one of the two fields is not None.
+    """
+
+    task: Optional[TaskOutput]
+    error: Optional[str]
+
+
+class TaskFilter(TypedDict, total=False):
+    """Conditions that the tasks returned by a query must satisfy.
+    Only the conditions present in the dictionary are applied.
+    """
+
+    status: str
+    goal: str
+    # Inclusive range on the date of the task
+    date_from: datetime.date
+    date_to: datetime.date
+
+
+class TaskCursor(TypedDict):
+    """Position of a task in a sorted list of tasks. Used for keyset pagination.
+    It contains all the sorting keys, so it is valid for any ordering.
+    """
+
+    id: int
+    date: Optional[datetime.date]
+
+
+class SearchCursor(TypedDict):
+    """Position of a task in the results of a search, sorted by decreasing score and then by
+    id. Used for keyset pagination.
+    """
+
+    score: float
+    id: int
+
+
+class TaskMatch(NamedTuple):
+    """Task found by a full-text search."""
+
+    task: TaskOutput
+    # Relevance of the task to the searched text, the higher the better. The scores depend on
+    # the DAO and are comparable only within the results of the same search.
+    score: float
+
+
+class TaskStats(NamedTuple):
+    """Number and duration of the tasks with the same date, goal and status."""
+
+    date: Optional[datetime.date]
+    goal: Optional[str]
+    status: str
+    count: int
+    # Tasks with a start and an end time, the end not before the start
+    timed: int
+    # Sum of the durations of the timed tasks, from start to end time, in whole seconds
+    duration: int
+
+
+def task_duration(
+    start_time: Optional[datetime.time], end_time: Optional[datetime.time]
+) -> Optional[int]:
+    """Return the duration of a task in whole seconds, as counted by TaskStats, or None if
+    the task is not timed."""
+
+    if start_time is None or end_time is None or end_time < start_time:
+        return None
+    end = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+    return end - (start_time.hour * 3600 + start_time.minute * 60 + start_time.second)
+
+
+# Possible values for the ordering of a list of tasks. Ties are always broken by id.
+ORDER_BY_ID = "id"
+ORDER_BY_DATE = "date"
+
+# Possible kinds of change of a task
+EVENT_ADDED = "ADDED"
+EVENT_UPDATED = "UPDATED"
+EVENT_REMOVED = "REMOVED"
+
+
+class TaskEvent(NamedTuple):
+    """Change of a task made by a DAO mutation.
+
+    Only the changed fields of the task are set: all the fields of an added task, the updated
+    fields of an updated task and none of a removed task.
+    """
+
+    kind: str
+    task: TaskOutput
+    # Fields set in the task, in the order of TASK_FIELDS
+    fields: tuple[str, ...]
+
+
 class DAO(Protocol):
     """Protocol specifying the methods that a DAO must provide."""
 
     # pylint: disable=unnecessary-ellipsis
 
-    def get_task_by_id(self, task_id: int) -> TaskOutput:
+    def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
         """Return a specific task from the database.
         Parameters
         ----------
         task_id: int
             Id of the task to be retrieved.
+        fields: collection of str
+            Fields of the task to be returned, in addition to the id. The other fields may be
+            None in the returned task. If None, all the fields are returned.
+
+        Raises TaskNotFoundError if the task does not exist.
+        """
+        ...
+
+    def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database.
+
+        Parameters
+        ----------
+        fields: collection of str
+            Fields of the tasks to be returned. See get_task_by_id.
+        """
+        ...
+
+    def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions, sorted and paginated.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        order_by: str
+            Sorting key, either ORDER_BY_ID or ORDER_BY_DATE. Ties are broken by id.
+        descending: bool
+            If True, the tasks are sorted in descending order.
+        first: int
+            Maximum number of tasks to return. If None, all the tasks are returned.
+        after: TypedDict (TaskCursor)
+            If given, only the tasks following this position in the sorted list are returned.
+        fields: collection of str
+            Fields of the tasks to be returned. See get_task_by_id.
+        """
+        ...
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Generator[list[TaskOutput], None, None]:
+        """Return an iterator over the tasks satisfying some conditions, sorted by id.
+
+        The tasks are read from the database in chunks, so that the memory used does not
+        depend on the number of tasks. The iterator may hold a database connection until it is
+        exhausted or closed.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        fields: collection of str
+            Fields of the tasks to be returned. See get_task_by_id.
+        chunk_size: int
+            Maximum number of tasks in each list yielded by the iterator.
+        """
+        ...
+
+    def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks whose title or description contain words of a text, sorted by
+        decreasing relevance and then by id.
+
+        The words are matched whole, ignoring case and accents. As in the full-text indexes
+        of MySQL, the words shorter than 3 characters and the stopwords are ignored: a text
+        made only of them matches no task.
+
+        Parameters
+        ----------
+        text: str
+            Words to be searched. A task matches if it contains any of them.
+        first: int
+            Maximum number of tasks to return. If None, all the matching tasks are returned.
+        after: TypedDict (SearchCursor)
+            If given, only the tasks following this position in the results are returned.
+        fields: collection of str
+            Fields of the tasks to be returned. See get_task_by_id.
         """
         ...
 
-    def get_all_tasks(self) -> list[TaskOutput]:
-        """Return all the tasks in the database."""
+    def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled at some time between two moments, sorted by date,
+        start time and id.
+
+        A task is scheduled on its date from its start time, included, to its end time,
+        excluded. The tasks without a date, a start or an end time, and the ones ending
+        before they start, are not scheduled. A task starting and ending at the same time
+        is returned if it is strictly between the moments.
+
+        Parameters
+        ----------
+        start: datetime.datetime
+            Moment from which the tasks are returned, included. It has no time zone, as the
+            times of the tasks.
+        end: datetime.datetime
+            Moment until which the tasks are returned, excluded.
+        fields: collection of str
+            Fields of the tasks to be returned. See get_task_by_id.
+        """
+        ...
+
+    def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks satisfying some conditions,
+        grouped by date, goal and status, in no particular order.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the counted tasks must satisfy. See TaskFilter for more details.
+        """
         ...
 
     def add_task(self, task: TaskInput) -> TaskOutput:
@@ -66,18 +345,29 @@ class DAO(Protocol):
         """
         ...
 
-    def rm_task(self, task_id: int) -> TaskOutput:
+    def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
         """Remove a task from the database and return it.
+        Raises TaskNotFoundError if the task does not exist.
 
         Parameters
         ----------
         task_id: int
             Id of the task to be removed.
+        fields: collection of str
+            Fields of the removed task to be returned. See get_task_by_id.
         """
         ...
 
-    def update_task(self, task_id: int, new_fields: TaskUpdate) -> TaskOutput:
+    def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
         """Update a task in the database and return the updated task.
+        Raises TaskNotFoundError if the task does not exist.
 
         Parameters
         ----------
@@ -87,5 +377,141 @@ class DAO(Protocol):
             Dictionary with the fields to be updated. All and only the fields in the
             dictionary are updated. See the typed dictionary TaskUpdate for more details on
             the fields.
+        fields: collection of str
+            Fields of the updated task to be returned. See get_task_by_id.
+        """
+        ...
+
+    def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks to the database in a single transaction and return them.
+
+        Parameters
+        ----------
+        tasks: list of TypedDict (TaskInput)
+            Tasks to be added. See the typed dictionary TaskInput for more details on the fields.
+        """
+        ...
+
+    def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks from the database in a single transaction and return them.
+        The ids that do not exist are reported as errors, the others are removed.
+
+        Parameters
+        ----------
+        task_ids: list of int
+            Ids of the tasks to be removed.
+        """
+        ...
+
+    def update_tasks(self, updates: list[tuple[int, TaskUpdate]]) -> list[TaskResult]:
+        """Update several tasks in a single transaction and return the updated tasks.
+        The ids that do not exist are reported as errors, the others are updated.
+
+        Parameters
+        ----------
+        updates: list of tuples (int, TaskUpdate)
+            Id of each task to be updated with the dictionary of the fields to be updated.
+            See DAO.update_task for more details.
         """
         ...
+
+
+class AsyncDAO(Protocol):
+    """Asynchronous version of the DAO protocol.
+
+    The methods have the same meaning as in the DAO protocol, but they are awaitable so that
+    the event loop is not blocked while waiting for the database.
+    """
+
+    # pylint: disable=unnecessary-ellipsis
+
+    async def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database. See DAO.get_task_by_id."""
+        ...
+
+    async def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database. See DAO.get_all_tasks."""
+        ...
+
+    async def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions. See DAO.get_tasks."""
+        ...
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncGenerator[list[TaskOutput], None]:
+        """Return an asynchronous iterator over the tasks satisfying some conditions, in
+        chunks. See DAO.iter_tasks."""
+        ...
+
+    async def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks matching a text, by relevance. See DAO.search_tasks."""
+        ...
+
+    async def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled between two moments. See DAO.get_scheduled_tasks."""
+        ...
+
+    async def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks, by date, goal and status. See
+        DAO.task_stats."""
+        ...
+
+    async def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it. See DAO.add_task."""
+        ...
+
+    async def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it. See DAO.rm_task."""
+        ...
+
+    async def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return it. See DAO.update_task."""
+        ...
+
+    async def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks in a single transaction. See DAO.add_tasks."""
+        ...
+
+    async def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks in a single transaction. See DAO.rm_tasks."""
+        ...
+
+    async def update_tasks(
+        self, updates: list[tuple[int, TaskUpdate]]
+    ) -> list[TaskResult]:
+        """Update several tasks in a single transaction. See DAO.update_tasks."""
+        ...
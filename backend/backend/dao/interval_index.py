@@ -0,0 +1,187 @@
+"""Module that contains the index of the time spans of the tasks, for the DAOs without
+database."""
+
+import random
+from typing import Optional
+
+
+class _Node:
+    """Time span of a task in the tree."""
+
+    __slots__ = ("start", "end", "task_id", "priority", "max_end", "left", "right")
+
+    start: int
+    end: int
+    task_id: int
+    priority: float
+    # Largest end in the subtree of the node
+    max_end: int
+    left: Optional["_Node"]
+    right: Optional["_Node"]
+
+    def __init__(self, start: int, end: int, task_id: int, priority: float):
+        self.start = start
+        self.end = end
+        self.task_id = task_id
+        self.priority = priority
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+    def update(self):
+        """Compute the largest end of the subtree from the ones of the children."""
+
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    assert pivot is not None
+    node.left = pivot.right
+    pivot.right = node
+    node.update()
+    pivot.update()
+    return pivot
+
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    assert pivot is not None
+    node.right = pivot.left
+    pivot.left = node
+    node.update()
+    pivot.update()
+    return pivot
+
+
+class IntervalIndex:
+    """Interval tree of the time spans of the tasks.
+
+    The spans are half-open intervals of integers, e.g. microseconds since an epoch, stored
+    in a treap sorted by start and id. Every node holds the largest end of its subtree, so
+    that a search skips the subtrees ending before the searched interval. For spans of at
+    most a day, as the ones of the tasks, finding the k spans overlapping an interval costs
+    O(log n + k) expected time, and an insertion or a removal O(log n). The index is not
+    thread-safe: it is used under the lock of the DAO owning it.
+    """
+
+    _root: Optional[_Node]
+    # Start of the span of each task
+    _starts: dict[int, int]
+    _random: random.Random
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        seed: int
+            Seed of the priorities of the nodes, which balance the tree. If None, random.
+        """
+
+        self._root = None
+        self._starts = {}
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, task_id: int, start: int, end: int):
+        """Index the span of a task, from start included to end excluded. A task already in
+        the index must be removed first."""
+
+        if end < start:
+            raise ValueError("A span must not end before it starts")
+        node = _Node(start, end, task_id, self._random.random())
+        self._starts[task_id] = start
+
+        # Descend to a leaf, extending the largest ends on the way
+        path: list[tuple[_Node, bool]] = []
+        parent = self._root
+        while parent is not None:
+            if end > parent.max_end:
+                parent.max_end = end
+            left = start < parent.start or (
+                start == parent.start and task_id < parent.task_id
+            )
+            path.append((parent, left))
+            parent = parent.left if left else parent.right
+
+        # Rotate the node up while its priority is higher than the one of its parent
+        while path and path[-1][0].priority < node.priority:
+            parent, left = path.pop()
+            if left:
+                parent.left = node.right
+                node.right = parent
+            else:
+                parent.right = node.left
+                node.left = parent
+            parent.update()
+            node.update()
+
+        if not path:
+            self._root = node
+        elif path[-1][1]:
+            path[-1][0].left = node
+        else:
+            path[-1][0].right = node
+
+    def remove(self, task_id: int):
+        """Remove the span of a task from the index, if present."""
+
+        start = self._starts.pop(task_id, None)
+        if start is not None:
+            self._root = self.__delete(self._root, (start, task_id))
+
+    def __delete(self, root: Optional[_Node], key: tuple[int, int]) -> Optional[_Node]:
+        if root is None:
+            return None
+        root_key = (root.start, root.task_id)
+        if key < root_key:
+            root.left = self.__delete(root.left, key)
+        elif key > root_key:
+            root.right = self.__delete(root.right, key)
+        else:
+            # Rotate the node down to a leaf, the child with the higher priority going up
+            if root.left is None:
+                return root.right
+            if root.right is None:
+                return root.left
+            if root.left.priority > root.right.priority:
+                root = _rotate_right(root)
+                root.right = self.__delete(root.right, key)
+            else:
+                root = _rotate_left(root)
+                root.left = self.__delete(root.left, key)
+        root.update()
+        return root
+
+    def overlapping(self, start: int, end: int) -> list[int]:
+        """Return the ids of the tasks whose span overlaps the interval from start included
+        to end excluded, sorted by start and then by id.
+
+        An empty span overlaps the intervals strictly containing it.
+        """
+
+        task_ids: list[int] = []
+        # In-order traversal, without recursion, of the subtrees that may overlap
+        stack: list[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.start >= end:
+                # The following nodes start even later
+                break
+            if node.end > start:
+                task_ids.append(node.task_id)
+            node = node.right
+        return task_ids
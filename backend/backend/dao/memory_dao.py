@@ -0,0 +1,656 @@
+"""Module that contains the DAO implementation keeping the tasks in memory"""
+
+import bisect
+import datetime
+from collections.abc import Collection, Generator, Iterable, Iterator
+import threading
+from typing import Optional
+from backend.dao.interfaces import (
+    ORDER_BY_DATE,
+    ORDER_BY_ID,
+    TASK_FIELDS,
+    SearchCursor,
+    TaskCursor,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskNotFoundError,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+    projected_fields,
+    task_duration,
+)
+from backend.dao.interval_index import IntervalIndex
+from backend.dao.search_index import SearchIndex, search_terms
+
+_DATE = TaskOutput._fields.index("date")
+_GOAL = TaskOutput._fields.index("goal")
+_STATUS = TaskOutput._fields.index("status")
+_TITLE = TaskOutput._fields.index("title")
+_DESCRIPTION = TaskOutput._fields.index("description")
+_START_TIME = TaskOutput._fields.index("start_time")
+_END_TIME = TaskOutput._fields.index("end_time")
+
+Row = TaskOutput
+
+_MICROSECONDS_PER_DAY = 86400 * 1000000
+
+
+def _date_key(date: Optional[datetime.date]) -> Optional[datetime.date]:
+    """Return the day of a date, so that dates and datetimes can be compared."""
+    if isinstance(date, datetime.datetime):
+        return date.date()
+    return date
+
+
+def _moment(date: datetime.date, time: datetime.time) -> int:
+    """Return a moment as the number of microseconds since the start of the calendar."""
+
+    seconds = time.hour * 3600 + time.minute * 60 + time.second
+    return (
+        date.toordinal() * _MICROSECONDS_PER_DAY + seconds * 1000000 + time.microsecond
+    )
+
+
+def _span(row: Row) -> Optional[tuple[int, int]]:
+    """Return the moments when a task starts and ends, or None if it is not scheduled."""
+
+    date = _date_key(row[_DATE])
+    start_time, end_time = row[_START_TIME], row[_END_TIME]
+    if date is None or start_time is None or end_time is None or end_time < start_time:
+        return None
+    return _moment(date, start_time), _moment(date, end_time)
+
+
+class Memory:
+    """Implementation of the DAO keeping the tasks in memory.
+
+    Each task is stored as an immutable TaskOutput record, returned to the callers without
+    being copied, whatever the requested fields. Secondary indexes on status, goal and date
+    avoid scanning all the tasks for the filtered queries, and an inverted index of the words
+    of the titles and descriptions serves the searches. The tasks are lost when the process
+    ends, so this DAO is meant for tests, benchmarks and single-node deployments that do not
+    need persistence.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    _rows: dict[int, Row]
+    _ids: list[int]
+    _by_status: dict[str, set[int]]
+    _by_goal: dict[str, set[int]]
+    _by_date: list[tuple[datetime.date, int]]
+    _without_date: list[int]
+    _search: SearchIndex
+    _schedule: IntervalIndex
+    _next_id: int
+    _lock: threading.RLock
+
+    def __init__(self):
+        self._rows = {}
+        # Sorted ids, used for the ordering by id
+        self._ids = []
+        self._by_status = {}
+        self._by_goal = {}
+        # Sorted (date, id) pairs of the tasks with a date, and sorted ids of the others
+        self._by_date = []
+        self._without_date = []
+        self._search = SearchIndex()
+        # Time spans of the scheduled tasks
+        self._schedule = IntervalIndex()
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    def __index(self, task_id: int, row: Row, keep_sorted: bool = True):
+        """Add a row to the secondary indexes. If keep_sorted is False, the date indexes must
+        be sorted by the caller, e.g. once after adding many rows."""
+
+        self._by_status.setdefault(row[_STATUS], set()).add(task_id)
+        self._search.add(task_id, (row[_TITLE], row[_DESCRIPTION]))
+        span = _span(row)
+        if span is not None:
+            self._schedule.add(task_id, *span)
+        if row[_GOAL] is not None:
+            self._by_goal.setdefault(row[_GOAL], set()).add(task_id)
+        date = _date_key(row[_DATE])
+        if not keep_sorted:
+            if date is not None:
+                self._by_date.append((date, task_id))
+            else:
+                self._without_date.append(task_id)
+        elif date is not None:
+            bisect.insort(self._by_date, (date, task_id))
+        else:
+            bisect.insort(self._without_date, task_id)
+
+    def __unindex(self, task_id: int, row: Row):
+        Memory.__discard(self._by_status, row[_STATUS], task_id)
+        self._search.remove(task_id)
+        self._schedule.remove(task_id)
+        if row[_GOAL] is not None:
+            Memory.__discard(self._by_goal, row[_GOAL], task_id)
+        date = _date_key(row[_DATE])
+        if date is not None:
+            position = bisect.bisect_left(self._by_date, (date, task_id))
+            del self._by_date[position]
+        else:
+            position = bisect.bisect_left(self._without_date, task_id)
+            del self._without_date[position]
+
+    @staticmethod
+    def __discard(index: dict[str, set[int]], key: str, task_id: int):
+        ids = index[key]
+        ids.discard(task_id)
+        if not ids:
+            del index[key]
+
+    def __get_row(self, task_id: int) -> Row:
+        row = self._rows.get(task_id)
+        if row is None:
+            raise TaskNotFoundError(task_id)
+        return row
+
+    def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database.
+        Parameters
+        ----------
+        task_id: int
+            Id of the task to be retrieved.
+        fields: collection of str
+            Fields of the task to be returned, in addition to the id. If None, all the fields.
+        """
+
+        projected_fields(fields)
+        with self._lock:
+            return self.__get_row(task_id)
+
+    def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database.
+
+        Parameters
+        ----------
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        projected_fields(fields)
+        with self._lock:
+            return list(self._rows.values())
+
+    def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions, sorted and paginated.
+
+        The tasks are read in the requested order from the id or date index, and only the
+        ones in the status and goal indexes are kept, until `first` tasks are found.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        order_by: str
+            Sorting key, either ORDER_BY_ID or ORDER_BY_DATE. Ties are broken by id.
+        descending: bool
+            If True, the tasks are sorted in descending order.
+        first: int
+            Maximum number of tasks to return. If None, all the tasks are returned.
+        after: TypedDict (TaskCursor)
+            If given, only the tasks following this position in the sorted list are returned.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        if order_by not in (ORDER_BY_ID, ORDER_BY_DATE):
+            raise ValueError(f"Unknown ordering '{order_by}'")
+        if first is not None and first < 0:
+            raise ValueError("The number of tasks to return must not be negative")
+
+        projected_fields(fields)
+        with self._lock:
+            candidates = self.__candidates(filters)
+            if candidates is not None and not candidates:
+                return []
+
+            date_from = _date_key(filters.get("date_from"))
+            date_to = _date_key(filters.get("date_to"))
+
+            if order_by == ORDER_BY_DATE:
+                ids = self.__ids_by_date(date_from, date_to, descending, after)
+            else:
+                ids = self.__ids_by_id(candidates, descending, after)
+
+            results: list[TaskOutput] = []
+            for task_id in ids:
+                if first is not None and len(results) >= first:
+                    break
+                if candidates is not None and task_id not in candidates:
+                    continue
+                row = self._rows[task_id]
+                if order_by == ORDER_BY_ID and not Memory.__in_range(
+                    row, date_from, date_to
+                ):
+                    continue
+                results.append(row)
+
+        return results
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Generator[list[TaskOutput], None, None]:
+        """Return an iterator over the tasks satisfying some conditions, sorted by id.
+
+        Each chunk is a page of get_tasks following the last task of the previous one, so that
+        the lock is released between two chunks.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        chunk_size: int
+            Maximum number of tasks in each list yielded by the iterator.
+        """
+
+        if chunk_size < 1:
+            raise ValueError("The chunks must hold at least one task")
+
+        after: Optional[TaskCursor] = None
+        while True:
+            chunk = self.get_tasks(
+                filters, first=chunk_size, after=after, fields=fields
+            )
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after = {"id": chunk[-1].id, "date": chunk[-1].date}
+
+    def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks whose title or description contain words of a text, sorted by
+        decreasing relevance and then by id.
+
+        Only the tasks containing the words are read from the inverted index, and ranked with
+        BM25. See SearchIndex and DAO.search_tasks.
+
+        Parameters
+        ----------
+        text: str
+            Words to be searched. A task matches if it contains any of them.
+        first: int
+            Maximum number of tasks to return. If None, all the matching tasks are returned.
+        after: TypedDict (SearchCursor)
+            If given, only the tasks following this position in the results are returned.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        if first is not None and first < 0:
+            raise ValueError("The number of tasks to return must not be negative")
+
+        projected_fields(fields)
+        terms = search_terms(text)
+        if not terms:
+            return []
+        with self._lock:
+            return [
+                TaskMatch(self._rows[task_id], score)
+                for task_id, score in self._search.search(terms, first, after)
+            ]
+
+    def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled at some time between two moments, sorted by date,
+        start time and id.
+
+        The time spans of the tasks are looked up in an interval tree, see IntervalIndex.
+        See DAO.get_scheduled_tasks.
+
+        Parameters
+        ----------
+        start: datetime.datetime
+            Moment from which the tasks are returned, included.
+        end: datetime.datetime
+            Moment until which the tasks are returned, excluded.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        projected_fields(fields)
+        first = _moment(start.date(), start.time())
+        last = _moment(end.date(), end.time())
+        with self._lock:
+            return [
+                self._rows[task_id]
+                for task_id in self._schedule.overlapping(first, last)
+            ]
+
+    def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks satisfying some conditions,
+        grouped by date, goal and status.
+
+        Only the tasks in the date, status and goal indexes are read. See DAO.task_stats.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the counted tasks must satisfy. See TaskFilter for more details.
+        """
+
+        # Number, timed number and duration of the tasks, by date, goal and status
+        groups: dict[tuple[Optional[datetime.date], Optional[str], str], list[int]] = {}
+        with self._lock:
+            candidates = self.__candidates(filters)
+            date_from = _date_key(filters.get("date_from"))
+            date_to = _date_key(filters.get("date_to"))
+
+            ids: Iterable[int]
+            if date_from is not None or date_to is not None:
+                ids = self.__ids_by_date(date_from, date_to, False, None)
+                if candidates is not None:
+                    ids = (task_id for task_id in ids if task_id in candidates)
+            else:
+                ids = candidates if candidates is not None else self._rows
+
+            for task_id in ids:
+                row = self._rows[task_id]
+                key = (_date_key(row[_DATE]), row[_GOAL], row[_STATUS])
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = [0, 0, 0]
+                group[0] += 1
+                duration = task_duration(row[_START_TIME], row[_END_TIME])
+                if duration is not None:
+                    group[1] += 1
+                    group[2] += duration
+
+        return [TaskStats(*key, *group) for key, group in groups.items()]
+
+    def __candidates(self, filters: TaskFilter) -> Optional[set[int]]:
+        """Return the ids satisfying the status and goal filters, or None if none is given."""
+
+        candidates: Optional[set[int]] = None
+        if filters.get("status") is not None:
+            candidates = self._by_status.get(filters["status"], set())
+        if filters.get("goal") is not None:
+            by_goal = self._by_goal.get(filters["goal"], set())
+            candidates = by_goal if candidates is None else candidates & by_goal
+        return candidates
+
+    @staticmethod
+    def __in_range(
+        row: Row, date_from: Optional[datetime.date], date_to: Optional[datetime.date]
+    ) -> bool:
+        if date_from is None and date_to is None:
+            return True
+        date = _date_key(row[_DATE])
+        if date is None:
+            return False
+        if date_from is not None and date < date_from:
+            return False
+        if date_to is not None and date > date_to:
+            return False
+        return True
+
+    def __ids_by_id(
+        self,
+        candidates: Optional[set[int]],
+        descending: bool,
+        after: Optional[TaskCursor],
+    ) -> Iterable[int]:
+        # Sorting a small set of candidates is cheaper than scanning all the ids. A large set
+        # is cheaper to filter while scanning, which stops as soon as enough tasks are found.
+        ids = self._ids
+        if candidates is not None and len(candidates) * 8 < len(self._ids):
+            ids = sorted(candidates)
+
+        if descending:
+            end = len(ids)
+            if after is not None:
+                end = bisect.bisect_left(ids, after["id"])
+            return (ids[position] for position in range(end - 1, -1, -1))
+
+        start = 0
+        if after is not None:
+            start = bisect.bisect_right(ids, after["id"])
+        return (ids[position] for position in range(start, len(ids)))
+
+    def __ids_by_date(
+        self,
+        date_from: Optional[datetime.date],
+        date_to: Optional[datetime.date],
+        descending: bool,
+        after: Optional[TaskCursor],
+    ) -> Iterator[int]:
+        # Tasks without a date come first in ascending order, as in MySQL
+        with_date_only = date_from is not None or date_to is not None
+
+        start = 0
+        end = len(self._by_date)
+        if date_from is not None:
+            start = bisect.bisect_left(self._by_date, (date_from, 0))
+        if date_to is not None:
+            end = bisect.bisect_left(
+                self._by_date, (date_to + datetime.timedelta(1), 0)
+            )
+
+        without_start = 0
+        without_end = 0 if with_date_only else len(self._without_date)
+
+        if after is not None:
+            after_date = _date_key(after["date"])
+            if after_date is None:
+                if descending:
+                    start, end = 0, 0
+                    position = bisect.bisect_left(self._without_date, after["id"])
+                    without_end = min(without_end, position)
+                else:
+                    position = bisect.bisect_right(self._without_date, after["id"])
+                    without_start = max(without_start, position)
+            else:
+                key = (after_date, after["id"])
+                if descending:
+                    end = min(end, bisect.bisect_left(self._by_date, key))
+                else:
+                    start = max(start, bisect.bisect_right(self._by_date, key))
+                    without_end = 0
+
+        if descending:
+            for position in range(end - 1, start - 1, -1):
+                yield self._by_date[position][1]
+            for position in range(without_end - 1, without_start - 1, -1):
+                yield self._without_date[position]
+        else:
+            for position in range(without_start, without_end):
+                yield self._without_date[position]
+            for position in range(start, end):
+                yield self._by_date[position][1]
+
+    def __insert(self, task: TaskInput, keep_sorted: bool = True) -> TaskOutput:
+        if task.get("title") is None or task.get("status") is None:
+            raise ValueError("A task must have a title and a status")
+
+        task_id = self._next_id
+        self._next_id += 1
+        row = TaskOutput(task_id, *(task.get(field) for field in TASK_FIELDS))
+
+        self._rows[task_id] = row
+        self._ids.append(task_id)
+        self.__index(task_id, row, keep_sorted)
+        return row
+
+    def __delete(self, task_id: int) -> TaskOutput:
+        row = self.__get_row(task_id)
+        self.__unindex(task_id, row)
+        del self._rows[task_id]
+        del self._ids[bisect.bisect_left(self._ids, task_id)]
+        return row
+
+    def __update(self, task_id: int, new_fields: TaskUpdate) -> TaskOutput:
+        row = self.__get_row(task_id)
+        new_row = row._replace(
+            **{
+                field: new_fields.get(field)
+                for field in TASK_FIELDS
+                if new_fields.get(field) is not None
+            }
+        )
+        self.__unindex(task_id, row)
+        self._rows[task_id] = new_row
+        self.__index(task_id, new_row)
+        return new_row
+
+    def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it.
+
+        Parameters
+        ----------
+        task: TypedDict (TaskInput)
+            Dictionary containing the information about the new task.
+            See the typed dictionary TaskInput for more details on the fields.
+        """
+
+        with self._lock:
+            return self.__insert(task)
+
+    def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it.
+
+        Parameters
+        ----------
+        task_id: int
+            Id of the task to be removed.
+        fields: collection of str
+            Fields of the removed task to be returned, in addition to the id. If None, all the
+            fields.
+        """
+
+        projected_fields(fields)
+        with self._lock:
+            return self.__delete(task_id)
+
+    def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return the updated task.
+
+        Parameters
+        ----------
+        task_id: int
+            Id of the task to be updated.
+        new_fields: TypedDict (TaskUpdate)
+            Dictionary with the fields to be updated. All and only the fields in the
+            dictionary are updated. See the typed dictionary TaskUpdate for more details on
+            the fields.
+        fields: collection of str
+            Fields of the updated task to be returned, in addition to the id. If None, all the
+            fields.
+        """
+
+        projected_fields(fields)
+        with self._lock:
+            return self.__update(task_id, new_fields)
+
+    def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks to the database in a single transaction and return them.
+
+        Parameters
+        ----------
+        tasks: list of TypedDict (TaskInput)
+            Tasks to be added. See the typed dictionary TaskInput for more details on the fields.
+        """
+
+        for task in tasks:
+            if task.get("title") is None or task.get("status") is None:
+                raise ValueError("A task must have a title and a status")
+
+        with self._lock:
+            # Sorting the date indexes once is much cheaper than one insertion per task
+            results = [
+                TaskResult(task=self.__insert(task, keep_sorted=False), error=None)
+                for task in tasks
+            ]
+            self._by_date.sort()
+            self._without_date.sort()
+        return results
+
+    def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks from the database in a single transaction and return them.
+        The ids that do not exist are reported as errors, the others are removed.
+
+        Parameters
+        ----------
+        task_ids: list of int
+            Ids of the tasks to be removed.
+        """
+
+        with self._lock:
+            existing = {
+                task_id: self._rows[task_id]
+                for task_id in task_ids
+                if task_id in self._rows
+            }
+            for task_id in existing:
+                self.__delete(task_id)
+
+        return [Memory.__batch_result(existing, task_id) for task_id in task_ids]
+
+    def update_tasks(self, updates: list[tuple[int, TaskUpdate]]) -> list[TaskResult]:
+        """Update several tasks in a single transaction and return the updated tasks.
+        The ids that do not exist are reported as errors, the others are updated.
+
+        Parameters
+        ----------
+        updates: list of tuples (int, TaskUpdate)
+            Id of each task to be updated with the dictionary of the fields to be updated.
+            See update_task for more details.
+        """
+
+        with self._lock:
+            for task_id, new_fields in updates:
+                if task_id in self._rows:
+                    self.__update(task_id, new_fields)
+            updated = {
+                task_id: self._rows[task_id]
+                for task_id, _ in updates
+                if task_id in self._rows
+            }
+
+        return [Memory.__batch_result(updated, task_id) for task_id, _ in updates]
+
+    @staticmethod
+    def __batch_result(tasks: dict[int, TaskOutput], task_id: int) -> TaskResult:
+        if task_id in tasks:
+            return TaskResult(task=tasks[task_id], error=None)
+        return TaskResult(task=None, error=f"No task with id {task_id}")
@@ -0,0 +1,265 @@
+"""Module that contains a DAO decorator measuring the calls to another DAO."""
+
+from collections.abc import Callable, Collection, Generator, Iterator
+import datetime
+import time
+from typing import Optional, TypeVar
+from backend.dao.interfaces import (
+    DAO,
+    ORDER_BY_ID,
+    SearchCursor,
+    TaskCursor,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+)
+from backend.metrics import Counter, Histogram, MetricsRegistry, StatsCollector
+from backend.profiling import current_trace
+
+T = TypeVar("T")
+
+
+def _count_tasks(results: list[TaskResult]) -> int:
+    return sum(1 for result in results if result["task"] is not None)
+
+
+class MetricsDAO:
+    """Implementation of the DAO protocol that measures the calls to another DAO.
+
+    For every method, the latency of the calls, the number of tasks returned or changed and
+    the exceptions raised are recorded in a MetricsRegistry:
+
+    - `dao_call_duration_seconds`: histogram of the latency, by method.
+    - `dao_rows_total`: tasks read or written, by method.
+    - `dao_errors_total`: failed calls, by method and exception class.
+
+    If the wrapped DAO has a connection pool, as Mysql, its statistics are also exposed with
+    the `dao_pool` prefix. The overhead is a few microseconds per call. The calls are also
+    added to the trace of the current request, if any, see backend.profiling.
+    """
+
+    _dao: DAO
+    _latency: Histogram
+    _rows: Counter
+    _errors: Counter
+
+    def __init__(self, dao: DAO, registry: MetricsRegistry):
+        """
+        Parameters
+        ----------
+        dao: class (DAO)
+            Data Access Object (DAO) to be measured.
+        registry: MetricsRegistry
+            Registry the metrics are added to.
+        """
+
+        self._dao = dao
+        self._latency = registry.register(
+            Histogram(
+                "dao_call_duration_seconds",
+                "Duration of the calls to the DAO",
+                label_names=("method",),
+            )
+        )
+        self._rows = registry.register(
+            Counter(
+                "dao_rows_total",
+                "Tasks read or written by the calls to the DAO",
+                label_names=("method",),
+            )
+        )
+        self._errors = registry.register(
+            Counter(
+                "dao_errors_total",
+                "Calls to the DAO that raised an exception",
+                label_names=("method", "error"),
+            )
+        )
+
+        pool_stats = getattr(dao, "pool_stats", None)
+        if pool_stats is not None:
+            registry.register(
+                StatsCollector(
+                    "dao_pool",
+                    "Connection pool of the DAO",
+                    pool_stats,
+                    counters=("checkouts", "timeouts", "replaced"),
+                )
+            )
+
+    @property
+    def dao(self) -> DAO:
+        """The wrapped DAO."""
+        return self._dao
+
+    def __call(
+        self, method: str, rows: Callable[[T], int], function: Callable[..., T], *args
+    ) -> T:
+        labels = (method,)
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+        except Exception as error:
+            self._errors.inc((method, type(error).__name__))
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._latency.observe(elapsed, labels)
+            trace = current_trace()
+            if trace is not None:
+                trace.add("dao", method, start, elapsed)
+        self._rows.inc(labels, rows(result))
+        return result
+
+    def __iterate(
+        self, chunks: Iterator[list[TaskOutput]]
+    ) -> Generator[list[TaskOutput], None, None]:
+        # Only the time spent reading the chunks is measured, not the time spent by the
+        # caller between them
+        labels = ("iter_tasks",)
+        elapsed = 0.0
+        rows = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    chunk = next(chunks, None)
+                finally:
+                    elapsed += time.perf_counter() - start
+                if chunk is None:
+                    break
+                rows += len(chunk)
+                yield chunk
+        except Exception as error:
+            self._errors.inc(("iter_tasks", type(error).__name__))
+            raise
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self._latency.observe(elapsed, labels)
+            self._rows.inc(labels, rows)
+
+    def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database. See DAO.get_task_by_id."""
+        return self.__call(
+            "get_task_by_id", lambda _: 1, self._dao.get_task_by_id, task_id, fields
+        )
+
+    def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database. See DAO.get_all_tasks."""
+        return self.__call("get_all_tasks", len, self._dao.get_all_tasks, fields)
+
+    def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions. See DAO.get_tasks."""
+        return self.__call(
+            "get_tasks",
+            len,
+            self._dao.get_tasks,
+            filters,
+            order_by,
+            descending,
+            first,
+            after,
+            fields,
+        )
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Generator[list[TaskOutput], None, None]:
+        """Return an iterator over the tasks satisfying some conditions, in chunks. See
+        DAO.iter_tasks. The call is measured once the iterator is exhausted or closed.
+        """
+        return self.__iterate(self._dao.iter_tasks(filters, fields, chunk_size))
+
+    def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks matching a text, by relevance. See DAO.search_tasks."""
+        return self.__call(
+            "search_tasks", len, self._dao.search_tasks, text, first, after, fields
+        )
+
+    def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled between two moments. See DAO.get_scheduled_tasks."""
+        return self.__call(
+            "get_scheduled_tasks",
+            len,
+            self._dao.get_scheduled_tasks,
+            start,
+            end,
+            fields,
+        )
+
+    def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks, by date, goal and status. See
+        DAO.task_stats."""
+        return self.__call("task_stats", len, self._dao.task_stats, filters)
+
+    def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it. See DAO.add_task."""
+        return self.__call("add_task", lambda _: 1, self._dao.add_task, task)
+
+    def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it. See DAO.rm_task."""
+        return self.__call("rm_task", lambda _: 1, self._dao.rm_task, task_id, fields)
+
+    def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return it. See DAO.update_task."""
+        return self.__call(
+            "update_task",
+            lambda _: 1,
+            self._dao.update_task,
+            task_id,
+            new_fields,
+            fields,
+        )
+
+    def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks in a single transaction. See DAO.add_tasks."""
+        return self.__call("add_tasks", _count_tasks, self._dao.add_tasks, tasks)
+
+    def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks in a single transaction. See DAO.rm_tasks."""
+        return self.__call("rm_tasks", _count_tasks, self._dao.rm_tasks, task_ids)
+
+    def update_tasks(self, updates: list[tuple[int, TaskUpdate]]) -> list[TaskResult]:
+        """Update several tasks in a single transaction. See DAO.update_tasks."""
+        return self.__call(
+            "update_tasks", _count_tasks, self._dao.update_tasks, updates
+        )
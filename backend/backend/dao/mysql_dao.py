@@ -1,13 +1,84 @@
 """Module that contains the DAO implementation based on MySQL"""
 
-from datetime import datetime
+from collections.abc import Collection, Generator, Iterator, Sequence
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
 import logging
 from dataclasses import dataclass
-from typing import cast
+import threading
+from typing import Optional
+import weakref
 import mysql.connector
-import mysql.connector.connection
-import mysql.connector.cursor
-from backend.dao.interfaces import TaskInput, TaskOutput, TaskUpdate
+from mysql.connector.constants import ClientFlag
+from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
+from backend.dao.interfaces import (
+    ORDER_BY_ID,
+    TASK_FIELDS,
+    SearchCursor,
+    TaskCursor,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskNotFoundError,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+    projected_fields,
+)
+from backend.dao.mysql_migrations import (
+    SCHEMA_VERSION,
+    Migration,
+    apply_migrations,
+    schema_version,
+)
+from backend.dao.mysql_pool import ConnectionPool, PoolStats
+from backend.dao.mysql_statements import PreparedStatements, padded_id_chunks
+from backend.dao.search_index import search_terms
+from backend.dao.sql_queries import (
+    build_select_schedule,
+    build_select_tasks,
+    build_task_stats,
+    select_columns,
+)
+
+
+# Upper bound of the size of the values of a multi-row INSERT, well below the default
+# max_allowed_packet of the server (4 MiB up to MySQL 5.7, 64 MiB since 8.0)
+_MAX_INSERT_BYTES = 2**20
+
+
+def _insert_batches(
+    rows: list[tuple], max_bytes: int = _MAX_INSERT_BYTES
+) -> Iterator[list[tuple]]:
+    """Split the rows of a multi-row INSERT so that the values of each statement take at most
+    about max_bytes. A single row larger than that is a batch by itself.
+    """
+
+    batch: list[tuple] = []
+    size = 0
+    for row in rows:
+        # Quotes, escapes and separators of each value are within the margin of the bound
+        row_size = sum(
+            len(value.encode()) if isinstance(value, str) else 16 for value in row
+        )
+        if batch and size + row_size > max_bytes:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(row)
+        size += row_size
+    if batch:
+        yield batch
+
+
+def _as_read(field: str, value):
+    """Return a value of a task as MySQL returns it when read back. The dates are stored in a
+    TIMESTAMP column, so they are read as datetimes at midnight."""
+
+    if field == "date" and value is not None and not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    return value
 
 
 @dataclass
@@ -18,6 +89,24 @@ class MysqlConfig:
     host: str = "localhost"
     user: str = "root"
     port: int = 3306
+    # Connection pool. Connections are opened on first use, up to the max size. The min size
+    # is opened by the first successful ping.
+    pool_min_size: int = 1
+    pool_max_size: int = 10
+    # Seconds to wait for a free connection before failing the request
+    pool_timeout: float = 5.0
+    # Ping connections on checkout and replace the broken ones
+    pool_health_check: bool = True
+    # Skip the ping for connections used in the last seconds
+    pool_health_check_idle_time: float = 10.0
+    # Maximum number of prepared statements kept by each connection
+    prepared_statements: int = 64
+    # Seconds the server waits for an export, see Mysql.iter_tasks, to read the next rows,
+    # i.e. for its client to download the previous ones (net_write_timeout)
+    export_write_timeout: int = 3600
+    # Use the C extension of the connector, if installed, and decode the rows from tuples
+    # instead of dictionaries. Otherwise, the pure Python connector is used.
+    fast_mode: bool = True
     database = "tasks"
     table = "tasks"
 
@@ -25,106 +114,159 @@ class MysqlConfig:
 class Mysql:
     """Implementation of the DAO using MySQL as database."""
 
-    _mydb: mysql.connector.connection.MySQLConnection
-    _cursor: mysql.connector.cursor.MySQLCursorDict
+    _pool: ConnectionPool
     _config: MysqlConfig
+    _statements: "weakref.WeakKeyDictionary[MySQLConnectionAbstract, PreparedStatements]"
+    _statements_lock: threading.Lock
+    # Whether the schema was found up to date by ping
+    _schema_checked: bool
 
     def __init__(self, config: MysqlConfig):
+        """
+        No connection is opened here: the pool opens them on first use, so that the
+        backend starts even if the database is not reachable yet. The schema must have been
+        created by the migrations, see `migrate`.
+
+        Parameters
+        ----------
+        config: MysqlConfig
+            Configuration of the database and of the connection pool.
+        """
+
         self._config = config
+        self._statements = weakref.WeakKeyDictionary()
+        self._statements_lock = threading.Lock()
+        self._schema_checked = False
+
+        logging.info(
+            "Creating connection pool (min size %d, max size %d)",
+            self._config.pool_min_size,
+            self._config.pool_max_size,
+        )
+        self._pool = ConnectionPool(
+            factory=lambda: self.__connect(database=self._config.database),
+            min_size=self._config.pool_min_size,
+            max_size=self._config.pool_max_size,
+            timeout=self._config.pool_timeout,
+            health_check=self._config.pool_health_check,
+            health_check_idle_time=self._config.pool_health_check_idle_time,
+        )
 
-        logging.info("Connecting to database")
-        self.__connect()
+    def migrate(self) -> list[Migration]:
+        """Create the database and the table if missing, and apply the pending migrations of
+        the schema. Return the applied migrations. See backend.dao.mysql_migrations.
+        """
 
-        logging.info("Checking existence of tasks database '%s'", self._config.database)
-        database_exists = self.__check_database_exists()
+        logging.info("Connecting to database")
+        connection = self.__connect()
+        try:
+            return apply_migrations(
+                connection, self._config.database, self._config.table
+            )
+        finally:
+            connection.close()
 
-        if not database_exists:
-            logging.info("Database not found. Creating it")
-            self.__create_tasks_database()
-            if not self.__check_database_exists():
-                raise RuntimeError("Unable to create the database")
-        else:
-            logging.info("Database already existing")
+    def schema_version(self) -> int:
+        """Return the version of the schema of the table, 0 if it was never migrated."""
 
-        logging.info("Switching to database '%s'", self._config.database)
-        self.__switch_to_taks_database()
+        with self.__connection() as (connection, _):
+            cursor = connection.cursor()
+            try:
+                return schema_version(cursor, self._config.table)
+            finally:
+                cursor.close()
 
-        logging.info("Checking existence of tasks table '%s'", self._config.table)
-        table_exists = self.__check_table_exists()
+    def ping(self):
+        """Check that the database can serve the requests, e.g. for a readiness probe.
 
-        if not table_exists:
-            logging.info("Table not found. Creating it")
-            self.__create_tasks_table()
-            if not self.__check_table_exists():
-                raise RuntimeError("Unable to create the table")
-        else:
-            logging.info("Table already existing")
+        The first successful check verifies that the schema is up to date, and opens the
+        minimum number of connections of the pool. The following ones only run a query.
+        Raises an exception if the database is not reachable or not migrated.
+        """
 
-    def __connect(self):
-        # Use a pure Python connection. This is always available. Maybe less performant than the C
-        # implementation, but I do not expect huge databases.
+        if not self._schema_checked:
+            version = self.schema_version()
+            if version < SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"The schema of table {self._config.table} is at version {version} "
+                    f"instead of {SCHEMA_VERSION}: the migrations must be applied"
+                )
+            self._schema_checked = True
+            self._pool.fill()
+            return
+
+        with self.__connection() as (connection, _):
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def __connect(self, database: Optional[str] = None) -> MySQLConnectionAbstract:
+        # The pure Python connection is always available. The C extension decodes the rows
+        # much faster, but it is an optional part of the connector.
+        use_pure = not (self._config.fast_mode and mysql.connector.HAVE_CEXT)
         connection = mysql.connector.connect(
             password=self._config.password,
             host=self._config.host,
             user=self._config.user,
             port=self._config.port,
-            use_pure=True,
+            use_pure=use_pure,
+            # Single statements commit without an extra round trip. Transactions spanning
+            # several statements are started explicitly.
+            autocommit=True,
+            # The row count of an UPDATE includes the matched rows left unchanged, so that it
+            # tells whether the task exists.
+            client_flags=[ClientFlag.FOUND_ROWS],
         )
-        if isinstance(connection, mysql.connector.connection.MySQLConnection):
-            self._mydb = connection
-            self._cursor = cast(
-                mysql.connector.cursor.MySQLCursorDict,
-                self._mydb.cursor(dictionary=True),
-            )
-        else:
+        if not isinstance(connection, MySQLConnectionAbstract):
             raise mysql.connector.errors.DatabaseError(
-                f"Expected a MySQLConnection connection, returned {type(connection)}"
+                f"Expected a MySQL connection, returned {type(connection)}"
             )
+        if database is not None:
+            connection.database = database
+        return connection
+
+    @contextmanager
+    def __connection(
+        self, transaction: bool = False
+    ) -> Iterator[tuple[MySQLConnectionAbstract, PreparedStatements]]:
+        """Check out a pooled connection, used only by the current request, with its prepared
+        statements.
+
+        The connections autocommit every statement. If transaction is True, a transaction is
+        started instead, which must be committed by the caller. It is rolled back if the block
+        raises an exception.
+        """
 
-    def __create_tasks_database(self):
-        self._cursor.execute(f"CREATE DATABASE {self._config.database}")
-
-    def __check_database_exists(self):
-        self._cursor.execute("SHOW DATABASES")
-        databases = [
-            result["Database"]
-            for result in self._cursor.fetchall()
-            if result is not None
-        ]
-        return self._config.database in databases
-
-    def __switch_to_taks_database(self):
-        self._cursor.execute(f"USE {self._config.database};")
-
-    # TODO: Use schema validation using the Task type
-    # TODO: Can MySQL use enum for status?
-    def __create_tasks_table(self):
-        task_id = "id INT AUTO_INCREMENT PRIMARY KEY"
-        title = "title VARCHAR(255) NOT NULL"
-        description = "description TEXT"
-        date = "date TIMESTAMP"
-        start_time = "start_time TIME"
-        end_time = "end_time TIME"
-        goal = "goal VARCHAR(255)"
-        status = "status VARCHAR(50) NOT NULL"
-        schema = ", ".join(
-            [task_id, title, description, date, start_time, end_time, goal, status]
-        )
-
-        self._cursor.execute(f"CREATE TABLE {self._config.table} ({schema})")
-
-    def __check_table_exists(self):
-        self._cursor.execute("SHOW TABLES")
-        tables = [
-            result[f"Tables_in_{self._config.database}"]
-            for result in self._cursor.fetchall()
-            if result is not None
-        ]
-        return self._config.table in tables
+        with self._pool.connection() as connection:
+            with self._statements_lock:
+                statements = self._statements.get(connection)
+                if statements is None:
+                    statements = PreparedStatements(
+                        connection,
+                        self._config.prepared_statements,
+                        dictionary=not self._config.fast_mode,
+                    )
+                    self._statements[connection] = statements
+            if transaction:
+                connection.start_transaction()
+            yield connection, statements
+
+    def pool_stats(self) -> PoolStats:
+        """Return size, wait time and checkout counters of the connection pool."""
+        return self._pool.stats()
+
+    def close(self):
+        """Close the connections of the pool. Connections in use are closed on release."""
+
+        logging.info("Closing database connections")
+        self._pool.close()
 
     def __del__(self):
-        logging.info("Closing database connection")
-        self._mydb.close()
+        if hasattr(self, "_pool"):
+            self.close()
 
     @staticmethod
     def convert_sql_to_task(**fields) -> TaskOutput:
@@ -146,51 +288,325 @@ class Mysql:
         task = TaskOutput(**fields)
         return task
 
-    def get_task_by_id(self, task_id: int) -> TaskOutput:
+    @staticmethod
+    def convert_rows_to_tasks(
+        columns: Sequence[str], rows: Sequence[Sequence]
+    ) -> list[TaskOutput]:
+        """Convert the rows returned by a tuple cursor to the internal task representation.
+
+        The position of each field in the rows and its conversion are chosen once for all the
+        rows. Each row becomes a task record without intermediate dictionaries.
+
+        Parameters
+        ----------
+        columns: sequence of str
+            Names of the columns, in the order of the values of each row.
+        rows: sequence of sequences
+            Values of the rows, as returned by MySQL.
+        """
+
+        if tuple(columns) == TaskOutput._fields:
+            positions = None
+        else:
+            positions = [
+                columns.index(field) if field in columns else None
+                for field in TaskOutput._fields
+            ]
+        time_fields = [
+            index
+            for index, field in enumerate(TaskOutput._fields)
+            if field in ("start_time", "end_time") and field in columns
+        ]
+
+        # The times of the tasks take few distinct values: convert each only once
+        times: dict[timedelta, time] = {}
+        tasks: list[TaskOutput] = []
+        for row in rows:
+            if positions is None:
+                values = list(row)
+            else:
+                values = [
+                    row[position] if position is not None else None
+                    for position in positions
+                ]
+            for index in time_fields:
+                value = values[index]
+                if value is not None:
+                    converted = times.get(value)
+                    if converted is None:
+                        converted = times[value] = (datetime.min + value).time()
+                    values[index] = converted
+            tasks.append(TaskOutput._make(values))
+        return tasks
+
+    def __fetch_tasks(self, cursor: MySQLCursorAbstract) -> list[TaskOutput]:
+        """Fetch all the rows of a result and convert them to tasks."""
+        return self.__convert_rows(cursor, cursor.fetchall())
+
+    def __convert_rows(
+        self, cursor: MySQLCursorAbstract, rows: Sequence
+    ) -> list[TaskOutput]:
+        """Convert rows fetched from a cursor to tasks."""
+
+        if self._config.fast_mode:
+            return Mysql.convert_rows_to_tasks(cursor.column_names, rows)
+        return [Mysql.convert_sql_to_task(**row) for row in rows if row is not None]
+
+    def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
         """Return a specific task from the database.
         Parameters
         ----------
         task_id: int
             Id of the task to be retrieved.
+        fields: collection of str
+            Fields of the task to be returned, in addition to the id. If None, all the fields.
         """
 
-        sql_command = f"SELECT  * FROM {self._config.table} WHERE id={task_id}"
-        self._cursor.execute(sql_command)
-        result = self._cursor.fetchall()
+        columns = select_columns(fields)
+        sql_command = f"SELECT {columns} FROM {self._config.table} WHERE id = %s"
+        with self.__connection() as (_, statements):
+            tasks = self.__fetch_tasks(statements.execute(sql_command, (task_id,)))
 
-        # TODO: Better warning handling. This should be an error, not to give confusing replies.
-        if len(result) > 1:
-            logging.warning(
-                "Multiple tasks with the same id found. Using the first one"
-            )
+        if not tasks:
+            raise TaskNotFoundError(task_id)
+        return tasks[0]
 
-        result = result[0]
+    def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database.
 
-        # TODO: better error handling. If task is not present, do not return simply a fake task.
-        if result is None:
-            logging.error("No task retrieved with the specified id.")
+        Parameters
+        ----------
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
 
-        task = (
-            Mysql.convert_sql_to_task(**result)
-            if result is not None
-            else TaskOutput(id=0, title="", status="open")
+        columns = select_columns(fields)
+        sql_command = f"SELECT {columns} FROM {self._config.table}"
+        with self.__connection() as (_, statements):
+            tasks = self.__fetch_tasks(statements.execute(sql_command))
+        return tasks
+
+    def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions, sorted and paginated.
+
+        Filters, ordering and pagination are all executed by MySQL. Pagination uses the sorting
+        keys of the last returned task (keyset pagination), so that deep pages are as fast as
+        the first one. See build_select_tasks for the statement.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        order_by: str
+            Sorting key, either ORDER_BY_ID or ORDER_BY_DATE. Ties are broken by id.
+        descending: bool
+            If True, the tasks are sorted in descending order.
+        first: int
+            Maximum number of tasks to return. If None, all the tasks are returned.
+        after: TypedDict (TaskCursor)
+            If given, only the tasks following this position in the sorted list are returned.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        sql_command, params = build_select_tasks(
+            self._config.table,
+            filters,
+            order_by,
+            descending,
+            first,
+            after,
+            fields=fields,
         )
 
-        return task
+        with self.__connection() as (_, statements):
+            tasks = self.__fetch_tasks(statements.execute(sql_command, params))
+        return tasks
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Generator[list[TaskOutput], None, None]:
+        """Return an iterator over the tasks satisfying some conditions, sorted by id.
+
+        The rows are read from an unbuffered cursor, so MySQL sends them while they are
+        fetched in chunks and the client never holds the whole result. The iterator may be
+        read as slowly as a client downloads an export: it opens its own connection, outside
+        the pool, so that the requests never wait for it, and closes it when exhausted or
+        closed. The callers bound the iterators open at the same time, see
+        create_export_router.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        chunk_size: int
+            Maximum number of tasks in each list yielded by the iterator.
+        """
+
+        if chunk_size < 1:
+            raise ValueError("The chunks must hold at least one task")
+
+        sql_command, params = build_select_tasks(
+            self._config.table, filters, fields=fields
+        )
+        connection = self.__connect(self._config.database)
+        try:
+            cursor = connection.cursor(
+                buffered=False, dictionary=not self._config.fast_mode
+            )
+            timeout = int(self._config.export_write_timeout)
+            cursor.execute(f"SET SESSION net_write_timeout = {timeout}")
+            cursor.execute(sql_command, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield self.__convert_rows(cursor, rows)
+            cursor.close()
+        finally:
+            try:
+                # Also with rows left unread, which the server discards
+                connection.close()
+            except mysql.connector.errors.Error:
+                pass
+
+    def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks whose title or description contain words of a text, sorted by
+        decreasing relevance and then by id.
+
+        The words are looked up in the FULLTEXT index of the table, in natural language mode,
+        and the score of a task is its relevance as computed by MySQL. See
+        DAO.search_tasks.
+
+        Parameters
+        ----------
+        text: str
+            Words to be searched. A task matches if it contains any of them.
+        first: int
+            Maximum number of tasks to return. If None, all the matching tasks are returned.
+        after: TypedDict (SearchCursor)
+            If given, only the tasks following this position in the results are returned.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        if first is not None and first < 0:
+            raise ValueError("The number of tasks to return must not be negative")
+
+        terms = search_terms(text)
+        if not terms:
+            return []
 
-    def get_all_tasks(self) -> list[TaskOutput]:
-        """Return all the tasks in the database."""
+        match = "MATCH (title, description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+        sql_command = (
+            f"SELECT {select_columns(fields)}, {match} AS score"
+            f" FROM {self._config.table} WHERE {match}"
+        )
+        words = " ".join(terms)
+        params: list = [words, words]
+        if after is not None:
+            # The alias of the score can be used by HAVING only
+            sql_command += " HAVING score < %s OR (score = %s AND id > %s)"
+            params.extend([after["score"], after["score"], after["id"]])
+        sql_command += " ORDER BY score DESC, id"
+        if first is not None:
+            sql_command += " LIMIT %s"
+            params.append(first)
+
+        with self.__connection() as (_, statements):
+            cursor = statements.execute(sql_command, params)
+            rows = cursor.fetchall()
+            # The extra column is ignored by the conversion of the tuples
+            if self._config.fast_mode:
+                scores = [row[-1] for row in rows]
+            else:
+                scores = [row.pop("score") for row in rows]
+            tasks = self.__convert_rows(cursor, rows)
+        return [TaskMatch(task, score) for task, score in zip(tasks, scores)]
+
+    def get_scheduled_tasks(
+        self,
+        start: datetime,
+        end: datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled at some time between two moments, sorted by date,
+        start time and id.
+
+        The tasks of the days of the interval are read from the index on the date and the
+        start time, which also filters the last day by start time before reading the rows. See
+        build_select_schedule and DAO.get_scheduled_tasks.
 
-        sql_command = f"SELECT  * FROM {self._config.table}"
-        self._cursor.execute(sql_command)
-        results = self._cursor.fetchall()
+        Parameters
+        ----------
+        start: datetime
+            Moment from which the tasks are returned, included.
+        end: datetime
+            Moment until which the tasks are returned, excluded.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
 
-        tasks = [Mysql.convert_sql_to_task(**arg) for arg in results if arg is not None]
+        sql_command, params = build_select_schedule(
+            self._config.table, start, end, fields=fields
+        )
+        with self.__connection() as (_, statements):
+            tasks = self.__fetch_tasks(statements.execute(sql_command, params))
         return tasks
 
+    def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks satisfying some conditions,
+        grouped by date, goal and status.
+
+        The groups are computed by MySQL, with the indexes of the filters, and only one row
+        per group is transferred. See DAO.task_stats.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the counted tasks must satisfy. See TaskFilter for more details.
+        """
+
+        sql_command, params = build_task_stats(self._config.table, filters)
+        with self.__connection() as (_, statements):
+            rows = statements.execute(sql_command, params).fetchall()
+        if not self._config.fast_mode:
+            rows = [tuple(row.values()) for row in rows]
+        # MySQL returns the sums as decimals
+        return [
+            TaskStats(date, goal, status, count, timed, int(duration))
+            for date, goal, status, count, timed, duration in rows
+        ]
+
     def add_task(self, task: TaskInput) -> TaskOutput:
         """Add a new task to the database and return it.
 
+        The returned task is built from the given fields and the id assigned by MySQL, without
+        reading it back. Its values have the types of the reads, e.g. the date is a datetime.
+
         Parameters
         ----------
         task: TypedDict (TaskInput)
@@ -198,61 +614,77 @@ class Mysql:
             See the typed dictionary TaskInput for more details on the fields.
         """
 
-        fields = []
-
-        if task["title"] is not None:
-            fields.append(("title", task["title"], "%s"))
-        if task.get("description") is not None:
-            fields.append(("description", task.get("description"), "%s"))
-        if task.get("date") is not None:
-            fields.append(("date", task.get("date"), "%s"))
-        if task.get("start_time") is not None:
-            fields.append(("start_time", task.get("start_time"), "%s"))
-        if task.get("end_time") is not None:
-            fields.append(("end_time", task.get("end_time"), "%s"))
-        if task.get("goal") is not None:
-            fields.append(("goal", task.get("goal"), "%s"))
-        if task.get("status") is not None:
-            fields.append(("status", task["status"], "%s"))
-
-        columns = ", ".join([field[0] for field in fields])
-        values = [field[1] for field in fields]
-        values_types = ", ".join([field[2] for field in fields])
+        fields = [field for field in TASK_FIELDS if task.get(field) is not None]
+        columns = ", ".join(fields)
+        values = [task.get(field) for field in fields]
+        values_types = ", ".join(["%s"] * len(fields))
 
         sql_command = (
             f"INSERT INTO {self._config.table} ({columns}) VALUES ({values_types})"
         )
 
-        self._cursor.execute(operation=sql_command, params=values)
-        self._mydb.commit()
-
-        task_id = self._cursor.getlastrowid()
-        if task_id is None or self._cursor.rowcount != 1:
-            raise RuntimeError("Unable to add key to the database")
+        # The connections autocommit: a single statement is a complete transaction
+        with self.__connection() as (_, statements):
+            cursor = statements.execute(sql_command, values)
+            task_id = cursor.lastrowid
+            if not task_id or cursor.rowcount != 1:
+                raise RuntimeError("Unable to add key to the database")
 
-        added_task = self.get_task_by_id(task_id)
+        added_task = TaskOutput(
+            task_id, *(_as_read(field, task.get(field)) for field in TASK_FIELDS)
+        )
         return added_task
 
-    def rm_task(self, task_id: int) -> TaskOutput:
+    def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
         """Remove a task from the database and return it.
 
+        If only the id is requested, the task is removed with a single DELETE.
+
         Parameters
         ----------
         task_id: int
             Id of the task to be removed.
+        fields: collection of str
+            Fields of the removed task to be returned, in addition to the id. If None, all the
+            fields.
         """
 
-        task = self.get_task_by_id(task_id)
-        # TODO: Check if task exists, otherwise do not proceed
-        sql_command = f"DELETE FROM {self._config.table} WHERE id={task['id']}"
-        self._cursor.execute(sql_command)
-        self._mydb.commit()
-        # TODO: Check that the task doesn't exist, i.e. it has been succesfully deleted
+        task = TaskOutput(id=task_id)
+        delete_command = f"DELETE FROM {self._config.table} WHERE id = %s"
+
+        with self.__connection() as (_, statements):
+            if fields is None or projected_fields(fields):
+                columns = select_columns(fields)
+                select_command = (
+                    f"SELECT {columns} FROM {self._config.table} WHERE id = %s"
+                )
+                tasks = self.__fetch_tasks(
+                    statements.execute(select_command, (task_id,))
+                )
+                if not tasks:
+                    raise TaskNotFoundError(task_id)
+                task = tasks[0]
+
+            cursor = statements.execute(delete_command, (task_id,))
+            # Also raised if another request removed the task after the SELECT
+            if cursor.rowcount != 1:
+                raise TaskNotFoundError(task_id)
+
         return task
 
-    def update_task(self, task_id: int, new_fields: TaskUpdate) -> TaskOutput:
+    def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
         """Update a task in the database and return the updated task.
 
+        If all the requested fields are updated, the task is built from the new values
+        without reading it back.
+
         Parameters
         ----------
         task_id: int
@@ -261,34 +693,179 @@ class Mysql:
             Dictionary with the fields to be updated. All and only the fields in the
             dictionary are updated. See the typed dictionary TaskUpdate for more details on
             the fields.
+        fields: collection of str
+            Fields of the updated task to be returned, in addition to the id. If None, all the
+            fields.
         """
 
-        # TODO: Check if task exists, otherwise check what happens
-
-        fields = []
-
-        if new_fields.get("title") is not None:
-            fields.append(f"title='{new_fields.get('title')}'")
-        if new_fields.get("description") is not None:
-            fields.append(f"description='{new_fields.get('description')}'")
-        if new_fields.get("date") is not None:
-            fields.append(f"date='{new_fields.get('date')}'")
-        if new_fields.get("start_time") is not None:
-            fields.append(f"start_time='{new_fields.get('start_time')}'")
-        if new_fields.get("end_time") is not None:
-            fields.append(f"end_time='{new_fields.get('end_time')}'")
-        if new_fields.get("goal") is not None:
-            fields.append(f"goal='{new_fields.get('goal')}'")
-        if new_fields.get("status") is not None:
-            fields.append(f"status='{new_fields.get('status')}'")
-
-        fields_str = ", ".join(fields)
-
-        sql_command = f"""UPDATE {self._config.table}
-        SET {fields_str}
-        WHERE id={task_id};"""
-        self._cursor.execute(sql_command)
-        self._mydb.commit()
-
-        task = self.get_task_by_id(task_id)
-        return task
+        updated = [field for field in TASK_FIELDS if new_fields.get(field) is not None]
+        requested = projected_fields(fields)
+
+        with self.__connection() as (_, statements):
+            if updated:
+                values = [new_fields.get(field) for field in updated]
+                cursor = statements.execute(
+                    self.__update_command(updated), values + [task_id]
+                )
+                # The connections count the matched rows, also if no value changed
+                if cursor.rowcount != 1:
+                    raise TaskNotFoundError(task_id)
+                if set(requested) <= set(updated):
+                    return TaskOutput(
+                        id=task_id,
+                        **{
+                            field: _as_read(field, new_fields.get(field))
+                            for field in requested
+                        },
+                    )
+
+            columns = select_columns(fields)
+            sql_command = f"SELECT {columns} FROM {self._config.table} WHERE id = %s"
+            tasks = self.__fetch_tasks(statements.execute(sql_command, (task_id,)))
+
+        if not tasks:
+            raise TaskNotFoundError(task_id)
+        return tasks[0]
+
+    def __update_command(self, fields: list[str]) -> str:
+        """Return the UPDATE statement of a task. Its shape only depends on the fields."""
+
+        fields_str = ", ".join(f"{field} = %s" for field in fields)
+        return f"UPDATE {self._config.table} SET {fields_str} WHERE id = %s"
+
+    def __select_by_ids(
+        self,
+        statements: PreparedStatements,
+        task_ids: list[int],
+        for_update: bool = False,
+    ) -> dict[int, TaskOutput]:
+        """Return the existing tasks among the given ids, indexed by id."""
+
+        tasks: dict[int, TaskOutput] = {}
+        for params in padded_id_chunks(task_ids):
+            placeholders = ", ".join(["%s"] * len(params))
+            sql_command = (
+                f"SELECT * FROM {self._config.table} WHERE id IN ({placeholders})"
+            )
+            if for_update:
+                sql_command += " FOR UPDATE"
+            for task in self.__fetch_tasks(statements.execute(sql_command, params)):
+                tasks[task.id] = task
+        return tasks
+
+    def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks to the database in a single transaction and return them.
+
+        The tasks are inserted by multi-row INSERTs of bounded size, see _insert_batches. The
+        rows of a single INSERT receive ids spaced by the auto_increment_increment of the
+        session, e.g. 3 in a Galera cluster of three nodes, so the added tasks are built
+        without reading them back. The values are bound by the client: a prepared statement
+        would cost a round trip per task.
+
+        Parameters
+        ----------
+        tasks: list of TypedDict (TaskInput)
+            Tasks to be added. See the typed dictionary TaskInput for more details on the fields.
+        """
+
+        if not tasks:
+            return []
+
+        columns = ", ".join(TASK_FIELDS)
+        values_types = ", ".join(["%s"] * len(TASK_FIELDS))
+        sql_command = (
+            f"INSERT INTO {self._config.table} ({columns}) VALUES ({values_types})"
+        )
+        rows = [tuple(task.get(field) for field in TASK_FIELDS) for task in tasks]
+
+        task_ids: list[int] = []
+        with self.__connection(transaction=True) as (connection, _):
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT @@SESSION.auto_increment_increment")
+                ((increment,),) = cursor.fetchall()
+                for batch in _insert_batches(rows):
+                    cursor.executemany(sql_command, batch)
+                    first_id = cursor.getlastrowid()
+                    if first_id is None or cursor.rowcount != len(batch):
+                        raise RuntimeError("Unable to add the tasks to the database")
+                    task_ids.extend(
+                        range(first_id, first_id + len(batch) * increment, increment)
+                    )
+            finally:
+                cursor.close()
+            connection.commit()
+
+        results: list[TaskResult] = []
+        for task_id, task in zip(task_ids, tasks):
+            added_task = TaskOutput(
+                task_id, *(_as_read(field, task.get(field)) for field in TASK_FIELDS)
+            )
+            results.append(TaskResult(task=added_task, error=None))
+        return results
+
+    def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks from the database in a single transaction and return them.
+        The ids that do not exist are reported as errors, the others are removed.
+
+        Parameters
+        ----------
+        task_ids: list of int
+            Ids of the tasks to be removed.
+        """
+
+        if not task_ids:
+            return []
+
+        with self.__connection(transaction=True) as (connection, statements):
+            existing = self.__select_by_ids(statements, task_ids, for_update=True)
+            for params in padded_id_chunks(list(existing)):
+                placeholders = ", ".join(["%s"] * len(params))
+                sql_command = (
+                    f"DELETE FROM {self._config.table} WHERE id IN ({placeholders})"
+                )
+                statements.execute(sql_command, params)
+            connection.commit()
+
+        return [Mysql.__batch_result(existing, task_id) for task_id in task_ids]
+
+    def update_tasks(self, updates: list[tuple[int, TaskUpdate]]) -> list[TaskResult]:
+        """Update several tasks in a single transaction and return the updated tasks.
+        The ids that do not exist are reported as errors, the others are updated.
+
+        Each update is one execution of a prepared statement, shared by the updates changing
+        the same set of fields, so it costs one round trip. Grouping them with executemany
+        would not save any: the connector only batches INSERTs, and runs the other
+        statements one by one.
+
+        Parameters
+        ----------
+        updates: list of tuples (int, TaskUpdate)
+            Id of each task to be updated with the dictionary of the fields to be updated.
+            See update_task for more details.
+        """
+
+        if not updates:
+            return []
+
+        task_ids = [task_id for task_id, _ in updates]
+
+        with self.__connection(transaction=True) as (connection, statements):
+            for task_id, new_fields in updates:
+                fields = [
+                    field for field in TASK_FIELDS if new_fields.get(field) is not None
+                ]
+                if not fields:
+                    continue
+                values = [new_fields.get(field) for field in fields]
+                statements.execute(self.__update_command(fields), values + [task_id])
+            updated = self.__select_by_ids(statements, task_ids)
+            connection.commit()
+
+        return [Mysql.__batch_result(updated, task_id) for task_id in task_ids]
+
+    @staticmethod
+    def __batch_result(tasks: dict[int, TaskOutput], task_id: int) -> TaskResult:
+        if task_id in tasks:
+            return TaskResult(task=tasks[task_id], error=None)
+        return TaskResult(task=None, error=f"No task with id {task_id}")
@@ -0,0 +1,214 @@
+"""Module that contains the versioned migrations of the MySQL schema.
+
+The schema is not created by the DAO, which must start without touching the database: the
+migrations are applied once, out of band, with `poetry run migrate`. The version of each
+tasks table is recorded in the `schema_version` table. Every step is idempotent, so that a
+schema created by an older backend, without versions, is migrated as well.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import mysql.connector.errors
+from mysql.connector import errorcode
+from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
+
+# Seconds to wait for a migration running in another process
+LOCK_TIMEOUT = 60
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Step of the schema, applied to a tasks table of the current database."""
+
+    version: int
+    description: str
+    # Function executing the statements with a cursor, given the name of the table
+    apply: Callable[[MySQLCursorAbstract, str], None]
+
+
+def _index_exists(cursor: MySQLCursorAbstract, table: str, index: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics"
+        " WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s"
+        " LIMIT 1",
+        (table, index),
+    )
+    return bool(cursor.fetchall())
+
+
+def _column_exists(cursor: MySQLCursorAbstract, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns"
+        " WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s"
+        " LIMIT 1",
+        (table, column),
+    )
+    return bool(cursor.fetchall())
+
+
+def _add_index_if_missing(
+    cursor: MySQLCursorAbstract, table: str, index: str, definition: str
+):
+    """Add an index, e.g. `INDEX idx_date (date)`, unless an index has the same name."""
+
+    if not _index_exists(cursor, table, index):
+        logging.info("Adding index %s to table %s", index, table)
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+
+def _add_column_if_missing(
+    cursor: MySQLCursorAbstract, table: str, column: str, definition: str
+):
+    """Add a column, e.g. `goal VARCHAR(255)`, unless the table already has it."""
+
+    if not _column_exists(cursor, table, column):
+        logging.info("Adding column %s to table %s", column, table)
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {definition}")
+
+
+# TODO: Use schema validation using the Task type
+# TODO: Can MySQL use enum for status?
+def _create_tasks_table(cursor: MySQLCursorAbstract, table: str):
+    task_id = "id INT AUTO_INCREMENT PRIMARY KEY"
+    title = "title VARCHAR(255) NOT NULL"
+    description = "description TEXT"
+    date = "date TIMESTAMP"
+    start_time = "start_time TIME"
+    end_time = "end_time TIME"
+    goal = "goal VARCHAR(255)"
+    status = "status VARCHAR(50) NOT NULL"
+    schema = ", ".join(
+        [task_id, title, description, date, start_time, end_time, goal, status]
+    )
+
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({schema})")
+
+
+def _add_filter_indexes(cursor: MySQLCursorAbstract, table: str):
+    # Indexes used by the filters and orderings of get_tasks. InnoDB appends the primary
+    # key to every secondary index, so ties on the date are already sorted by id.
+    _add_index_if_missing(cursor, table, "idx_date", "INDEX idx_date (date)")
+    _add_index_if_missing(
+        cursor, table, "idx_status_date", "INDEX idx_status_date (status, date)"
+    )
+    _add_index_if_missing(
+        cursor, table, "idx_goal_date", "INDEX idx_goal_date (goal, date)"
+    )
+
+
+def _add_search_index(cursor: MySQLCursorAbstract, table: str):
+    # Index of the searches, see Mysql.search_tasks. The first full-text index of a table
+    # rebuilds it, which takes a while on large tables.
+    _add_index_if_missing(
+        cursor,
+        table,
+        "idx_search",
+        "FULLTEXT INDEX idx_search (title, description)",
+    )
+
+
+def _add_schedule_index(cursor: MySQLCursorAbstract, table: str):
+    # Index of the scheduled tasks, see Mysql.get_scheduled_tasks
+    _add_index_if_missing(
+        cursor,
+        table,
+        "idx_date_start_time",
+        "INDEX idx_date_start_time (date, start_time)",
+    )
+
+
+# Steps of the schema, by increasing version. Released steps must never be changed: new
+# ones are appended instead.
+MIGRATIONS = (
+    Migration(1, "Create the tasks table", _create_tasks_table),
+    Migration(2, "Add the indexes of the task filters", _add_filter_indexes),
+    Migration(3, "Add the full-text index of the searches", _add_search_index),
+    Migration(4, "Add the index of the scheduled tasks", _add_schedule_index),
+)
+
+# Version of the schema expected by the DAO
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(cursor: MySQLCursorAbstract, table: str) -> int:
+    """Return the version of the schema of a tasks table of the current database, 0 if no
+    migration was applied.
+    """
+
+    try:
+        cursor.execute(
+            "SELECT MAX(version) FROM schema_version WHERE table_name = %s", (table,)
+        )
+    except mysql.connector.errors.ProgrammingError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return 0
+        raise
+    row = cursor.fetchone()
+    return (row[0] or 0) if row is not None else 0
+
+
+def apply_migrations(
+    connection: MySQLConnectionAbstract, database: str, table: str
+) -> list[Migration]:
+    """Create the database if missing and apply the pending migrations of a tasks table.
+    Return the applied migrations.
+
+    Concurrent runs are serialized by a lock of the MySQL server: a run waiting for another
+    one finds the schema up to date.
+
+    Parameters
+    ----------
+    connection: MySQLConnectionAbstract
+        Connection to the server with the privileges to change the schema, in autocommit.
+    database: str
+        Name of the database, created if missing.
+    table: str
+        Name of the tasks table.
+    """
+
+    cursor = connection.cursor()
+    lock = f"{database}.{table}.migrations"
+    try:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        cursor.execute(f"USE {database}")
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (lock, LOCK_TIMEOUT))
+        (locked,) = cursor.fetchone() or (0,)
+        if locked != 1:
+            raise RuntimeError(f"Another migration of {database}.{table} is running")
+        try:
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS schema_version ("
+                "table_name VARCHAR(64) NOT NULL, "
+                "version INT NOT NULL, "
+                "description VARCHAR(255) NOT NULL, "
+                "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+                "PRIMARY KEY (table_name, version))"
+            )
+            current = schema_version(cursor, table)
+            applied = []
+            for migration in MIGRATIONS:
+                if migration.version <= current:
+                    continue
+                logging.info(
+                    "Applying migration %d to %s.%s: %s",
+                    migration.version,
+                    database,
+                    table,
+                    migration.description,
+                )
+                # MySQL commits the schema changes immediately: a failed step is applied
+                # again, in full, by the next run
+                migration.apply(cursor, table)
+                cursor.execute(
+                    "INSERT INTO schema_version (table_name, version, description)"
+                    " VALUES (%s, %s, %s)",
+                    (table, migration.version, migration.description),
+                )
+                applied.append(migration)
+            return applied
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (lock,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
@@ -0,0 +1,266 @@
+"""Module that contains a thread-safe pool of MySQL connections."""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import threading
+import time
+import mysql.connector.errors
+from mysql.connector.abstracts import MySQLConnectionAbstract
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Snapshot of the state of a connection pool. Useful to tune its size."""
+
+    size: int
+    idle: int
+    in_use: int
+    checkouts: int
+    timeouts: int
+    replaced: int
+    total_wait_time: float
+    max_wait_time: float
+
+
+class ConnectionPool:
+    """Pool of database connections shared among threads.
+
+    No connection is opened when the pool is created: they are opened by the checkouts, up
+    to `max_size`, or by `fill`. When all the connections are in use, a checkout waits up to
+    `timeout` seconds for one to be released.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    _factory: Callable[[], MySQLConnectionAbstract]
+    _min_size: int
+    _max_size: int
+    _timeout: float
+    _health_check: bool
+    _health_check_idle_time: float
+    # Idle connections with the time they were released
+    _idle: list[tuple[MySQLConnectionAbstract, float]]
+    _size: int
+    _closed: bool
+    _condition: threading.Condition
+
+    def __init__(
+        self,
+        factory: Callable[[], MySQLConnectionAbstract],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        health_check: bool = True,
+        health_check_idle_time: float = 0.0,
+    ):
+        """
+        Parameters
+        ----------
+        factory: callable
+            Function that opens a new connection to the database.
+        min_size: int
+            Number of connections opened by `fill`.
+        max_size: int
+            Maximum number of connections open at the same time.
+        timeout: float
+            Seconds a checkout waits for a free connection before failing.
+        health_check: bool
+            If True, connections are pinged on checkout and replaced if broken.
+        health_check_idle_time: float
+            Only the connections idle for longer than these seconds are pinged. A connection
+            released just before is very likely alive, and the ping would cost a round trip.
+        """
+
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}"
+            )
+
+        self._factory = factory
+        self._min_size = min_size
+        self._max_size = max_size
+        self._timeout = timeout
+        self._health_check = health_check
+        self._health_check_idle_time = health_check_idle_time
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._replaced = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def fill(self):
+        """Open the connections missing to reach the minimum size, e.g. before serving the
+        first requests.
+        """
+
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self._min_size:
+                    return
+                self._size += 1
+            connection = self.__open()
+            self.release(connection)
+
+    def acquire(self) -> MySQLConnectionAbstract:
+        """Check out a connection from the pool.
+
+        Raises a PoolError if no connection is available within the timeout.
+        """
+
+        start = time.perf_counter()
+        deadline = start + self._timeout
+        released_at = 0.0
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise mysql.connector.errors.PoolError("Connection pool is closed")
+                if self._idle:
+                    connection, released_at = self._idle.pop()
+                    break
+                if self._size < self._max_size:
+                    # Reserve the slot now and open the connection outside the lock
+                    self._size += 1
+                    connection = None
+                    break
+
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"No connection available within {self._timeout} seconds"
+                    )
+                self._condition.wait(remaining)
+
+            wait_time = time.perf_counter() - start
+            self._checkouts += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+
+        if connection is None:
+            return self.__open()
+
+        idle_time = time.monotonic() - released_at
+        if (
+            self._health_check
+            and idle_time >= self._health_check_idle_time
+            and not self.__is_healthy(connection)
+        ):
+            logging.warning("Discarding broken database connection")
+            self.__close_quietly(connection)
+            with self._condition:
+                self._replaced += 1
+            return self.__open()
+
+        return connection
+
+    def release(self, connection: MySQLConnectionAbstract, discard: bool = False):
+        """Return a connection to the pool.
+
+        Parameters
+        ----------
+        connection: MySQLConnectionAbstract
+            Connection previously returned by `acquire`.
+        discard: bool
+            If True, the connection is closed instead of being reused.
+        """
+
+        if not discard and connection.in_transaction:
+            # A transaction left open, e.g. by a SELECT without autocommit, would keep its
+            # snapshot: the next reads on this connection would miss the commits made through
+            # the others. The flag is tracked by the client, without a round trip.
+            try:
+                connection.rollback()
+            except mysql.connector.errors.Error:
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+                connection = None
+            self._condition.notify()
+
+        if connection is not None:
+            self.__close_quietly(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[MySQLConnectionAbstract]:
+        """Context manager that checks out a connection and returns it to the pool.
+
+        Pending transactions are rolled back if the block raises an exception.
+        """
+
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            discard = False
+            try:
+                connection.rollback()
+            except mysql.connector.errors.Error:
+                discard = True
+            self.release(connection, discard=discard)
+            raise
+        else:
+            self.release(connection)
+
+    def stats(self) -> PoolStats:
+        """Return a snapshot of the pool counters."""
+
+        with self._condition:
+            return PoolStats(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                replaced=self._replaced,
+                total_wait_time=self._total_wait_time,
+                max_wait_time=self._max_wait_time,
+            )
+
+    def close(self):
+        """Close all the idle connections. Connections in use are closed on release."""
+
+        with self._condition:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for connection, _ in idle:
+            self.__close_quietly(connection)
+
+    def __open(self) -> MySQLConnectionAbstract:
+        try:
+            return self._factory()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    @staticmethod
+    def __is_healthy(connection: MySQLConnectionAbstract) -> bool:
+        try:
+            connection.ping(reconnect=False)
+        except mysql.connector.errors.Error:
+            return False
+        return True
+
+    @staticmethod
+    def __close_quietly(connection: MySQLConnectionAbstract):
+        try:
+            connection.close()
+        except mysql.connector.errors.Error:
+            pass
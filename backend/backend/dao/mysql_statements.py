@@ -0,0 +1,103 @@
+"""Module that contains a cache of the server-side prepared statements of a MySQL connection."""
+
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from typing import Any, cast
+import weakref
+from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
+
+
+# A prepared statement has at most 65535 placeholders
+_MAX_IDS = 2**15
+
+
+def padded_id_chunks(task_ids: Sequence[int]) -> Iterator[list[int]]:
+    """Split the ids in chunks, each with the last id repeated up to the next power of two.
+
+    A statement with one placeholder per id then has only a few distinct shapes, which can be
+    prepared once and reused. Repeated ids do not change the result of `id IN (...)`.
+    """
+
+    for start in range(0, len(task_ids), _MAX_IDS):
+        chunk = list(task_ids[start : start + _MAX_IDS])
+        size = 1
+        while size < len(chunk):
+            size *= 2
+        yield chunk + [chunk[-1]] * (size - len(chunk))
+
+
+class PreparedStatements:
+    """Server-side prepared statements of one connection, indexed by statement shape.
+
+    The shape of a statement is its text: the values are always bound to placeholders, so the
+    text only depends on e.g. the selected or updated columns. Each shape is prepared once by
+    the server and then executed with new parameters. When more than `max_size` shapes are
+    used, the least recently used statement is deallocated.
+
+    Like the connection, the cache must be used by one thread at a time.
+    """
+
+    _connection: MySQLConnectionAbstract
+    _max_size: int
+    _dictionary: bool
+    # The prepared cursors reuse their statement only if executed with the same string object,
+    # so the text is stored with the cursor.
+    _cursors: "OrderedDict[str, tuple[str, MySQLCursorAbstract]]"
+
+    def __init__(
+        self,
+        connection: MySQLConnectionAbstract,
+        max_size: int = 64,
+        dictionary: bool = True,
+    ):
+        """
+        Parameters
+        ----------
+        connection: MySQLConnectionAbstract
+            Connection the statements are prepared on. It is not kept alive by the cache.
+        max_size: int
+            Maximum number of statements prepared at the same time.
+        dictionary: bool
+            If True, the rows are returned as dictionaries, otherwise as tuples.
+        """
+
+        if max_size < 1:
+            raise ValueError("The cache must hold at least one statement")
+
+        self._connection = cast(MySQLConnectionAbstract, weakref.proxy(connection))
+        self._max_size = max_size
+        self._dictionary = dictionary
+        self._cursors = OrderedDict()
+
+    def execute(
+        self, statement: str, params: Sequence[Any] = ()
+    ) -> MySQLCursorAbstract:
+        """Execute a statement, preparing it first if needed, and return its cursor.
+
+        The rows of the result must all be fetched before the next execution.
+
+        Parameters
+        ----------
+        statement: str
+            SQL statement with "%s" placeholders.
+        params: sequence
+            Values bound to the placeholders.
+        """
+
+        entry = self._cursors.get(statement)
+        if entry is None:
+            cursor = cast(
+                MySQLCursorAbstract,
+                self._connection.cursor(prepared=True, dictionary=self._dictionary),
+            )
+            entry = (statement, cursor)
+            self._cursors[statement] = entry
+            while len(self._cursors) > self._max_size:
+                _, (_, evicted) = self._cursors.popitem(last=False)
+                evicted.close()
+        else:
+            self._cursors.move_to_end(statement)
+
+        text, cursor = entry
+        cursor.execute(text, tuple(params))
+        return cursor
@@ -0,0 +1,209 @@
+"""Module that contains a DAO decorator notifying the changes made by another DAO."""
+
+from collections.abc import AsyncGenerator, Callable, Collection
+import datetime
+import logging
+from typing import Optional
+from backend.dao.interfaces import (
+    EVENT_ADDED,
+    EVENT_REMOVED,
+    EVENT_UPDATED,
+    ORDER_BY_ID,
+    TASK_FIELDS,
+    AsyncDAO,
+    SearchCursor,
+    TaskCursor,
+    TaskEvent,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+)
+
+Listener = Callable[[list[TaskEvent]], None]
+
+
+def _added_event(task: TaskOutput) -> TaskEvent:
+    return TaskEvent(EVENT_ADDED, task, TASK_FIELDS)
+
+
+def _updated_event(
+    task_id: int, new_fields: TaskUpdate, updated_task: TaskOutput
+) -> TaskEvent:
+    fields = tuple(field for field in TASK_FIELDS if new_fields.get(field) is not None)
+    # The values returned by the DAO have the types of its reads. The updated fields not
+    # returned, because not requested, are taken from the arguments.
+    values = {}
+    for field in fields:
+        value = getattr(updated_task, field)
+        values[field] = new_fields.get(field) if value is None else value
+    return TaskEvent(EVENT_UPDATED, TaskOutput(task_id, **values), fields)
+
+
+def _removed_event(task_id: int) -> TaskEvent:
+    return TaskEvent(EVENT_REMOVED, TaskOutput(task_id), ())
+
+
+class NotifyingDAO:
+    """Implementation of the AsyncDAO protocol that notifies the changes made by another DAO.
+
+    After every successful mutation, the listeners are called on the event loop with the
+    events of the changed tasks, one list per mutation. The events are built from the
+    arguments and the results of the mutation, without extra reads. The listeners must not
+    block: a listener raising an exception is logged and does not fail the mutation.
+    """
+
+    _dao: AsyncDAO
+    _listeners: list[Listener]
+
+    def __init__(self, dao: AsyncDAO, listeners: Optional[list[Listener]] = None):
+        """
+        Parameters
+        ----------
+        dao: class (AsyncDAO)
+            Asynchronous Data Access Object (DAO) to be wrapped.
+        listeners: list of callables
+            Functions called with the events of each mutation. See also add_listener.
+        """
+
+        self._dao = dao
+        self._listeners = list(listeners) if listeners is not None else []
+
+    def add_listener(self, listener: Listener):
+        """Call a function with the events of each following mutation."""
+        self._listeners.append(listener)
+
+    def __notify(self, events: list[TaskEvent]):
+        if not events:
+            return
+        for listener in self._listeners:
+            try:
+                listener(events)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception("Listener of the task events failed")
+
+    async def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database. See DAO.get_task_by_id."""
+        return await self._dao.get_task_by_id(task_id, fields)
+
+    async def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database. See DAO.get_all_tasks."""
+        return await self._dao.get_all_tasks(fields)
+
+    async def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions. See DAO.get_tasks."""
+        return await self._dao.get_tasks(
+            filters, order_by, descending, first, after, fields
+        )
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncGenerator[list[TaskOutput], None]:
+        """Return an asynchronous iterator over the tasks satisfying some conditions, in
+        chunks. See DAO.iter_tasks."""
+        return self._dao.iter_tasks(filters, fields, chunk_size)
+
+    async def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks matching a text, by relevance. See DAO.search_tasks."""
+        return await self._dao.search_tasks(text, first, after, fields)
+
+    async def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled between two moments. See DAO.get_scheduled_tasks."""
+        return await self._dao.get_scheduled_tasks(start, end, fields)
+
+    async def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks, by date, goal and status. See
+        DAO.task_stats."""
+        return await self._dao.task_stats(filters)
+
+    async def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it. See DAO.add_task."""
+        added_task = await self._dao.add_task(task)
+        self.__notify([_added_event(added_task)])
+        return added_task
+
+    async def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it. See DAO.rm_task."""
+        removed_task = await self._dao.rm_task(task_id, fields)
+        self.__notify([_removed_event(task_id)])
+        return removed_task
+
+    async def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return it. See DAO.update_task."""
+        updated_task = await self._dao.update_task(task_id, new_fields, fields)
+        self.__notify([_updated_event(task_id, new_fields, updated_task)])
+        return updated_task
+
+    async def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks in a single transaction. See DAO.add_tasks."""
+        results = await self._dao.add_tasks(tasks)
+        self.__notify(
+            [
+                _added_event(result["task"])
+                for result in results
+                if result["task"] is not None
+            ]
+        )
+        return results
+
+    async def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks in a single transaction. See DAO.rm_tasks."""
+        results = await self._dao.rm_tasks(task_ids)
+        self.__notify(
+            [
+                _removed_event(task_id)
+                for task_id, result in zip(task_ids, results)
+                if result["task"] is not None
+            ]
+        )
+        return results
+
+    async def update_tasks(
+        self, updates: list[tuple[int, TaskUpdate]]
+    ) -> list[TaskResult]:
+        """Update several tasks in a single transaction. See DAO.update_tasks."""
+        results = await self._dao.update_tasks(updates)
+        self.__notify(
+            [
+                _updated_event(task_id, new_fields, result["task"])
+                for (task_id, new_fields), result in zip(updates, results)
+                if result["task"] is not None
+            ]
+        )
+        return results
@@ -0,0 +1,208 @@
+"""Module that contains the full-text index of the DAOs without a search engine."""
+
+import heapq
+import itertools
+import math
+import re
+import unicodedata
+from collections.abc import Iterable
+from typing import Optional
+from backend.dao.interfaces import SearchCursor
+
+# Words shorter than this are not indexed, as by the InnoDB full-text indexes of MySQL
+MIN_WORD_LENGTH = 3
+
+# Default stopwords of the InnoDB full-text indexes, so that all the DAOs match the same words
+STOPWORDS = frozenset(
+    (
+        "a about an are as at be by com de en for from how i in is it la of on or "
+        "that the this to was what when where who will with und www"
+    ).split()
+)
+
+_WORD = re.compile(r"\w+")
+_COMBINING = re.compile("[\u0300-\u036f]")
+
+# Parameters of BM25: saturation of the word frequency and weight of the document length
+_K1 = 1.2
+_B = 0.75
+
+
+def search_terms(text: Optional[str]) -> list[str]:
+    """Return the searchable words of a text: lowercase, without accents, stopwords and
+    short words, in order of appearance and with repetitions.
+    """
+
+    if not text:
+        return []
+    folded = _COMBINING.sub("", unicodedata.normalize("NFKD", text.casefold()))
+    return [
+        word
+        for word in _WORD.findall(folded)
+        if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS
+    ]
+
+
+class SearchIndex:
+    """Inverted index of the words of the tasks, ranking the matches with BM25 as full-text
+    search engines do.
+
+    A search reads only the postings of the searched words, so its cost depends on the
+    number of matching tasks, not on the size of the table. The score of a task for a word
+    depends only on the occurrences of the word and on the length of the task, so it is
+    computed once for each group of tasks with the same ones. The searches of a single word
+    rank the groups without visiting their tasks: their cost hardly grows with the number of
+    matches, even for the most common words. The index is not thread-safe: it is used under
+    the lock of the DAO owning it.
+    """
+
+    # Tasks containing each word, with the number of occurrences
+    _postings: dict[str, dict[int, int]]
+    # Tasks containing each word, grouped by occurrences of the word and length of the task
+    _impacts: dict[str, dict[tuple[int, int], set[int]]]
+    # Distinct words and number of words of each task
+    _documents: dict[int, tuple[tuple[str, ...], int]]
+    _total_length: int
+
+    def __init__(self):
+        self._postings = {}
+        self._impacts = {}
+        self._documents = {}
+        self._total_length = 0
+
+    def add(self, task_id: int, texts: Iterable[Optional[str]]):
+        """Index the words of a task, e.g. of its title and description. A task already in
+        the index must be removed first.
+        """
+
+        counts: dict[str, int] = {}
+        length = 0
+        for text in texts:
+            for term in search_terms(text):
+                counts[term] = counts.get(term, 0) + 1
+                length += 1
+        if not counts:
+            return
+
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[task_id] = count
+            impacts = self._impacts.setdefault(term, {})
+            impacts.setdefault((count, length), set()).add(task_id)
+        self._documents[task_id] = (tuple(counts), length)
+        self._total_length += length
+
+    def remove(self, task_id: int):
+        """Remove a task from the index, if present."""
+
+        document = self._documents.pop(task_id, None)
+        if document is None:
+            return
+        terms, length = document
+        for term in terms:
+            postings = self._postings[term]
+            impacts = self._impacts[term]
+            shape = (postings.pop(task_id), length)
+            impacts[shape].discard(task_id)
+            if not impacts[shape]:
+                del impacts[shape]
+            if not postings:
+                del self._postings[term]
+                del self._impacts[term]
+        self._total_length -= length
+
+    def search(
+        self,
+        terms: list[str],
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+    ) -> list[tuple[int, float]]:
+        """Return the ids and scores of the tasks containing any of the terms, sorted by
+        decreasing score and then by id.
+
+        Parameters
+        ----------
+        terms: list of str
+            Words to search, as returned by search_terms.
+        first: int
+            Maximum number of tasks to return. If None, all the matching tasks.
+        after: TypedDict (SearchCursor)
+            If given, only the tasks following this position are returned.
+        """
+
+        if not self._documents:
+            return []
+        count = len(self._documents)
+        norm = _K1 * (1 - _B)
+        slope = _K1 * _B * count / self._total_length
+
+        def weight(term: str) -> float:
+            matching = len(self._postings[term])
+            idf = math.log(1 + (count - matching + 0.5) / (matching + 0.5))
+            return idf * (_K1 + 1)
+
+        # Words in the index, always in the same order, so that equal scores compare equal in
+        # the cursors
+        terms = sorted(term for term in set(terms) if term in self._postings)
+        if not terms:
+            return []
+        if len(terms) == 1:
+            return self.__search_term(terms[0], weight(terms[0]), first, after)
+
+        scores: dict[int, float] = {}
+        for term in terms:
+            term_weight = weight(term)
+            for (occurrences, length), task_ids in self._impacts[term].items():
+                score = term_weight * occurrences
+                score /= occurrences + norm + slope * length
+                for task_id in task_ids:
+                    scores[task_id] = scores.get(task_id, 0.0) + score
+
+        matches: Iterable[tuple[float, int]] = (
+            (-score, task_id) for task_id, score in scores.items()
+        )
+        if after is not None:
+            bound = (-after["score"], after["id"])
+            matches = [match for match in matches if match > bound]
+        if first is None:
+            ranked = sorted(matches)
+        else:
+            ranked = heapq.nsmallest(first, matches)
+        return [(task_id, -score) for score, task_id in ranked]
+
+    def __search_term(
+        self,
+        term: str,
+        term_weight: float,
+        first: Optional[int],
+        after: Optional[SearchCursor],
+    ) -> list[tuple[int, float]]:
+        """Search a single word, ranking the groups of tasks with the same score."""
+
+        norm = _K1 * (1 - _B)
+        slope = _K1 * _B * len(self._documents) / self._total_length
+
+        # Different groups may have the same score: their tasks are sorted together by id
+        groups: dict[float, list[set[int]]] = {}
+        for (occurrences, length), task_ids in self._impacts[term].items():
+            # Same operations as the searches of several words, for the same scores
+            score = term_weight * occurrences
+            score /= occurrences + norm + slope * length
+            if after is not None and score > after["score"]:
+                continue
+            groups.setdefault(score, []).append(task_ids)
+
+        matches: list[tuple[int, float]] = []
+        for score in sorted(groups, reverse=True):
+            task_ids: Iterable[int] = itertools.chain.from_iterable(groups[score])
+            if after is not None and score == after["score"]:
+                task_ids = [task_id for task_id in task_ids if task_id > after["id"]]
+            if first is None:
+                matches.extend((task_id, score) for task_id in sorted(task_ids))
+                continue
+            needed = first - len(matches)
+            if needed <= 0:
+                break
+            matches.extend(
+                (task_id, score) for task_id in heapq.nsmallest(needed, task_ids)
+            )
+        return matches
@@ -0,0 +1,217 @@
+"""Module with the SQL statements shared by the DAO implementations based on SQL databases"""
+
+from collections.abc import Collection
+from datetime import datetime, timedelta
+from typing import Optional
+from backend.dao.interfaces import (
+    ORDER_BY_DATE,
+    ORDER_BY_ID,
+    TaskCursor,
+    TaskFilter,
+    projected_fields,
+)
+
+
+def select_columns(fields: Optional[Collection[str]]) -> str:
+    """Return the column list of a SELECT returning the id and the given fields of the tasks.
+
+    Parameters
+    ----------
+    fields: collection of str
+        Fields of the tasks, see DAO.get_task_by_id. If None, all the columns.
+    """
+
+    if fields is None:
+        return "*"
+    return ", ".join(("id",) + projected_fields(fields))
+
+
+def build_select_tasks(
+    table: str,
+    filters: TaskFilter,
+    order_by: str = ORDER_BY_ID,
+    descending: bool = False,
+    first: Optional[int] = None,
+    after: Optional[TaskCursor] = None,
+    placeholder: str = "%s",
+    fields: Optional[Collection[str]] = None,
+) -> tuple[str, list]:
+    """Return the SELECT statement and its parameters for DAO.get_tasks.
+
+    Pagination uses the sorting keys of the last returned task (keyset pagination), so that
+    deep pages are as fast as the first one.
+
+    Parameters
+    ----------
+    table: str
+        Name of the tasks table.
+    filters, order_by, descending, first, after, fields:
+        See DAO.get_tasks.
+    placeholder: str
+        Parameter marker of the database driver, e.g. "%s" for MySQL and "?" for SQLite.
+    """
+
+    if order_by not in (ORDER_BY_ID, ORDER_BY_DATE):
+        raise ValueError(f"Unknown ordering '{order_by}'")
+    if first is not None and first < 0:
+        raise ValueError("The number of tasks to return must not be negative")
+
+    conditions, params = _filter_conditions(filters)
+
+    if after is not None:
+        condition, condition_params = _keyset_condition(order_by, descending, after)
+        conditions.append(condition)
+        params.extend(condition_params)
+
+    direction = "DESC" if descending else "ASC"
+    if order_by == ORDER_BY_DATE:
+        ordering = f"date {direction}, id {direction}"
+    else:
+        ordering = f"id {direction}"
+
+    sql_command = f"SELECT {select_columns(fields)} FROM {table}"
+    if conditions:
+        sql_command += " WHERE " + " AND ".join(conditions)
+    sql_command += f" ORDER BY {ordering}"
+    if first is not None:
+        sql_command += " LIMIT %s"
+        params.append(first)
+
+    return sql_command.replace("%s", placeholder), params
+
+
+def build_select_schedule(
+    table: str,
+    start: datetime,
+    end: datetime,
+    placeholder: str = "%s",
+    fields: Optional[Collection[str]] = None,
+) -> tuple[str, list]:
+    """Return the SELECT statement and its parameters for DAO.get_scheduled_tasks.
+
+    A task lasts at most a day, so only the days of the interval are read. The columns are
+    compared as they are, without functions, so that the range of days is read in the order
+    of the index on (date, start_time), which also holds the start times checked on the
+    last day. The end times are checked on the rows of the first day.
+
+    Parameters
+    ----------
+    table: str
+        Name of the tasks table.
+    start, end, fields:
+        See DAO.get_scheduled_tasks.
+    placeholder: str
+        Parameter marker of the database driver, e.g. "%s" for MySQL and "?" for SQLite.
+    """
+
+    # The days are stored at midnight, so the tasks of a day have the date equal to it
+    first_day, last_day = start.date(), end.date()
+    conditions = [
+        "date >= %s",
+        "date <= %s",
+        "(date < %s OR (date = %s AND start_time < %s))",
+        "(date > %s OR end_time > %s)",
+        "end_time >= start_time",
+    ]
+    params: list = [
+        first_day,
+        last_day,
+        last_day,
+        last_day,
+        end.time(),
+        first_day,
+        start.time(),
+    ]
+    sql_command = (
+        f"SELECT {select_columns(fields)} FROM {table}"
+        f" WHERE {' AND '.join(conditions)}"
+        " ORDER BY date, start_time, id"
+    )
+    return sql_command.replace("%s", placeholder), params
+
+
+def build_task_stats(
+    table: str,
+    filters: TaskFilter,
+    day: str = "DATE(date)",
+    seconds: str = "TIME_TO_SEC(%s)",
+    placeholder: str = "%s",
+) -> tuple[str, list]:
+    """Return the SELECT statement and its parameters for DAO.task_stats.
+
+    The rows have the columns of TaskStats, with the same names and order. The durations are summed by
+    the database, so that only one row per group is returned.
+
+    Parameters
+    ----------
+    table: str
+        Name of the tasks table.
+    filters:
+        See DAO.task_stats.
+    day: str
+        Expression of the day of the `date` column, by default for a MySQL timestamp.
+    seconds: str
+        Expression of the whole seconds since midnight of a time column, in which "%s"
+        stands for the column, by default for MySQL.
+    placeholder: str
+        Parameter marker of the database driver, e.g. "%s" for MySQL and "?" for SQLite.
+    """
+
+    conditions, params = _filter_conditions(filters)
+    timed = "end_time >= start_time"
+    duration = f"{seconds % 'end_time'} - {seconds % 'start_time'}"
+    sql_command = (
+        f"SELECT {day} AS date, goal, status, COUNT(*) AS count,"
+        f" COUNT(CASE WHEN {timed} THEN 1 END) AS timed,"
+        f" COALESCE(SUM(CASE WHEN {timed} THEN {duration} END), 0) AS duration"
+        f" FROM {table}"
+    )
+    if conditions:
+        sql_command += " WHERE " + " AND ".join(conditions)
+    sql_command += " GROUP BY 1, 2, 3"
+
+    return sql_command.replace("%s", placeholder), params
+
+
+def _filter_conditions(filters: TaskFilter) -> tuple[list[str], list]:
+    """Return the WHERE conditions of a TaskFilter and their parameters."""
+
+    conditions: list[str] = []
+    params: list = []
+
+    if filters.get("status") is not None:
+        conditions.append("status = %s")
+        params.append(filters["status"])
+    if filters.get("goal") is not None:
+        conditions.append("goal = %s")
+        params.append(filters["goal"])
+    if filters.get("date_from") is not None:
+        conditions.append("date >= %s")
+        params.append(filters["date_from"])
+    if filters.get("date_to") is not None:
+        # The column may be a timestamp: include the whole last day
+        conditions.append("date < %s")
+        params.append(filters["date_to"] + timedelta(days=1))
+    return conditions, params
+
+
+def _keyset_condition(
+    order_by: str, descending: bool, after: TaskCursor
+) -> tuple[str, list]:
+    """Return the WHERE condition selecting the rows that follow a cursor."""
+
+    comparison = "<" if descending else ">"
+
+    if order_by == ORDER_BY_ID:
+        return f"id {comparison} %s", [after["id"]]
+
+    # MySQL and SQLite sort NULL dates before all the others in ascending order and after all
+    # the others in descending order.
+    if after["date"] is None:
+        if descending:
+            return "(date IS NULL AND id < %s)", [after["id"]]
+        return "((date IS NULL AND id > %s) OR date IS NOT NULL)", [after["id"]]
+
+    condition = f"(date {comparison} %s OR (date = %s AND id {comparison} %s)"
+    condition += " OR date IS NULL)" if descending else ")"
+    return condition, [after["date"], after["date"], after["id"]]
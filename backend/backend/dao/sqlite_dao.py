@@ -0,0 +1,672 @@
+"""Module that contains the DAO implementation based on SQLite"""
+
+from collections.abc import Collection, Generator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import datetime
+import logging
+import sqlite3
+import threading
+from typing import Any, Optional
+from backend.dao.interfaces import (
+    ORDER_BY_ID,
+    TASK_FIELDS,
+    SearchCursor,
+    TaskCursor,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskNotFoundError,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+    projected_fields,
+)
+from backend.dao.search_index import search_terms
+from backend.dao.sql_queries import (
+    build_select_schedule,
+    build_select_tasks,
+    build_task_stats,
+    select_columns,
+)
+
+
+@dataclass
+class SqliteConfig:
+    """Configuration for the SQLite database."""
+
+    # Path of the database file. In-memory databases are not supported, because every
+    # thread opens its own connection.
+    path: str = "tasks.db"
+    # Seconds a writer waits for the database lock before failing
+    timeout: float = 5.0
+    # Number of prepared statements kept by each connection
+    cached_statements: int = 128
+    table = "tasks"
+
+
+# Lowest limit on the number of parameters of a statement among the SQLite versions
+_MAX_PARAMETERS = 999
+
+
+def _adapt(value: Any) -> Any:
+    """Convert a parameter to the text format used to store dates and times."""
+
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+class Sqlite:
+    """Implementation of the DAO using SQLite as database.
+
+    The database uses write-ahead logging (WAL), so readers do not block the writer and the
+    writer does not block readers. Every thread opens its own connection, so concurrent
+    requests served by different threads read in parallel. Statements always have the same
+    text for the same shape of query, so each connection reuses its prepared statements.
+    """
+
+    _config: SqliteConfig
+    _local: threading.local
+    _connections: list[sqlite3.Connection]
+    _lock: threading.Lock
+
+    def __init__(self, config: SqliteConfig):
+        if config.path == ":memory:" or config.path.startswith("file::memory:"):
+            raise ValueError("In-memory SQLite databases are not supported")
+
+        self._config = config
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        logging.info("Opening SQLite database '%s'", self._config.path)
+        with self.__transaction() as connection:
+            mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode != "wal":
+                logging.warning("Unable to enable WAL mode, using '%s'", mode)
+            self.__create_tasks_table(connection)
+
+    def __connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._config.path,
+                timeout=self._config.timeout,
+                cached_statements=self._config.cached_statements,
+                # Only used by this thread, but closed by the thread calling close()
+                check_same_thread=False,
+            )
+            connection.row_factory = sqlite3.Row
+            # Safe with WAL: a crash can lose the last transactions, but not corrupt data
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def __transaction(self) -> Iterator[sqlite3.Connection]:
+        """Return the connection of the current thread. Commit at the end of the block, or
+        roll back if it raises an exception."""
+
+        connection = self.__connection()
+        with connection:
+            yield connection
+
+    # Same columns as the table created by the MySQL migrations, see mysql_migrations
+    def __create_tasks_table(self, connection: sqlite3.Connection):
+        task_id = "id INTEGER PRIMARY KEY AUTOINCREMENT"
+        title = "title VARCHAR(255) NOT NULL"
+        description = "description TEXT"
+        date = "date TIMESTAMP"
+        start_time = "start_time TIME"
+        end_time = "end_time TIME"
+        goal = "goal VARCHAR(255)"
+        status = "status VARCHAR(50) NOT NULL"
+        schema = ", ".join(
+            [task_id, title, description, date, start_time, end_time, goal, status]
+        )
+
+        table = self._config.table
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({schema})")
+        connection.execute(f"CREATE INDEX IF NOT EXISTS idx_date ON {table} (date)")
+        connection.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_status_date ON {table} (status, date)"
+        )
+        connection.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_goal_date ON {table} (goal, date)"
+        )
+        connection.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_date_start_time"
+            f" ON {table} (date, start_time)"
+        )
+        self.__create_search_table(connection)
+
+    def __create_search_table(self, connection: sqlite3.Connection):
+        """Create the full-text index of the titles and descriptions, an FTS5 table kept up
+        to date by triggers. It is filled with the existing tasks when created."""
+
+        table = self._config.table
+        search = f"{table}_search"
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (search,)
+        ).fetchone()
+        # The index only stores the words: the texts are read from the tasks table
+        connection.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {search} USING fts5("
+            f"title, description, content='{table}', content_rowid='id')"
+        )
+        insert = (
+            f"INSERT INTO {search} (rowid, title, description)"
+            " VALUES (new.id, new.title, new.description);"
+        )
+        delete = (
+            f"INSERT INTO {search} ({search}, rowid, title, description)"
+            " VALUES ('delete', old.id, old.title, old.description);"
+        )
+        connection.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {search}_insert AFTER INSERT ON {table}"
+            f" BEGIN {insert} END"
+        )
+        connection.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {search}_delete AFTER DELETE ON {table}"
+            f" BEGIN {delete} END"
+        )
+        connection.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {search}_update"
+            f" AFTER UPDATE OF title, description ON {table}"
+            f" BEGIN {delete} {insert} END"
+        )
+        if not exists:
+            connection.execute(f"INSERT INTO {search} ({search}) VALUES ('rebuild')")
+
+    def close(self):
+        """Close the connections of all the threads."""
+
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            connection.close()
+
+    @staticmethod
+    def convert_sql_to_task(row: sqlite3.Row) -> TaskOutput:
+        """Convert a Task as stored in the database to the internal task representation.
+
+        Dates and times are stored as ISO strings and converted back to objects.
+
+        Parameters
+        ----------
+        row: sqlite3.Row
+            Task data as returned by SQLite.
+        """
+
+        fields = dict(zip(row.keys(), row))
+        if fields.get("date") is not None:
+            fields["date"] = datetime.date.fromisoformat(fields["date"])
+        if fields.get("start_time") is not None:
+            fields["start_time"] = datetime.time.fromisoformat(fields["start_time"])
+        if fields.get("end_time") is not None:
+            fields["end_time"] = datetime.time.fromisoformat(fields["end_time"])
+
+        task = TaskOutput(**fields)
+        return task
+
+    def __select_by_ids(
+        self, connection: sqlite3.Connection, task_ids: list[int]
+    ) -> dict[int, TaskOutput]:
+        """Return the existing tasks among the given ids, indexed by id."""
+
+        tasks: dict[int, TaskOutput] = {}
+        # Stay below the maximum number of parameters of a statement
+        for start in range(0, len(task_ids), _MAX_PARAMETERS):
+            chunk = list(task_ids[start : start + _MAX_PARAMETERS])
+            placeholders = ", ".join(["?"] * len(chunk))
+            sql_command = (
+                f"SELECT * FROM {self._config.table} WHERE id IN ({placeholders})"
+            )
+            for row in connection.execute(sql_command, chunk).fetchall():
+                task = Sqlite.convert_sql_to_task(row)
+                tasks[task.id] = task
+        return tasks
+
+    def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database.
+        Parameters
+        ----------
+        task_id: int
+            Id of the task to be retrieved.
+        fields: collection of str
+            Fields of the task to be returned, in addition to the id. If None, all the fields.
+        """
+
+        columns = select_columns(fields)
+        sql_command = f"SELECT {columns} FROM {self._config.table} WHERE id = ?"
+        row = self.__connection().execute(sql_command, (task_id,)).fetchone()
+        if row is None:
+            raise TaskNotFoundError(task_id)
+        return Sqlite.convert_sql_to_task(row)
+
+    def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database.
+
+        Parameters
+        ----------
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        columns = select_columns(fields)
+        sql_command = f"SELECT {columns} FROM {self._config.table}"
+        rows = self.__connection().execute(sql_command).fetchall()
+        return [Sqlite.convert_sql_to_task(row) for row in rows]
+
+    def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions, sorted and paginated.
+
+        Filters, ordering and pagination are all executed by SQLite. See build_select_tasks
+        for the statement.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        order_by: str
+            Sorting key, either ORDER_BY_ID or ORDER_BY_DATE. Ties are broken by id.
+        descending: bool
+            If True, the tasks are sorted in descending order.
+        first: int
+            Maximum number of tasks to return. If None, all the tasks are returned.
+        after: TypedDict (TaskCursor)
+            If given, only the tasks following this position in the sorted list are returned.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        sql_command, params = build_select_tasks(
+            self._config.table,
+            filters,
+            order_by,
+            descending,
+            first,
+            after,
+            placeholder="?",
+            fields=fields,
+        )
+        params = [_adapt(param) for param in params]
+        rows = self.__connection().execute(sql_command, params).fetchall()
+        return [Sqlite.convert_sql_to_task(row) for row in rows]
+
+    def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Generator[list[TaskOutput], None, None]:
+        """Return an iterator over the tasks satisfying some conditions, sorted by id.
+
+        The rows are fetched in chunks from a single statement, which reads a consistent
+        snapshot of the database. The statement runs on a dedicated connection, because the
+        chunks may be requested by different threads.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the returned tasks must satisfy. See TaskFilter for more details.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        chunk_size: int
+            Maximum number of tasks in each list yielded by the iterator.
+        """
+
+        if chunk_size < 1:
+            raise ValueError("The chunks must hold at least one task")
+
+        sql_command, params = build_select_tasks(
+            self._config.table, filters, placeholder="?", fields=fields
+        )
+        params = [_adapt(param) for param in params]
+        connection = sqlite3.connect(
+            self._config.path, timeout=self._config.timeout, check_same_thread=False
+        )
+        try:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.execute(sql_command, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [Sqlite.convert_sql_to_task(row) for row in rows]
+        finally:
+            connection.close()
+
+    def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks whose title or description contain words of a text, sorted by
+        decreasing relevance and then by id.
+
+        The words are looked up in the FTS5 index of the table, which ranks the matches with
+        BM25. The score of a task is the opposite of its rank. See DAO.search_tasks.
+
+        Parameters
+        ----------
+        text: str
+            Words to be searched. A task matches if it contains any of them.
+        first: int
+            Maximum number of tasks to return. If None, all the matching tasks are returned.
+        after: TypedDict (SearchCursor)
+            If given, only the tasks following this position in the results are returned.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        if first is not None and first < 0:
+            raise ValueError("The number of tasks to return must not be negative")
+
+        projected_fields(fields)
+        terms = search_terms(text)
+        if not terms:
+            return []
+
+        search = f"{self._config.table}_search"
+        # Every word is quoted, so that it is never read as an operator of FTS5
+        query = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        sql_command = (
+            f"SELECT id, score FROM (SELECT rowid AS id, -bm25({search}) AS score"
+            f" FROM {search} WHERE {search} MATCH ?)"
+        )
+        params: list = [query]
+        if after is not None:
+            sql_command += " WHERE score < ? OR (score = ? AND id > ?)"
+            params.extend([after["score"], after["score"], after["id"]])
+        sql_command += " ORDER BY score DESC, id"
+        if first is not None:
+            sql_command += " LIMIT ?"
+            params.append(first)
+
+        connection = self.__connection()
+        matches = connection.execute(sql_command, params).fetchall()
+        tasks = self.__select_by_ids(connection, [row["id"] for row in matches])
+        # The tasks removed in between are skipped
+        return [
+            TaskMatch(tasks[row["id"]], row["score"])
+            for row in matches
+            if row["id"] in tasks
+        ]
+
+    def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled at some time between two moments, sorted by date,
+        start time and id.
+
+        The tasks of the days of the interval are read from the index on the date and the
+        start time. See build_select_schedule and DAO.get_scheduled_tasks.
+
+        Parameters
+        ----------
+        start: datetime.datetime
+            Moment from which the tasks are returned, included.
+        end: datetime.datetime
+            Moment until which the tasks are returned, excluded.
+        fields: collection of str
+            Fields of the tasks to be returned, in addition to the id. If None, all the fields.
+        """
+
+        sql_command, params = build_select_schedule(
+            self._config.table, start, end, placeholder="?", fields=fields
+        )
+        # The ISO strings of the dates and of the times compare as the values they represent
+        params = [_adapt(param) for param in params]
+        rows = self.__connection().execute(sql_command, params).fetchall()
+        return [Sqlite.convert_sql_to_task(row) for row in rows]
+
+    def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks satisfying some conditions,
+        grouped by date, goal and status.
+
+        The groups are computed by SQLite, with the indexes of the filters. See
+        DAO.task_stats.
+
+        Parameters
+        ----------
+        filters: TypedDict (TaskFilter)
+            Conditions the counted tasks must satisfy. See TaskFilter for more details.
+        """
+
+        sql_command, params = build_task_stats(
+            self._config.table,
+            filters,
+            # The dates and times are stored as ISO strings
+            day="date",
+            seconds="CAST(round((julianday(time(%s)) - julianday('00:00')) * 86400) AS INT)",
+            placeholder="?",
+        )
+        params = [_adapt(param) for param in params]
+        rows = self.__connection().execute(sql_command, params).fetchall()
+        return [
+            TaskStats(
+                datetime.date.fromisoformat(date) if date is not None else None,
+                goal,
+                status,
+                count,
+                timed,
+                duration,
+            )
+            for date, goal, status, count, timed, duration in rows
+        ]
+
+    def __insert_command(self) -> str:
+        columns = ", ".join(TASK_FIELDS)
+        values_types = ", ".join(["?"] * len(TASK_FIELDS))
+        return f"INSERT INTO {self._config.table} ({columns}) VALUES ({values_types})"
+
+    def __insert(self, connection: sqlite3.Connection, task: TaskInput) -> int:
+        values = [_adapt(task.get(field)) for field in TASK_FIELDS]
+        cursor = connection.execute(self.__insert_command(), values)
+        if cursor.lastrowid is None:
+            raise RuntimeError("Unable to add key to the database")
+        return cursor.lastrowid
+
+    def __update(
+        self, connection: sqlite3.Connection, task_id: int, new_fields: TaskUpdate
+    ) -> Optional[bool]:
+        """Update a task and return whether it exists, or None if there is nothing to update."""
+
+        fields = [field for field in TASK_FIELDS if new_fields.get(field) is not None]
+        if not fields:
+            return None
+        fields_str = ", ".join(f"{field} = ?" for field in fields)
+        sql_command = f"UPDATE {self._config.table} SET {fields_str} WHERE id = ?"
+        values = [_adapt(new_fields.get(field)) for field in fields]
+        return connection.execute(sql_command, values + [task_id]).rowcount == 1
+
+    def __delete(self, connection: sqlite3.Connection, task_ids: list[int]):
+        for start in range(0, len(task_ids), _MAX_PARAMETERS):
+            chunk = task_ids[start : start + _MAX_PARAMETERS]
+            placeholders = ", ".join(["?"] * len(chunk))
+            sql_command = (
+                f"DELETE FROM {self._config.table} WHERE id IN ({placeholders})"
+            )
+            connection.execute(sql_command, chunk)
+
+    def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it.
+
+        Parameters
+        ----------
+        task: TypedDict (TaskInput)
+            Dictionary containing the information about the new task.
+            See the typed dictionary TaskInput for more details on the fields.
+        """
+
+        with self.__transaction() as connection:
+            task_id = self.__insert(connection, task)
+        added_task = TaskOutput(task_id, *(task.get(field) for field in TASK_FIELDS))
+        return added_task
+
+    def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it.
+
+        Parameters
+        ----------
+        task_id: int
+            Id of the task to be removed.
+        fields: collection of str
+            Fields of the removed task to be returned, in addition to the id. If None, all the
+            fields.
+        """
+
+        columns = select_columns(fields)
+        select_command = f"SELECT {columns} FROM {self._config.table} WHERE id = ?"
+        delete_command = f"DELETE FROM {self._config.table} WHERE id = ?"
+        with self.__transaction() as connection:
+            row = connection.execute(select_command, (task_id,)).fetchone()
+            if row is None:
+                raise TaskNotFoundError(task_id)
+            connection.execute(delete_command, (task_id,))
+        return Sqlite.convert_sql_to_task(row)
+
+    def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return the updated task.
+
+        If all the requested fields are updated, the task is built from the new values
+        without reading it back.
+
+        Parameters
+        ----------
+        task_id: int
+            Id of the task to be updated.
+        new_fields: TypedDict (TaskUpdate)
+            Dictionary with the fields to be updated. All and only the fields in the
+            dictionary are updated. See the typed dictionary TaskUpdate for more details on
+            the fields.
+        fields: collection of str
+            Fields of the updated task to be returned, in addition to the id. If None, all the
+            fields.
+        """
+
+        requested = projected_fields(fields)
+        columns = select_columns(fields)
+        sql_command = f"SELECT {columns} FROM {self._config.table} WHERE id = ?"
+        with self.__transaction() as connection:
+            exists = self.__update(connection, task_id, new_fields)
+            if exists is False:
+                raise TaskNotFoundError(task_id)
+            if exists and all(new_fields.get(field) is not None for field in requested):
+                return TaskOutput(
+                    id=task_id,
+                    **{field: new_fields.get(field) for field in requested},
+                )
+            row = connection.execute(sql_command, (task_id,)).fetchone()
+        if row is None:
+            raise TaskNotFoundError(task_id)
+        return Sqlite.convert_sql_to_task(row)
+
+    def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks to the database in a single transaction and return them.
+        All the tasks are inserted by a single prepared statement.
+
+        Parameters
+        ----------
+        tasks: list of TypedDict (TaskInput)
+            Tasks to be added. See the typed dictionary TaskInput for more details on the fields.
+        """
+
+        if not tasks:
+            return []
+
+        rows = [[_adapt(task.get(field)) for field in TASK_FIELDS] for task in tasks]
+        with self.__transaction() as connection:
+            connection.executemany(self.__insert_command(), rows)
+            # The transaction holds the write lock: the ids are consecutive
+            last_id = connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        # Built from the given fields, without reading them back
+        first_id = last_id - len(tasks) + 1
+        return [
+            TaskResult(
+                task=TaskOutput(task_id, *(task.get(field) for field in TASK_FIELDS)),
+                error=None,
+            )
+            for task_id, task in enumerate(tasks, start=first_id)
+        ]
+
+    def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks from the database in a single transaction and return them.
+        The ids that do not exist are reported as errors, the others are removed.
+
+        Parameters
+        ----------
+        task_ids: list of int
+            Ids of the tasks to be removed.
+        """
+
+        if not task_ids:
+            return []
+
+        with self.__transaction() as connection:
+            existing = self.__select_by_ids(connection, task_ids)
+            if existing:
+                self.__delete(connection, list(existing))
+
+        return [Sqlite.__batch_result(existing, task_id) for task_id in task_ids]
+
+    def update_tasks(self, updates: list[tuple[int, TaskUpdate]]) -> list[TaskResult]:
+        """Update several tasks in a single transaction and return the updated tasks.
+        The ids that do not exist are reported as errors, the others are updated.
+
+        Parameters
+        ----------
+        updates: list of tuples (int, TaskUpdate)
+            Id of each task to be updated with the dictionary of the fields to be updated.
+            See update_task for more details.
+        """
+
+        if not updates:
+            return []
+
+        task_ids = [task_id for task_id, _ in updates]
+        with self.__transaction() as connection:
+            for task_id, new_fields in updates:
+                self.__update(connection, task_id, new_fields)
+            updated = self.__select_by_ids(connection, task_ids)
+
+        return [Sqlite.__batch_result(updated, task_id) for task_id in task_ids]
+
+    @staticmethod
+    def __batch_result(tasks: dict[int, TaskOutput], task_id: int) -> TaskResult:
+        if task_id in tasks:
+            return TaskResult(task=tasks[task_id], error=None)
+        return TaskResult(task=None, error=f"No task with id {task_id}")
@@ -0,0 +1,173 @@
+"""Module that contains an adapter exposing a blocking DAO through the AsyncDAO protocol."""
+
+import asyncio
+from collections.abc import AsyncGenerator, Collection
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import datetime
+import functools
+from typing import Callable, Optional, TypeVar
+from backend.dao.interfaces import (
+    DAO,
+    ORDER_BY_ID,
+    SearchCursor,
+    TaskCursor,
+    TaskFilter,
+    TaskInput,
+    TaskMatch,
+    TaskOutput,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+)
+
+T = TypeVar("T")
+
+
+class ThreadedDAO:
+    """Implementation of the AsyncDAO protocol that runs a blocking DAO in worker threads.
+
+    The calls to the wrapped DAO are offloaded to a bounded thread pool, so that the event
+    loop keeps serving other requests while a query is waiting for the database. The number
+    of threads should match the number of connections the wrapped DAO can use concurrently.
+    """
+
+    _dao: DAO
+    _executor: ThreadPoolExecutor
+
+    def __init__(self, dao: DAO, max_workers: int = 10):
+        """
+        Parameters
+        ----------
+        dao: class (DAO)
+            Blocking Data Access Object (DAO) to be wrapped.
+        max_workers: int
+            Maximum number of DAO calls running at the same time.
+        """
+
+        self._dao = dao
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="dao"
+        )
+
+    @property
+    def dao(self) -> DAO:
+        """The wrapped blocking DAO."""
+        return self._dao
+
+    async def __run(self, function: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(function, *args, **kwargs)
+        # The call sees the context variables of the caller, e.g. the trace of the request
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, call)
+
+    async def get_task_by_id(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Return a specific task from the database. See DAO.get_task_by_id."""
+        return await self.__run(self._dao.get_task_by_id, task_id, fields)
+
+    async def get_all_tasks(
+        self, fields: Optional[Collection[str]] = None
+    ) -> list[TaskOutput]:
+        """Return all the tasks in the database. See DAO.get_all_tasks."""
+        return await self.__run(self._dao.get_all_tasks, fields)
+
+    async def get_tasks(
+        self,
+        filters: TaskFilter,
+        order_by: str = ORDER_BY_ID,
+        descending: bool = False,
+        first: Optional[int] = None,
+        after: Optional[TaskCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks satisfying some conditions. See DAO.get_tasks."""
+        return await self.__run(
+            self._dao.get_tasks, filters, order_by, descending, first, after, fields
+        )
+
+    async def iter_tasks(
+        self,
+        filters: TaskFilter,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncGenerator[list[TaskOutput], None]:
+        """Return an asynchronous iterator over the tasks satisfying some conditions, in
+        chunks. See DAO.iter_tasks.
+
+        Every chunk is read by a worker thread, which is free again between two chunks. The
+        blocking iterator is closed when this one is, also if it is not exhausted.
+        """
+
+        iterator = self._dao.iter_tasks(filters, fields, chunk_size)
+        try:
+            while True:
+                chunk = await self.__run(next, iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await self.__run(iterator.close)
+
+    async def search_tasks(
+        self,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[SearchCursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskMatch]:
+        """Return the tasks matching a text, by relevance. See DAO.search_tasks."""
+        return await self.__run(self._dao.search_tasks, text, first, after, fields)
+
+    async def get_scheduled_tasks(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        fields: Optional[Collection[str]] = None,
+    ) -> list[TaskOutput]:
+        """Return the tasks scheduled between two moments. See DAO.get_scheduled_tasks."""
+        return await self.__run(self._dao.get_scheduled_tasks, start, end, fields)
+
+    async def task_stats(self, filters: TaskFilter) -> list[TaskStats]:
+        """Return the number and the duration of the tasks, by date, goal and status. See
+        DAO.task_stats."""
+        return await self.__run(self._dao.task_stats, filters)
+
+    async def add_task(self, task: TaskInput) -> TaskOutput:
+        """Add a new task to the database and return it. See DAO.add_task."""
+        return await self.__run(self._dao.add_task, task)
+
+    async def rm_task(
+        self, task_id: int, fields: Optional[Collection[str]] = None
+    ) -> TaskOutput:
+        """Remove a task from the database and return it. See DAO.rm_task."""
+        return await self.__run(self._dao.rm_task, task_id, fields)
+
+    async def update_task(
+        self,
+        task_id: int,
+        new_fields: TaskUpdate,
+        fields: Optional[Collection[str]] = None,
+    ) -> TaskOutput:
+        """Update a task in the database and return it. See DAO.update_task."""
+        return await self.__run(self._dao.update_task, task_id, new_fields, fields)
+
+    async def add_tasks(self, tasks: list[TaskInput]) -> list[TaskResult]:
+        """Add several tasks in a single transaction. See DAO.add_tasks."""
+        return await self.__run(self._dao.add_tasks, tasks)
+
+    async def rm_tasks(self, task_ids: list[int]) -> list[TaskResult]:
+        """Remove several tasks in a single transaction. See DAO.rm_tasks."""
+        return await self.__run(self._dao.rm_tasks, task_ids)
+
+    async def update_tasks(
+        self, updates: list[tuple[int, TaskUpdate]]
+    ) -> list[TaskResult]:
+        """Update several tasks in a single transaction. See DAO.update_tasks."""
+        return await self.__run(self._dao.update_tasks, updates)
+
+    def close(self):
+        """Wait for the running calls and stop the worker threads."""
+        self._executor.shutdown(wait=True)
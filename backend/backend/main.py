@@ -1,20 +1,62 @@
 """Entrypoint of the backend"""
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 import logging
 import os
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from backend.dao.caching_dao import CachingDAO
+from backend.dao.factory import create_dao, max_exports
 from backend.dao.interfaces import DAO
-from backend.dao.mysql_dao import Mysql, MysqlConfig
+from backend.dao.metrics_dao import MetricsDAO
+from backend.dao.notifying_dao import NotifyingDAO
+from backend.dao.threaded_dao import ThreadedDAO
+from backend.metrics import MetricsRegistry, StatsCollector
+from backend.profiling import ProfilingMiddleware
+from backend.services.bulk_import import create_import_router
+from backend.services.events import EventBroker
+from backend.services.export import create_export_router
 from backend.services.graphql import create_graphql_app
+from backend.services.health import create_health_router
+from backend.services.monitoring import create_metrics_router
+from backend.services.response_cache import DataVersion
+from backend.services.stats import StatsCache
 
 
-def init_dao() -> DAO:
-    """Initialize a database access object."""
-    config = MysqlConfig(host="mysql", password=os.environ["DATABASE_PASSWORD"])
-    dao_instance = Mysql(config=config)
-    return dao_instance
+def init_dao(registry: MetricsRegistry) -> tuple[DAO, ThreadedDAO]:
+    """Initialize a database access object.
+
+    The backend is chosen by the environment variables, see create_dao. Blocking DAOs run in a
+    thread pool, so that the event loop is never blocked by a query. Return the DAO of the
+    backend, used by the health checks and closed at shutdown, and the DAO of the services.
+
+    Parameters
+    ----------
+    registry: MetricsRegistry
+        Registry of the metrics of the database calls, the pool and the cache.
+    """
+    database, max_workers = create_dao()
+    dao_instance: DAO = MetricsDAO(database, registry)
+
+    # Cache of the reads, disabled unless a size is given
+    cache_size = int(os.environ.get("DAO_CACHE_SIZE", "0"))
+    if cache_size > 0:
+        cache_ttl = float(os.environ.get("DAO_CACHE_TTL", "60"))
+        cache = CachingDAO(dao_instance, max_size=cache_size, ttl=cache_ttl)
+        registry.register(
+            StatsCollector(
+                "dao_cache",
+                "Cache of the DAO reads",
+                cache.cache_stats,
+                counters=("hits", "misses", "evictions", "invalidations"),
+            )
+        )
+        dao_instance = cache
+
+    return database, ThreadedDAO(dao_instance, max_workers=max_workers)
 
 
 def start_server():
@@ -22,12 +64,132 @@ def start_server():
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
 
 
-# TODO: Use env variable for level
-logging.basicConfig(encoding="utf-8", level=logging.DEBUG)
+def serve():
+    """Launched with `poetry run serve`: production server, configured by the environment
+    variables.
+
+    Unlike start_server, several worker processes serve the requests, without reloading. Each
+    worker imports the app and creates its own DAO at startup, with its share of the database
+    connections, see create_mysql_config.
+    """
+
+    processes = int(os.environ.get("WORKERS", str(os.cpu_count() or 1)))
+    if processes > 1 and os.environ.get("DAO_BACKEND", "mysql") == "memory":
+        logging.warning("The memory backend is not shared by processes: using 1 worker")
+        processes = 1
+    # Read by the workers, which import the app again
+    os.environ["WORKERS"] = str(processes)
+    log_level = os.environ.setdefault("LOG_LEVEL", "info").lower()
+    logging.getLogger().setLevel(log_level.upper())
+
+    uvicorn.run(
+        "backend.main:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=processes,
+        # By default uvloop and httptools, if installed, as by uvicorn[standard]
+        loop=os.environ.get("SERVER_LOOP", "auto"),
+        http=os.environ.get("SERVER_HTTP", "auto"),
+        timeout_keep_alive=int(os.environ.get("HTTP_KEEP_ALIVE", "5")),
+        backlog=int(os.environ.get("BACKLOG", "2048")),
+        # Seconds the open requests and subscriptions have to end when a worker stops
+        timeout_graceful_shutdown=int(
+            os.environ.get("GRACEFUL_SHUTDOWN_SECONDS", "30")
+        ),
+        log_level=log_level,
+    )
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """Create the DAO and the routers using it when the server starts, and close them when it
+    stops.
+
+    No connection to the database is opened here: the server answers the liveness probe
+    at once, and the readiness probe once the database can serve the requests.
+    """
 
-app = FastAPI()
-dao = init_dao()
-graphql_app = create_graphql_app(dao=dao)
+    database, threaded_dao = init_dao(metrics)
+    listeners = [broker.publish, data_version.bump]
+    if stats_cache is not None:
+        listeners.append(stats_cache.apply)
+    dao = NotifyingDAO(threaded_dao, listeners=listeners)
+    graphql_app = create_graphql_app(
+        dao=dao,
+        broker=broker,
+        document_cache_size=int(os.environ.get("GRAPHQL_DOCUMENT_CACHE_SIZE", "1000")),
+        persisted_queries_size=int(
+            os.environ.get("GRAPHQL_PERSISTED_QUERIES", "10000")
+        ),
+        data_version=data_version if response_cache else None,
+        response_cache_size=int(os.environ.get("GRAPHQL_RESPONSE_CACHE_SIZE", "1000")),
+        metrics=metrics,
+        trace_resolvers=tracing,
+        stats_cache=stats_cache,
+    )
+    application.include_router(graphql_app, prefix="/query")
+    application.include_router(
+        create_export_router(dao=dao, max_exports=max_exports()), prefix="/export"
+    )
+    application.include_router(create_import_router(dao=dao), prefix="/import")
+    application.state.database = database
+    try:
+        yield
+    finally:
+        application.state.database = None
+        # Wait for the running queries before closing the connections
+        await asyncio.to_thread(threaded_dao.close)
+        close = getattr(database, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+async def ready():
+    """Check that the database can serve the requests. Raises an exception otherwise."""
+
+    database = getattr(app.state, "database", None)
+    if database is None:
+        raise RuntimeError("The backend is not started")
+    ping = getattr(database, "ping", None)
+    if ping is not None:
+        await asyncio.to_thread(ping)
+
+
+logging.basicConfig(
+    encoding="utf-8", level=os.environ.get("LOG_LEVEL", "DEBUG").upper()
+)
+
+app = FastAPI(lifespan=lifespan)
+metrics = MetricsRegistry()
+broker = EventBroker()
+data_version = DataVersion()
+# Number of processes serving the requests, see serve
+workers = int(os.environ.get("WORKERS", "1"))
+# ETags and cache of the query responses, valid only if no other process writes the tasks:
+# disabled by default with several workers
+response_cache = (
+    os.environ.get("GRAPHQL_RESPONSE_CACHE", "1" if workers == 1 else "0") == "1"
+)
+# Statistics of the tasks updated by the mutations, valid under the same condition
+stats_cache = (
+    StatsCache()
+    if os.environ.get("TASK_STATS_CACHE", "1" if workers == 1 else "0") == "1"
+    else None
+)
+if workers > 1 and (
+    response_cache
+    or stats_cache is not None
+    or int(os.environ.get("DAO_CACHE_SIZE", "0")) > 0
+):
+    logging.warning(
+        "The caches are not shared by the %d workers: they may serve stale tasks",
+        workers,
+    )
+# Profiling and log of the slow requests, disabled unless configured
+slow_threshold = os.environ.get("SLOW_OPERATION_SECONDS")
+profile_sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+profile_token = os.environ.get("PROFILE_TOKEN")
+tracing = bool(slow_threshold) or profile_sample_rate > 0 or bool(profile_token)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,5 +198,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if tracing:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=os.environ.get("PROFILE_DIR", "profiles"),
+        slow_threshold=float(slow_threshold) if slow_threshold else None,
+        sample_rate=profile_sample_rate,
+        token=profile_token,
+    )
 
-app.include_router(graphql_app, prefix="/query")
+# The routers using the DAO are added by the lifespan
+app.include_router(create_metrics_router(registry=metrics), prefix="/metrics")
+app.include_router(
+    create_health_router(
+        ready, timeout=float(os.environ.get("READINESS_TIMEOUT", "2"))
+    ),
+    prefix="/health",
+)
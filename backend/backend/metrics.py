@@ -0,0 +1,250 @@
+"""Metrics of the backend, exposed in the Prometheus text format"""
+
+from bisect import bisect_left
+from collections.abc import Callable, Collection, Sequence
+import dataclasses
+import math
+import threading
+from typing import Any, TypeVar, Union
+
+# Content type of the text format, version 0.0.4. The charset, UTF-8, is added by Starlette.
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Upper bounds in seconds of the buckets of the latency histograms, from 0.5 ms to 10 s
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: Union[int, float]) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Thread-safe counter, with one value per combination of the label values."""
+
+    name: str
+    description: str
+    label_names: tuple[str, ...]
+    _values: dict[tuple[str, ...], Union[int, float]]
+    _lock: threading.Lock
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        """
+        Parameters
+        ----------
+        name: str
+            Name of the metric, ending with `_total`.
+        description: str
+            Description of the metric.
+        label_names: sequence of str
+            Names of the labels. Their values are given when the counter is increased.
+        """
+
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple[str, ...] = (), amount: Union[int, float] = 1):
+        """Increase the counter of the given label values, in the order of label_names."""
+
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self, lines: list[str]):
+        """Append the metric in the text format to a list of lines."""
+
+        lines.append(f"# HELP {self.name} {_escape(self.description)}")
+        lines.append(f"# TYPE {self.name} counter")
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}{label_text} {_format_value(value)}")
+
+
+class Histogram:
+    """Thread-safe histogram of observed values, typically durations in seconds, with one
+    distribution per combination of the label values.
+    """
+
+    name: str
+    description: str
+    label_names: tuple[str, ...]
+    buckets: tuple[float, ...]
+    # Count of the observations of each bucket (not cumulative), then sum and count
+    _values: dict[tuple[str, ...], list[Union[int, float]]]
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """
+        Parameters
+        ----------
+        name: str
+            Name of the metric, e.g. ending with `_seconds`.
+        description: str
+            Description of the metric.
+        label_names: sequence of str
+            Names of the labels. Their values are given with each observation.
+        buckets: sequence of float
+            Sorted upper bounds of the buckets. The +Inf bucket is added.
+        """
+
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()):
+        """Record a value for the given label values, in the order of label_names."""
+
+        # Values equal to an upper bound belong to its bucket, the last index is +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 3)
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def render(self, lines: list[str]):
+        """Append the metric in the text format to a list of lines."""
+
+        lines.append(f"# HELP {self.name} {_escape(self.description)}")
+        lines.append(f"# TYPE {self.name} histogram")
+        with self._lock:
+            values = [(labels, list(counts)) for labels, counts in self._values.items()]
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, counts in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                label_text = _format_labels(
+                    self.label_names + ("le",), labels + (bound,)
+                )
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{label_text} {counts[-1]}")
+
+
+class StatsCollector:
+    """Metrics read at every scrape from the snapshot returned by a `stats` method.
+
+    Every numeric field of the snapshot, a dataclass such as PoolStats, is exposed as a gauge
+    named `<prefix>_<field>`, or as a counter named `<prefix>_<field>_total` if listed in
+    `counters`.
+    """
+
+    prefix: str
+    description: str
+    _stats: Callable[[], Any]
+    _counters: frozenset[str]
+
+    def __init__(
+        self,
+        prefix: str,
+        description: str,
+        stats: Callable[[], Any],
+        counters: Collection[str] = (),
+    ):
+        """
+        Parameters
+        ----------
+        prefix: str
+            Prefix of the names of the metrics.
+        description: str
+            Description of the source of the statistics, repeated by every metric.
+        stats: callable
+            Function returning the current statistics, as a dataclass.
+        counters: collection of str
+            Fields that only increase.
+        """
+
+        self.prefix = prefix
+        self.description = description
+        self._stats = stats
+        self._counters = frozenset(counters)
+
+    def render(self, lines: list[str]):
+        """Append the metrics in the text format to a list of lines."""
+
+        stats = self._stats()
+        for field in dataclasses.fields(stats):
+            value = getattr(stats, field.name)
+            if not isinstance(value, (int, float)):
+                continue
+            if field.name in self._counters:
+                name, kind = f"{self.prefix}_{field.name}_total", "counter"
+            else:
+                name, kind = f"{self.prefix}_{field.name}", "gauge"
+            lines.append(f"# HELP {name} {_escape(self.description)}: {field.name}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+
+
+Metric = TypeVar("Metric", Counter, Histogram, StatsCollector)
+
+
+class MetricsRegistry:
+    """Set of the metrics exposed by the backend."""
+
+    _metrics: list[Union[Counter, Histogram, StatsCollector]]
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric to the registry and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Return all the metrics in the Prometheus text format."""
+
+        lines: list[str] = []
+        for metric in self._metrics:
+            metric.render(lines)
+        lines.append("")
+        return "\n".join(lines)
@@ -0,0 +1,291 @@
+"""Profiling of single requests and log of the slow operations"""
+
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import contextvars
+import cProfile
+import functools
+import hmac
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Optional, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger("backend.slow_operations")
+
+# Maximum number of spans kept for a request. The following ones are only counted.
+MAX_SPANS = 10000
+
+
+class Trace:
+    """Timings of the stages of a request, e.g. DAO queries, resolvers and conversions.
+
+    The spans may be added by any thread: the DAO calls run in worker threads.
+    """
+
+    name: str
+    started: float
+    # Thread serving the request
+    thread: int
+    # Stage, name, start relative to the request and duration in seconds, thread
+    spans: list[tuple[str, str, float, float, int]]
+    dropped: int
+
+    def __init__(self, name: str):
+        """
+        Parameters
+        ----------
+        name: str
+            Name of the request, e.g. its path. See also the GraphQL extension setting it to
+            the name of the operation.
+        """
+
+        self.name = name
+        self.started = time.perf_counter()
+        self.thread = threading.get_ident()
+        self.spans = []
+        self.dropped = 0
+
+    def add(self, stage: str, name: str, start: float, duration: float):
+        """Record a span of the request.
+
+        Parameters
+        ----------
+        stage: str
+            Kind of work, e.g. "dao" or "conversion".
+        name: str
+            Name of the measured function.
+        start: float
+            Start of the span, as returned by time.perf_counter.
+        duration: float
+            Duration of the span in seconds.
+        """
+
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append(
+            (stage, name, start - self.started, duration, threading.get_ident())
+        )
+
+    def summary(self) -> dict[str, tuple[int, float]]:
+        """Return the number of spans and their total duration, by stage."""
+
+        totals: dict[str, tuple[int, float]] = {}
+        for stage, _, _, duration, _ in self.spans:
+            count, seconds = totals.get(stage, (0, 0.0))
+            totals[stage] = (count + 1, seconds + duration)
+        return totals
+
+    def to_chrome_trace(self, duration: float) -> dict[str, Any]:
+        """Return the spans in the Trace Event Format, as read by Perfetto, speedscope or
+        chrome://tracing.
+
+        Parameters
+        ----------
+        duration: float
+            Duration of the whole request in seconds.
+        """
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": self.name,
+                "cat": "request",
+                "ph": "X",
+                "ts": 0,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": self.thread,
+            }
+        ]
+        for stage, name, start, span_duration, thread in self.spans:
+            events.append(
+                {
+                    "name": name,
+                    "cat": stage,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": span_duration * 1e6,
+                    "pid": pid,
+                    "tid": thread,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace of the current request, None if the request is not traced."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    """Context manager recording its duration in the trace of the current request, if any."""
+
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(kind, name, start, time.perf_counter() - start)
+
+
+def traced(kind: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator recording the duration of the calls in the trace of the current request.
+    Outside of a traced request, the overhead is a context variable lookup.
+    """
+
+    def decorator(function: Callable[..., T]) -> Callable[..., T]:
+        name = function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs) -> T:
+            trace = _current_trace.get()
+            if trace is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                trace.add(kind, name, start, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "request"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware tracing the HTTP requests, profiling some of them, and logging the
+    slow ones.
+
+    - A request is profiled with cProfile if it has the header `X-Profile` with the
+      configured token, or if it is sampled. The profile is written as
+      `<directory>/<time>-<name>-<n>.prof`, which pstats, snakeviz or tuna can read.
+      cProfile follows the event loop thread only: the DAO calls are in the trace, and the
+      other requests served at the same time are in the profile too. Only one request is
+      profiled at a time.
+    - A request taking longer than the threshold is logged by the `backend.slow_operations`
+      logger, with the time spent in each stage (DAO queries, resolvers, conversions,
+      serialization).
+
+    The spans of profiled and slow requests are also written as `.trace.json` files, in the
+    Trace Event Format.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        app: Any,
+        directory: str = "profiles",
+        slow_threshold: Optional[float] = None,
+        sample_rate: float = 0.0,
+        token: Optional[str] = None,
+    ):
+        """
+        Parameters
+        ----------
+        app: ASGI application
+            Application whose requests are traced.
+        directory: str
+            Directory of the profiles and traces. It is created if missing.
+        slow_threshold: float
+            Seconds above which a request is logged as slow. If None, no request is logged.
+        sample_rate: float
+            Fraction of the requests profiled, between 0 and 1.
+        token: str
+            Value of the X-Profile header requesting a profile. If None, the header is
+            ignored.
+        """
+
+        self.app = app
+        self.directory = directory
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.token = token.encode() if token else None
+        self._profiling = False
+        self._counter = itertools.count()
+
+    def __should_profile(self, scope: dict) -> bool:
+        if self._profiling:
+            return False
+        if self.token is not None:
+            for header, value in scope.get("headers", ()):
+                if header == b"x-profile" and hmac.compare_digest(value, self.token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope.get("path", "request"))
+        reset = _current_trace.set(trace)
+        profiler: Optional[cProfile.Profile] = None
+        if self.__should_profile(scope):
+            self._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration = time.perf_counter() - trace.started
+            _current_trace.reset(reset)
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            slow = self.slow_threshold is not None and duration > self.slow_threshold
+            if slow:
+                self.__log(trace, duration)
+            if slow or profiler is not None:
+                await asyncio.to_thread(self.__write, trace, duration, profiler)
+
+    @staticmethod
+    def __log(trace: Trace, duration: float):
+        stages = ", ".join(
+            f"{name} {seconds * 1000:.2f} ms in {count}"
+            for name, (count, seconds) in sorted(trace.summary().items())
+        )
+        logger.warning(
+            "Slow operation %s: %.1f ms (%s)",
+            trace.name,
+            duration * 1000,
+            stages or "no stage recorded",
+        )
+
+    def __write(
+        self, trace: Trace, duration: float, profiler: Optional[cProfile.Profile]
+    ):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(
+            self.directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{_file_name(trace.name)}"
+            f"-{next(self._counter)}",
+        )
+        with open(f"{base}.trace.json", "w", encoding="utf-8") as file:
+            json.dump(trace.to_chrome_trace(duration), file)
+        if profiler is not None:
+            profiler.dump_stats(f"{base}.prof")
+        logger.info("Trace of %s written to %s", trace.name, base)
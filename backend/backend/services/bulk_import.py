@@ -0,0 +1,383 @@
+"""Bulk import of tasks from CSV or NDJSON files"""
+
+import codecs
+import csv
+import datetime
+import json
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from backend.dao.interfaces import (
+    DAO,
+    AsyncDAO,
+    TaskInput as TaskInDao,
+    TaskResult as TaskResultDao,
+)
+from backend.services.graphql import make_task_input
+from backend.services.schemas import Status
+
+# Fields of an imported task, named as in the API and in the exported files. The id and the
+# cursor of exported tasks are ignored: the imported tasks receive new ids.
+_IMPORTED_FIELDS = (
+    "title",
+    "description",
+    "dateTimestamp",
+    "startTimestamp",
+    "endTimestamp",
+    "goal",
+    "status",
+)
+_IGNORED_FIELDS = ("id", "cursor")
+
+
+class ImportFormat(Enum):
+    """Formats of the imported files."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+@dataclass(frozen=True)
+class RejectedRow:
+    """Row of an imported file that was not added, with the reason."""
+
+    line: int
+    error: str
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import."""
+
+    imported: int = 0
+    rejected: int = 0
+    # First rejected rows, see TaskImporter
+    rejected_rows: list[RejectedRow] = field(default_factory=list)
+    seconds: float = 0.0
+    tasks_per_second: float = 0.0
+
+
+def _parse_date(value: str) -> datetime.date:
+    """Parse an ISO date, e.g. `2024-01-31`. The dates exported by older versions of the
+    backend have a time at midnight, e.g. `2024-01-31T00:00:00`: the time is ignored."""
+    return datetime.datetime.fromisoformat(value).date()
+
+
+def convert_record_to_task(record: dict[str, Any]) -> TaskInDao:
+    """Validate a task read from a file and convert it to the DAO format.
+
+    The rules are the ones of the `add` mutation. Empty values are missing values.
+    Raises a ValueError if the task is not valid.
+
+    Parameters
+    ----------
+    record: dict
+        Fields of the task, named as in the API.
+    """
+
+    unknown = set(record) - set(_IMPORTED_FIELDS) - set(_IGNORED_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    values: dict[str, Optional[str]] = {}
+    for name in _IMPORTED_FIELDS:
+        value = record.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"The field '{name}' must be a string")
+        values[name] = value or None
+
+    title = values["title"]
+    if title is None:
+        raise ValueError("A task must have a title")
+
+    status = Status.OPEN
+    if values["status"] is not None:
+        try:
+            status = Status[values["status"]]
+        except KeyError as error:
+            raise ValueError(f"Unknown status '{values['status']}'") from error
+
+    date = values["dateTimestamp"]
+    return make_task_input(
+        title=title,
+        description=values["description"],
+        date_timestamp=_parse_date(date) if date else None,
+        start_timestamp=values["startTimestamp"],
+        end_timestamp=values["endTimestamp"],
+        goal=values["goal"],
+        status=status,
+    )
+
+
+class TaskImporter:
+    """Incremental parser of an imported file, which groups the valid tasks in batches.
+
+    The lines of the file are fed one at a time, and every full batch is returned to the
+    caller, which adds it to a DAO and reports the results back. Only the current batch is
+    kept in memory, whatever the size of the file.
+
+    Invalid rows are counted, but only the first `max_rejected_rows` are kept in the report.
+    """
+
+    _format: ImportFormat
+    _batch_size: int
+    _max_rejected_rows: int
+    _report: ImportReport
+    _started: float
+    _line: int
+    _header: Optional[list[str]]
+    # Lines of a CSV record with a quoted line break, and the line where it starts
+    _pending: list[str]
+    _pending_line: int
+    _batch: list[TaskInDao]
+    _batch_lines: list[int]
+    # Lines of the tasks of the last returned batch, waiting for the results
+    _added_lines: list[int]
+
+    def __init__(
+        self,
+        format: ImportFormat,  # pylint: disable=redefined-builtin
+        batch_size: int = 1000,
+        max_rejected_rows: int = 100,
+    ):
+        """
+        Parameters
+        ----------
+        format: ImportFormat
+            Format of the file. The first line of a CSV file names the columns.
+        batch_size: int
+            Number of tasks added in each transaction.
+        max_rejected_rows: int
+            Maximum number of rejected rows kept in the report.
+        """
+
+        if batch_size < 1:
+            raise ValueError("The batches must hold at least one task")
+
+        self._format = format
+        self._batch_size = batch_size
+        self._max_rejected_rows = max_rejected_rows
+        self._report = ImportReport()
+        self._started = time.perf_counter()
+        self._line = 0
+        self._header = None
+        self._pending = []
+        self._pending_line = 0
+        self._batch = []
+        self._batch_lines = []
+        self._added_lines = []
+
+    def feed(self, line: str) -> Optional[list[TaskInDao]]:
+        """Parse the next line of the file. Return the batch of tasks to be added, if full.
+
+        Parameters
+        ----------
+        line: str
+            Line of the file, with or without the line break.
+        """
+
+        self._line += 1
+        if self._format == ImportFormat.CSV:
+            self.__feed_csv(line)
+        elif line.strip():
+            self.__feed_ndjson(line)
+
+        if len(self._batch) >= self._batch_size:
+            return self.__take_batch()
+        return None
+
+    def finish(self) -> list[TaskInDao]:
+        """Return the last batch of tasks to be added, possibly empty."""
+
+        if self._pending:
+            self.__reject(self._pending_line, "Unterminated quoted field")
+            self._pending = []
+        return self.__take_batch()
+
+    def added(self, results: list[TaskResultDao]):
+        """Record the results of DAO.add_tasks for the last returned batch."""
+
+        for line, result in zip(self._added_lines, results):
+            if result["error"] is None:
+                self._report.imported += 1
+            else:
+                self.__reject(line, result["error"])
+        self._added_lines = []
+
+    def report(self) -> ImportReport:
+        """Return the outcome of the import up to now."""
+
+        seconds = time.perf_counter() - self._started
+        self._report.seconds = seconds
+        self._report.tasks_per_second = self._report.imported / seconds
+        return self._report
+
+    def __feed_ndjson(self, line: str):
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            self.__reject(self._line, f"Invalid JSON: {error}")
+            return
+        if not isinstance(record, dict):
+            self.__reject(self._line, "Each line must be a JSON object")
+            return
+        self.__add(self._line, record)
+
+    def __feed_csv(self, line: str):
+        if not self._pending:
+            self._pending_line = self._line
+        self._pending.append(line if line.endswith("\n") else line + "\n")
+
+        # The reader asks for another line only if a quoted field is still open at the end
+        # of the last one. The quotes inside unquoted fields, as in 5" screen, are literal.
+        complete = True
+
+        def pending_lines() -> Iterator[str]:
+            nonlocal complete
+            yield from self._pending
+            complete = False
+
+        try:
+            values = next(csv.reader(pending_lines()), [])
+        except csv.Error as error:
+            self._pending = []
+            self.__reject(self._pending_line, f"Invalid CSV: {error}")
+            return
+        if not complete:
+            return
+        self._pending = []
+        if not values:
+            return
+        if self._header is None:
+            self._header = values
+            return
+        if len(values) != len(self._header):
+            self.__reject(
+                self._pending_line,
+                f"Expected {len(self._header)} values, found {len(values)}",
+            )
+            return
+        self.__add(self._pending_line, dict(zip(self._header, values)))
+
+    def __add(self, line: int, record: dict[str, Any]):
+        try:
+            task = convert_record_to_task(record)
+        except ValueError as error:
+            self.__reject(line, str(error))
+            return
+        self._batch.append(task)
+        self._batch_lines.append(line)
+
+    def __take_batch(self) -> list[TaskInDao]:
+        batch = self._batch
+        self._added_lines.extend(self._batch_lines)
+        self._batch = []
+        self._batch_lines = []
+        return batch
+
+    def __reject(self, line: int, error: str):
+        self._report.rejected += 1
+        if len(self._report.rejected_rows) < self._max_rejected_rows:
+            self._report.rejected_rows.append(RejectedRow(line=line, error=error))
+
+
+def import_tasks(
+    dao: DAO,
+    lines: Iterable[str],
+    format: ImportFormat,  # pylint: disable=redefined-builtin
+    batch_size: int = 1000,
+) -> ImportReport:
+    """Add the tasks of a file to a blocking DAO, one transaction per batch.
+
+    Parameters
+    ----------
+    dao: class (DAO)
+        Data Access Object (DAO) the tasks are added to.
+    lines: iterable of str
+        Lines of the file.
+    format: ImportFormat
+        Format of the file.
+    batch_size: int
+        Number of tasks added in each transaction.
+    """
+
+    importer = TaskImporter(format, batch_size)
+    for line in lines:
+        batch = importer.feed(line)
+        if batch:
+            importer.added(dao.add_tasks(batch))
+    batch = importer.finish()
+    if batch:
+        importer.added(dao.add_tasks(batch))
+    return importer.report()
+
+
+async def _decode_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 bytes in lines."""
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    rest = ""
+    async for chunk in chunks:
+        lines = (rest + decoder.decode(chunk)).split("\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line
+    rest += decoder.decode(b"", final=True)
+    if rest:
+        yield rest
+
+
+def create_import_router(dao: AsyncDAO, max_batch_size: int = 10000) -> APIRouter:
+    """Factory function to create the router of the import endpoint.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    max_batch_size: int
+        Largest batch size accepted from the clients.
+    """
+
+    router = APIRouter()
+
+    @router.post("")
+    async def import_file(
+        request: Request,
+        format: ImportFormat = ImportFormat.NDJSON,  # pylint: disable=redefined-builtin
+        batch_size: int = Query(1000, ge=1),
+    ) -> ImportReport:
+        """Add the tasks of the CSV or NDJSON file sent as body of the request.
+
+        The body is read while the tasks are added, one transaction per batch, and the
+        response reports the imported tasks and the rejected rows. The fields are named as in
+        the API, and the rows of a CSV file are preceded by the names of the columns, as in
+        the exported files.
+
+        Parameters
+        ----------
+        format: ImportFormat
+            Format of the file, NDJSON (default) or CSV.
+        batch_size: int
+            Number of tasks added in each transaction.
+        """
+
+        if batch_size > max_batch_size:
+            raise HTTPException(
+                status_code=422,
+                detail=f"The batch size must not exceed {max_batch_size}",
+            )
+
+        importer = TaskImporter(format, batch_size)
+        async for line in _decode_lines(request.stream()):
+            batch = importer.feed(line)
+            if batch:
+                importer.added(await dao.add_tasks(batch))
+        batch = importer.finish()
+        if batch:
+            importer.added(await dao.add_tasks(batch))
+        return importer.report()
+
+    return router
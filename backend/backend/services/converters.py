@@ -1,40 +1,127 @@
 """"Module with converters between the DAO and the API data formats"""
 
+from collections.abc import Iterable
+from typing import Any, Optional, cast
+
 from backend.dao.interfaces import (
+    ORDER_BY_DATE,
+    ORDER_BY_ID,
+    TaskEvent as TaskEventDao,
     TaskInput as TaskInDao,
+    TaskMatch as TaskMatchDao,
     TaskUpdate as TaskUpdateDao,
     TaskOutput as TaskOutDao,
+    TaskResult as TaskResultDao,
+    TaskStats as TaskStatsDao,
 )
+from backend.profiling import traced
 from backend.services.schemas import (
+    DayStats as DayStatsQL,
+    GoalStats as GoalStatsQL,
+    StatsGroup as StatsGroupQL,
+    StatsTotals as StatsTotalsQL,
+    StatusStats as StatusStatsQL,
+    TaskDelta as TaskDeltaQL,
+    TaskEvent as TaskEventQL,
+    TaskEventKind as TaskEventKindQL,
     TaskOutput as TaskOutQL,
     TaskInput as TaskInQL,
+    TaskMatch as TaskMatchQL,
     TaskUpdate as TaskUpdateQL,
     Status as StatusQL,
+    TaskOrder as TaskOrderQL,
+    TaskResult as TaskResultQL,
+    TaskStats as TaskStatsQL,
 )
 
+# DAO fields needed by each field of the API task
+_FIELDS_GRAPHQL_TO_DAO: dict[str, tuple[str, ...]] = {
+    "title": ("title",),
+    "description": ("description",),
+    "dateTimestamp": ("date",),
+    "startTimestamp": ("start_time",),
+    "endTimestamp": ("end_time",),
+    "goal": ("goal",),
+    "status": ("status",),
+    "cursor": ("date",),
+}
+
+# API field of each DAO field, see TaskOutQL
+_FIELDS_DAO_TO_GRAPHQL: dict[str, str] = {
+    "title": "title",
+    "description": "description",
+    "date": "dateTimestamp",
+    "start_time": "startTimestamp",
+    "end_time": "endTimestamp",
+    "goal": "goal",
+    "status": "status",
+}
+
+# The values of the API statuses are the DAO statuses
+_STATUSES_DAO_TO_GRAPHQL: dict[str, StatusQL] = {
+    status.value: status for status in StatusQL
+}
+_STATUSES_GRAPHQL_TO_DAO: dict[StatusQL, str] = {
+    status: status.value for status in StatusQL
+}
+# Statuses of the DAO records that the API resolves as they are. None is the status of a
+# record whose status was not requested.
+_KNOWN_STATUSES_DAO = frozenset((*_STATUSES_DAO_TO_GRAPHQL, None))
+
+# Sorting key and descending flag of the DAO for each API ordering
+_ORDERS_GRAPHQL_TO_DAO: dict[TaskOrderQL, tuple[str, bool]] = {
+    TaskOrderQL.ID_ASC: (ORDER_BY_ID, False),
+    TaskOrderQL.ID_DESC: (ORDER_BY_ID, True),
+    TaskOrderQL.DATE_ASC: (ORDER_BY_DATE, False),
+    TaskOrderQL.DATE_DESC: (ORDER_BY_DATE, True),
+}
+
 
 def convertStatusDaoToGraphQL(status_dao: str) -> StatusQL:
-    if status_dao == "DONE":
-        return StatusQL.DONE
-    elif status_dao == "OPEN":
-        return StatusQL.OPEN
-    if status_dao == "PROGRESS":
-        return StatusQL.PROGRESS
-    else:
-        return StatusQL.PROGRESS
+    return _STATUSES_DAO_TO_GRAPHQL.get(status_dao, StatusQL.PROGRESS)
 
 
 def convertStatusGraphQLToDao(status_ql: StatusQL) -> str:
-    if status_ql == StatusQL.DONE:
-        return "DONE"
-    elif status_ql == StatusQL.OPEN:
-        return "OPEN"
-    if status_ql == StatusQL.PROGRESS:
-        return "PROGRESS"
-    else:
-        return "PROGRESS"
+    return _STATUSES_GRAPHQL_TO_DAO.get(status_ql, "PROGRESS")
+
+
+def convertUnknownStatusDao(task_dao: TaskOutDao) -> TaskOutDao:
+    """Return the task with an unknown status, e.g. written in lowercase by older versions,
+    replaced by the one of convertStatusDaoToGraphQL. The other tasks are returned as they
+    are."""
+    if task_dao.status in _KNOWN_STATUSES_DAO:
+        return task_dao
+    return task_dao._replace(status=convertStatusDaoToGraphQL(task_dao.status).value)
+
 
+def convertUnknownStatusesDao(tasks_dao: list[TaskOutDao]) -> list[TaskOutDao]:
+    """Return the tasks with the unknown statuses replaced, see convertUnknownStatusDao.
+    The list is copied only if a status is unknown."""
+    if {task_dao.status for task_dao in tasks_dao} <= _KNOWN_STATUSES_DAO:
+        return tasks_dao
+    return [convertUnknownStatusDao(task_dao) for task_dao in tasks_dao]
 
+
+@traced("conversion")
+def convertSelectionGraphQLToDao(field_names: Iterable[str]) -> Optional[list[str]]:
+    """Return the DAO fields needed to resolve the selected fields of a task.
+    Return None, i.e. all the fields, if a selected field is not known.
+    """
+    fields_dao: set[str] = set()
+    for name in field_names:
+        if name in ("id", "__typename"):
+            continue
+        if name not in _FIELDS_GRAPHQL_TO_DAO:
+            return None
+        fields_dao.update(_FIELDS_GRAPHQL_TO_DAO[name])
+    return sorted(fields_dao)
+
+
+def convertOrderGraphQLToDao(order_ql: TaskOrderQL) -> tuple[str, bool]:
+    return _ORDERS_GRAPHQL_TO_DAO[order_ql]
+
+
+@traced("conversion")
 def convertTaskUpdateGraphQLToDao(task_ql: TaskUpdateQL) -> TaskUpdateDao:
     status_dao = (
         convertStatusGraphQLToDao(task_ql.status)
@@ -62,21 +149,107 @@ def convertTaskUpdateGraphQLToDao(task_ql: TaskUpdateQL) -> TaskUpdateDao:
     return task_dao
 
 
+@traced("conversion")
 def convertTaskDaoToGraphQL(task_dao: TaskOutDao) -> TaskOutQL:
-    status: StatusQL = convertStatusDaoToGraphQL(task_dao["status"])
-
-    return TaskOutQL(
-        id=task_dao["id"],
-        title=task_dao["title"],
-        description=task_dao.get("description"),
-        date_timestamp=task_dao.get("date"),
-        start_timestamp=task_dao.get("start_time"),
-        end_timestamp=task_dao.get("end_time"),
-        goal=task_dao.get("goal"),
-        status=status,
+    # The API type resolves the DAO record directly, see TaskOutQL. The fields not requested
+    # by the query may be None, but they are never resolved. Only the statuses the API
+    # cannot represent are replaced.
+    return cast(TaskOutQL, convertUnknownStatusDao(task_dao))
+
+
+@traced("conversion")
+def convertTasksDaoToGraphQL(tasks_dao: list[TaskOutDao]) -> list[TaskOutQL]:
+    # No conversion per task, see convertTaskDaoToGraphQL
+    return cast(list[TaskOutQL], convertUnknownStatusesDao(tasks_dao))
+
+
+@traced("conversion")
+def convertMatchesDaoToGraphQL(matches_dao: list[TaskMatchDao]) -> list[TaskMatchQL]:
+    # The matches and their tasks are resolved directly, see TaskMatchQL
+    if {match.task.status for match in matches_dao} <= _KNOWN_STATUSES_DAO:
+        return cast(list[TaskMatchQL], matches_dao)
+    return cast(
+        list[TaskMatchQL],
+        [
+            match._replace(task=convertUnknownStatusDao(match.task))
+            for match in matches_dao
+        ],
     )
 
 
+def _sum_stats(
+    groups_dao: list[TaskStatsDao], fields: tuple[str, ...]
+) -> list[TaskStatsDao]:
+    """Return the sums of the statistics with the same values of some fields, sorted by
+    these values with None last. The other fields of the sums are None."""
+
+    sums: dict[tuple, list[int]] = {}
+    for group in groups_dao:
+        key = tuple(getattr(group, field) for field in fields)
+        totals = sums.get(key)
+        if totals is None:
+            totals = sums[key] = [0, 0, 0]
+        totals[0] += group.count
+        totals[1] += group.timed
+        totals[2] += group.duration
+
+    def order(key: tuple) -> tuple:
+        return tuple((value is None, value) for value in key)
+
+    results = []
+    for key in sorted(sums, key=order):
+        values: dict[str, Any] = {"date": None, "goal": None, "status": None}
+        values.update(zip(fields, key))
+        count, timed, duration = sums[key]
+        results.append(
+            TaskStatsDao(**values, count=count, timed=timed, duration=duration)
+        )
+    return results
+
+
+@traced("conversion")
+def convertStatsDaoToGraphQL(groups_dao: list[TaskStatsDao]) -> TaskStatsQL:
+    # The sums are resolved directly, as the groups of the DAO, see StatsTotalsQL. The groups
+    # with an unknown status are counted with the status of convertStatusDaoToGraphQL.
+    groups_dao = [
+        (
+            group
+            if group.status in _KNOWN_STATUSES_DAO
+            else group._replace(status=convertStatusDaoToGraphQL(group.status).value)
+        )
+        for group in groups_dao
+    ]
+    totals = _sum_stats(groups_dao, ())
+    total = totals[0] if totals else TaskStatsDao(None, None, cast(str, None), 0, 0, 0)
+    return TaskStatsQL(
+        total=cast(StatsTotalsQL, total),
+        by_status=cast(list[StatusStatsQL], _sum_stats(groups_dao, ("status",))),
+        by_goal=cast(list[GoalStatsQL], _sum_stats(groups_dao, ("goal",))),
+        by_day=cast(list[DayStatsQL], _sum_stats(groups_dao, ("date",))),
+        groups=cast(
+            list[StatsGroupQL], _sum_stats(groups_dao, ("date", "goal", "status"))
+        ),
+    )
+
+
+@traced("conversion")
+def convertEventDaoToGraphQL(event_dao: TaskEventDao) -> TaskEventQL:
+    # The changed task is resolved directly, as by TaskOutQL
+    return TaskEventQL(
+        kind=TaskEventKindQL(event_dao.kind),
+        task=cast(TaskDeltaQL, convertUnknownStatusDao(event_dao.task)),
+        changed_fields=[_FIELDS_DAO_TO_GRAPHQL[field] for field in event_dao.fields],
+    )
+
+
+@traced("conversion")
+def convertTaskResultDaoToGraphQL(result_dao: TaskResultDao) -> TaskResultQL:
+    task_dao = result_dao["task"]
+    task_ql = convertTaskDaoToGraphQL(task_dao) if task_dao is not None else None
+    return TaskResultQL(task=task_ql, error=result_dao["error"])
+
+
+@traced("conversion")
 def convertTaskGraphqlToDao(task_ql: TaskInQL) -> TaskInDao:
     status: str = convertStatusGraphQLToDao(task_ql.status)
 
@@ -0,0 +1,89 @@
+"""Module with the opaque cursors used by the API for pagination"""
+
+import base64
+import binascii
+import datetime
+from typing import Optional
+from backend.dao.interfaces import SearchCursor, TaskCursor
+
+
+def encode_cursor(task_id: int, date: Optional[datetime.date]) -> str:
+    """Return the opaque cursor pointing to a task.
+
+    Parameters
+    ----------
+    task_id: int
+        Id of the task.
+    date: datetime.date
+        Date of the task, if any.
+    """
+
+    date_str = date.isoformat() if date is not None else ""
+    raw = f"{task_id}|{date_str}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> TaskCursor:
+    """Return the position encoded in an opaque cursor.
+
+    Raises a ValueError if the cursor was not created by encode_cursor.
+
+    Parameters
+    ----------
+    cursor: str
+        Cursor as received from the client.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        task_id_str, date_str = raw.split("|")
+        task_id = int(task_id_str)
+        date: Optional[datetime.date] = None
+        if len(date_str) == len("YYYY-MM-DD"):
+            date = datetime.date.fromisoformat(date_str)
+        elif date_str:
+            date = datetime.datetime.fromisoformat(date_str)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError(f"Invalid cursor '{cursor}'") from error
+
+    return TaskCursor(id=task_id, date=date)
+
+
+def encode_search_cursor(score: float, task_id: int) -> str:
+    """Return the opaque cursor pointing to a task in the results of a search.
+
+    Parameters
+    ----------
+    score: float
+        Score of the task in the search.
+    task_id: int
+        Id of the task.
+    """
+
+    # The representation of a float is exact, so the task is found again by equality
+    raw = f"search|{score!r}|{task_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> SearchCursor:
+    """Return the position encoded in an opaque search cursor.
+
+    Raises a ValueError if the cursor was not created by encode_search_cursor.
+
+    Parameters
+    ----------
+    cursor: str
+        Cursor as received from the client.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        kind, score_str, task_id_str = raw.split("|")
+        if kind != "search":
+            raise ValueError(f"Unexpected cursor kind '{kind}'")
+        score = float(score_str)
+        task_id = int(task_id_str)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError(f"Invalid cursor '{cursor}'") from error
+
+    return SearchCursor(score=score, id=task_id)
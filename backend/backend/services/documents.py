@@ -0,0 +1,331 @@
+"""Caches of the GraphQL documents: parsed and validated queries, and persisted queries"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import time
+from typing import Any, Iterator, Optional
+from graphql import GraphQLError
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http.exceptions import HTTPException
+from strawberry.http import GraphQLRequestData
+from strawberry.schema.execute import parse_document, validate_document
+from strawberry.types import ExecutionResult
+from backend.profiling import span
+
+# Error code of an unknown persisted query, as expected by the clients
+PERSISTED_QUERY_NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+
+
+@dataclass(frozen=True)
+class DocumentCacheStats:
+    """Snapshot of the counters of a document cache."""
+
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    # Time spent parsing and validating the documents that were not cached
+    parse_seconds: float
+    validation_seconds: float
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the lookups found in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Document:
+    """Parsed document of a query, with the errors of its validation once known."""
+
+    __slots__ = ("document", "errors")
+
+    def __init__(self, document: Any):
+        self.document = document
+        self.errors: Optional[list[GraphQLError]] = None
+
+
+class DocumentCache:
+    """Bounded cache of the parsed and validated GraphQL documents, indexed by query text.
+
+    Clients send the same few queries over and over, with different variables: each query
+    is then parsed and validated once. When the cache is full, the least recently used
+    document is evicted. The cache is used by the event loop thread only.
+    """
+
+    _documents: "OrderedDict[str, _Document]"
+    _max_size: int
+
+    def __init__(self, max_size: int = 1000):
+        """
+        Parameters
+        ----------
+        max_size: int
+            Maximum number of documents in the cache.
+        """
+
+        if max_size < 1:
+            raise ValueError("The cache must hold at least one document")
+
+        self._documents = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._parse_seconds = 0.0
+        self._validation_seconds = 0.0
+
+    def parse(self, query: str, **parse_options) -> Any:
+        """Return the parsed document of a query. Raises a GraphQLError for invalid syntax."""
+
+        entry = self._documents.get(query)
+        if entry is not None:
+            self._hits += 1
+            self._documents.move_to_end(query)
+            return entry.document
+
+        self._misses += 1
+        start = time.perf_counter()
+        document = parse_document(query, **parse_options)
+        self._parse_seconds += time.perf_counter() - start
+
+        self._documents[query] = _Document(document)
+        if len(self._documents) > self._max_size:
+            self._documents.popitem(last=False)
+            self._evictions += 1
+        return document
+
+    def validate(
+        self, query: str, schema: Any, document: Any, rules: Any
+    ) -> list[GraphQLError]:
+        """Return the validation errors of the document of a query.
+
+        The errors are computed once per cached document. The rules must be the same for all
+        the documents.
+        """
+
+        entry = self._documents.get(query)
+        if entry is not None and entry.document is document:
+            if entry.errors is None:
+                entry.errors = self.__validate(schema, document, rules)
+            return entry.errors
+        return self.__validate(schema, document, rules)
+
+    def __validate(self, schema: Any, document: Any, rules: Any) -> list[GraphQLError]:
+        start = time.perf_counter()
+        errors = validate_document(schema, document, rules)
+        self._validation_seconds += time.perf_counter() - start
+        return errors
+
+    def stats(self) -> DocumentCacheStats:
+        """Return a snapshot of the cache counters."""
+
+        return DocumentCacheStats(
+            size=len(self._documents),
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            parse_seconds=self._parse_seconds,
+            validation_seconds=self._validation_seconds,
+        )
+
+
+class _DocumentCacheExtension(SchemaExtension):
+    """Schema extension parsing and validating the operations through a DocumentCache."""
+
+    cache: DocumentCache
+
+    def on_parse(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if execution_context.graphql_document is None and execution_context.query:
+            try:
+                execution_context.graphql_document = self.cache.parse(
+                    execution_context.query, **execution_context.parse_options
+                )
+            except GraphQLError:
+                # Parsed again by Strawberry, which reports the error
+                pass
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if execution_context.validation_rules and execution_context.errors is None:
+            execution_context.errors = self.cache.validate(
+                execution_context.query,
+                execution_context.schema._schema,  # pylint: disable=protected-access
+                execution_context.graphql_document,
+                execution_context.validation_rules,
+            )
+        yield
+
+
+def document_cache_extension(cache: DocumentCache) -> type[SchemaExtension]:
+    """Return the schema extension resolving the documents through a shared cache.
+
+    Strawberry creates a new extension for every operation, so the cache is a class
+    attribute of the returned extension.
+    """
+
+    return type("DocumentCacheExtension", (_DocumentCacheExtension,), {"cache": cache})
+
+
+@dataclass(frozen=True)
+class PersistedQueryStats:
+    """Snapshot of the counters of the persisted queries."""
+
+    size: int
+    hits: int
+    misses: int
+    registrations: int
+
+
+class PersistedQueries:
+    """Bounded store of the query texts sent by the clients, indexed by their SHA-256 hash.
+
+    It implements the automatic persisted queries of the Apollo clients: a client first sends
+    only the hash of a query, and sends the full text only if the hash is not known. When the
+    store is full, the least recently used query is forgotten.
+    """
+
+    _queries: "OrderedDict[str, str]"
+    _max_size: int
+
+    def __init__(self, max_size: int = 10000):
+        """
+        Parameters
+        ----------
+        max_size: int
+            Maximum number of queries in the store.
+        """
+
+        if max_size < 1:
+            raise ValueError("The store must hold at least one query")
+
+        self._queries = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+        self._registrations = 0
+
+    def get(self, sha256_hash: str) -> Optional[str]:
+        """Return the query with the given hash, or None if it is not known."""
+
+        query = self._queries.get(sha256_hash)
+        if query is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._queries.move_to_end(sha256_hash)
+        return query
+
+    def register(self, sha256_hash: str, query: str):
+        """Store a query under its hash. Raises a ValueError if the hash does not match."""
+
+        if hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+            raise ValueError("The hash does not match the query")
+        if sha256_hash not in self._queries:
+            self._registrations += 1
+        self._queries[sha256_hash] = query
+        self._queries.move_to_end(sha256_hash)
+        if len(self._queries) > self._max_size:
+            self._queries.popitem(last=False)
+
+    def stats(self) -> PersistedQueryStats:
+        """Return a snapshot of the store counters."""
+
+        return PersistedQueryStats(
+            size=len(self._queries),
+            hits=self._hits,
+            misses=self._misses,
+            registrations=self._registrations,
+        )
+
+
+class _PersistedQueryNotFound(Exception):
+    """Raised when a request sends the hash of an unknown query."""
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """GraphQL router accepting automatic persisted queries, see PersistedQueries.
+
+    The hash of the query is read from `extensions.persistedQuery.sha256Hash` of the JSON body
+    or of the URL parameters. An unknown hash is answered with the PERSISTED_QUERY_NOT_FOUND
+    error, after which the clients send the query again with its text.
+    """
+
+    persisted_queries: PersistedQueries
+    # Cache of the extension of the schema, if any, exposed for its statistics
+    document_cache: Optional[DocumentCache]
+
+    def __init__(
+        self,
+        *args,
+        persisted_queries: PersistedQueries,
+        document_cache: Optional[DocumentCache] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.persisted_queries = persisted_queries
+        self.document_cache = document_cache
+
+    def should_render_graphiql(self, request) -> bool:
+        # A GET request of a persisted query has no query text, like the ones of GraphiQL
+        return (
+            super().should_render_graphiql(request)
+            and request.query_params.get("extensions") is None
+        )
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif request.method == "GET" and "multipart" not in content_type:
+            data = self.parse_query_params(request.query_params)
+            if isinstance(data.get("extensions"), str):
+                data["extensions"] = json.loads(data["extensions"])
+        else:
+            return await super().parse_http_body(request)
+
+        if not isinstance(data, dict):
+            raise HTTPException(400, "The request must be a JSON object")
+        query = data.get("query")
+        extensions = data.get("extensions")
+        persisted = extensions.get("persistedQuery") if extensions else None
+        if isinstance(persisted, dict):
+            if persisted.get("version") != 1:
+                raise HTTPException(400, "Unsupported persisted query version")
+            sha256_hash = persisted.get("sha256Hash")
+            if not isinstance(sha256_hash, str):
+                raise HTTPException(400, "Missing hash of the persisted query")
+            if query is None:
+                query = self.persisted_queries.get(sha256_hash)
+                if query is None:
+                    raise _PersistedQueryNotFound()
+            else:
+                try:
+                    self.persisted_queries.register(sha256_hash, query)
+                except ValueError as error:
+                    raise HTTPException(400, str(error)) from error
+
+        return GraphQLRequestData(
+            query=query,
+            variables=data.get("variables"),
+            operation_name=data.get("operationName"),
+        )
+
+    def encode_json(self, response_data) -> str:
+        with span("serialization", "encode_json"):
+            return super().encode_json(response_data)
+
+    async def execute_operation(self, request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except _PersistedQueryNotFound:
+            error = GraphQLError(
+                "PersistedQueryNotFound",
+                extensions={"code": PERSISTED_QUERY_NOT_FOUND},
+            )
+            return ExecutionResult(data=None, errors=[error])
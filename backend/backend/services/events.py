@@ -0,0 +1,129 @@
+"""In-process publish/subscribe of the changes of the tasks"""
+
+import asyncio
+from typing import Union
+from backend.dao.interfaces import TaskEvent
+
+
+class SubscriberTooSlowError(Exception):
+    """Raised to a subscriber that did not keep up with the published events."""
+
+
+# Queued in place of the pending events of a subscriber that fell behind
+_OVERFLOW = object()
+
+
+class EventBroker:
+    """Broker delivering the events of the mutations to the subscribers of the same process.
+
+    Every subscriber has its own bounded queue of pending messages, one message per mutation.
+    Publishing never waits for the subscribers: when the queue of a subscriber is full, its
+    pending messages are dropped and its subscription ends with SubscriberTooSlowError, so
+    that a slow client can neither block the mutations nor grow the memory of the backend.
+    The client may subscribe again and read the current state of the tasks.
+
+    The broker must be used from the thread running the event loop.
+    """
+
+    _max_pending: int
+    _queues: "set[asyncio.Queue[Union[list[TaskEvent], object]]]"
+
+    def __init__(self, max_pending: int = 100):
+        """
+        Parameters
+        ----------
+        max_pending: int
+            Maximum number of messages waiting to be delivered to each subscriber.
+        """
+
+        if max_pending < 1:
+            raise ValueError("A subscriber must be able to hold at least one message")
+
+        self._max_pending = max_pending
+        self._queues = set()
+
+    @property
+    def subscribers(self) -> int:
+        """Number of active subscriptions."""
+        return len(self._queues)
+
+    def publish(self, events: list[TaskEvent]):
+        """Send the events of a mutation to all the subscribers, without waiting.
+
+        Parameters
+        ----------
+        events: list of TaskEvent
+            Events of the mutation, delivered together.
+        """
+
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(events)
+            except asyncio.QueueFull:
+                self._queues.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_OVERFLOW)
+
+    def subscribe(self) -> "Subscription":
+        """Subscribe to the events of the following mutations.
+
+        The subscriber is registered before returning: the events published from now on are
+        delivered, also before the first iteration. The subscription ends when it is closed.
+        """
+
+        queue: "asyncio.Queue[Union[list[TaskEvent], object]]" = asyncio.Queue(
+            self._max_pending
+        )
+        self._queues.add(queue)
+        return Subscription(self._queues, queue)
+
+
+class Subscription:
+    """Asynchronous iterator over the events published to a subscriber of an EventBroker.
+
+    Raises SubscriberTooSlowError if the events are not read fast enough. Must be closed with
+    aclose, e.g. by contextlib.aclosing, to stop receiving the events.
+    """
+
+    _queues: "set[asyncio.Queue[Union[list[TaskEvent], object]]]"
+    _queue: "asyncio.Queue[Union[list[TaskEvent], object]]"
+    _closed: bool
+
+    def __init__(
+        self,
+        queues: "set[asyncio.Queue[Union[list[TaskEvent], object]]]",
+        queue: "asyncio.Queue[Union[list[TaskEvent], object]]",
+    ):
+        """
+        Parameters
+        ----------
+        queues: set of asyncio.Queue
+            Queues of the subscribers of the broker, from which the queue is removed when the
+            subscription is closed.
+        queue: asyncio.Queue
+            Queue of the pending messages of the subscriber, already registered.
+        """
+
+        self._queues = queues
+        self._queue = queue
+        self._closed = False
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> list[TaskEvent]:
+        if self._closed:
+            raise StopAsyncIteration
+        message = await self._queue.get()
+        if message is _OVERFLOW:
+            await self.aclose()
+            raise SubscriberTooSlowError(
+                "Too many events pending: subscribe again to resume"
+            )
+        return message  # type: ignore[return-value]
+
+    async def aclose(self):
+        """End the subscription. The pending events are dropped."""
+        self._closed = True
+        self._queues.discard(self._queue)
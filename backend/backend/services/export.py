@@ -0,0 +1,208 @@
+"""Streaming export of the tasks as NDJSON or CSV"""
+
+import asyncio
+import csv
+import datetime
+import io
+import json
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from enum import Enum
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from backend.dao.interfaces import AsyncDAO, TaskFilter, TaskOutput
+from backend.services.converters import (
+    convertStatusGraphQLToDao,
+    convertUnknownStatusesDao,
+)
+from backend.services.schemas import Status
+
+# Columns of the exported files, named as the fields of the API, with the DAO field of each
+EXPORT_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("id", "id"),
+    ("title", "title"),
+    ("description", "description"),
+    ("dateTimestamp", "date"),
+    ("startTimestamp", "start_time"),
+    ("endTimestamp", "end_time"),
+    ("goal", "goal"),
+    ("status", "status"),
+)
+
+_POSITIONS = [TaskOutput._fields.index(field) for _, field in EXPORT_COLUMNS]
+
+
+class ExportFormat(Enum):
+    """Formats of the exported files."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _export_value(value: Any) -> Any:
+    """Return a value of a task in the format of the API responses."""
+
+    if isinstance(value, datetime.datetime):
+        # The MySQL DAO returns the dates as datetimes, at midnight
+        return value.date().isoformat()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def format_ndjson(tasks: list[TaskOutput]) -> str:
+    """Return the tasks as JSON objects, one per line.
+
+    Parameters
+    ----------
+    tasks: list of TaskOutput
+        Tasks to be formatted.
+    """
+
+    lines = []
+    for task in tasks:
+        record = {
+            name: _export_value(task[position])
+            for (name, _), position in zip(EXPORT_COLUMNS, _POSITIONS)
+        }
+        lines.append(json.dumps(record, ensure_ascii=False))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def format_csv(tasks: list[TaskOutput], header: bool = False) -> str:
+    """Return the tasks as CSV rows. Missing values are empty.
+
+    Parameters
+    ----------
+    tasks: list of TaskOutput
+        Tasks to be formatted.
+    header: bool
+        If True, the rows are preceded by the names of the columns.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    writer.writerows(
+        [_export_value(task[position]) for position in _POSITIONS] for task in tasks
+    )
+    return buffer.getvalue()
+
+
+class _ExportResponse(StreamingResponse):
+    """Streaming response that closes its content when it ends, also when the client
+    disconnects. A StreamingResponse leaves it to the garbage collector."""
+
+    body_iterator: AsyncGenerator[str, None]
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+
+def create_export_router(
+    dao: AsyncDAO, chunk_size: int = 1000, max_exports: int = 2
+) -> APIRouter:
+    """Factory function to create the router of the export endpoint.
+
+    The tasks are read and sent in chunks, so the memory used by an export does not depend on
+    the number of tasks. An export lasts as long as its client takes to download it, and may
+    keep a database connection as long, see DAO.iter_tasks: the exports beyond `max_exports`
+    are answered with 503 until one ends.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    chunk_size: int
+        Number of tasks read from the DAO and sent to the client at once.
+    max_exports: int
+        Maximum number of exports running at the same time.
+    """
+
+    if max_exports < 1:
+        raise ValueError("At least one export must be allowed")
+    running = asyncio.Semaphore(max_exports)
+    router = APIRouter()
+
+    @router.get("")
+    async def export_tasks(
+        format: ExportFormat = ExportFormat.NDJSON,  # pylint: disable=redefined-builtin
+        status: Optional[Status] = None,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> StreamingResponse:
+        """Stream all the tasks satisfying the filters, sorted by id.
+
+        Parameters
+        ----------
+        format: ExportFormat
+            Format of the file, NDJSON (default) or CSV.
+        status: Status
+            Optional, export only the tasks with this status.
+        date_from: datetime.date
+            Optional, export only the tasks from this date (included).
+        date_to: datetime.date
+            Optional, export only the tasks until this date (included).
+        """
+
+        filters: TaskFilter = {}
+        if status is not None:
+            filters["status"] = convertStatusGraphQLToDao(status)
+        if date_from is not None:
+            filters["date_from"] = date_from
+        if date_to is not None:
+            filters["date_to"] = date_to
+
+        async def content() -> AsyncGenerator[str, None]:
+            try:
+                # Reached before the response, see below
+                yield ""
+                if format == ExportFormat.CSV:
+                    # The header is sent also when no task is exported
+                    yield format_csv([], header=True)
+                # Closed also if the client disconnects, to release the database connection
+                async with aclosing(
+                    dao.iter_tasks(filters, chunk_size=chunk_size)
+                ) as chunks:
+                    async for tasks in chunks:
+                        # The statuses are the ones of the API, as the other fields
+                        tasks = convertUnknownStatusesDao(tasks)
+                        if format == ExportFormat.CSV:
+                            yield format_csv(tasks)
+                        else:
+                            yield format_ndjson(tasks)
+            finally:
+                running.release()
+
+        if running.locked():
+            raise HTTPException(
+                status_code=503,
+                detail="Too many exports running, retry later",
+                headers={"Retry-After": "10"},
+            )
+        await running.acquire()
+        # Started here, so that closing the stream releases the export, also if the client
+        # disconnects before the stream is read
+        stream = content()
+        await anext(stream)
+
+        filename = f"tasks.{format.value}"
+        return _ExportResponse(
+            stream,
+            media_type=_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    return router
@@ -1,76 +1,576 @@
 """GraphQL queries and mutations"""
 
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import aclosing
 import datetime
+import functools
 from typing import Optional
 import strawberry
-from strawberry.fastapi import GraphQLRouter
-from backend.dao.interfaces import DAO
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField
+from backend.dao.interfaces import (
+    AsyncDAO,
+    OptionalFields as OptionalFieldsDao,
+    TaskFilter,
+    TaskInput as TaskInDao,
+    TaskResult as TaskResultDao,
+    TaskUpdate as TaskUpdateDao,
+)
 from backend.services.converters import (
+    convertEventDaoToGraphQL,
+    convertMatchesDaoToGraphQL,
+    convertOrderGraphQLToDao,
+    convertSelectionGraphQLToDao,
+    convertStatsDaoToGraphQL,
+    convertStatusGraphQLToDao,
     convertTaskDaoToGraphQL,
     convertTaskGraphqlToDao,
+    convertTaskResultDaoToGraphQL,
+    convertTasksDaoToGraphQL,
     convertTaskUpdateGraphQLToDao,
 )
-from backend.services.schemas import Status, TaskInput, TaskOutput, TaskUpdate
+from backend.services.cursors import decode_cursor, decode_search_cursor
+from backend.services.documents import (
+    DocumentCache,
+    PersistedQueries,
+    PersistedQueryRouter,
+    document_cache_extension,
+)
+from backend.metrics import MetricsRegistry, StatsCollector
+from backend.services.events import EventBroker
+from backend.services.monitoring import TracingExtension, metrics_extension
+from backend.services.response_cache import (
+    CachedResponseRouter,
+    DataVersion,
+    ResponseCache,
+)
+from backend.services.schemas import (
+    NewTask,
+    Status,
+    TaskChanges,
+    TaskEvent,
+    TaskInput,
+    TaskMatch,
+    TaskOrder,
+    TaskOutput,
+    TaskResult,
+    TaskStats,
+    TaskUpdate,
+)
+from backend.services.stats import StatsCache
+
+
+def requested_fields(info: Info, nested: Optional[str] = None) -> Optional[list[str]]:
+    """Return the DAO fields needed to resolve the tasks selected by the current query.
+
+    Parameters
+    ----------
+    info: strawberry.types.Info
+        Information about the field being resolved, as given by Strawberry.
+    nested: str
+        Name of the sub-field holding the task, e.g. "task" for the matches of a search. If
+        None, the resolved field returns the tasks.
+    """
+
+    names: set[str] = set()
+
+    def collect(selections: list):
+        for selection in selections:
+            if isinstance(selection, SelectedField):
+                names.add(selection.name)
+            else:
+                # Fragments
+                collect(selection.selections)
+
+    def children(selections: list, name: str) -> Iterator:
+        for selection in selections:
+            if isinstance(selection, SelectedField):
+                if selection.name == name:
+                    yield from selection.selections
+            else:
+                yield from children(selection.selections, name)
+
+    for field in info.selected_fields:
+        if nested is None:
+            collect(field.selections)
+        else:
+            collect(list(children(field.selections, nested)))
+    return convertSelectionGraphQLToDao(names)
 
 
-def get_task_by_id(dao: DAO, task_id: strawberry.ID) -> TaskOutput:
+async def get_task_by_id(
+    dao: AsyncDAO, task_id: strawberry.ID, fields: Optional[list[str]] = None
+) -> TaskOutput:
     """Asks the DAO to return a task with a specific ID.
 
     Parameters
     ----------
-    dao: class (DAO)
-        Data Access Object (DAO). See the DAO protocol for more information.
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
     task_id: int
         Id of the task to be retrieved.
+    fields: list of str
+        DAO fields of the task to be retrieved. If None, all the fields.
     """
 
-    task_dao = dao.get_task_by_id(int(task_id))
+    task_dao = await dao.get_task_by_id(int(task_id), fields)
     task_ql = convertTaskDaoToGraphQL(task_dao)
     return task_ql
 
 
-def get_all_tasks(dao: DAO) -> list[TaskOutput]:
+async def get_all_tasks(
+    dao: AsyncDAO, fields: Optional[list[str]] = None
+) -> list[TaskOutput]:
     """Asks the DAO to return all tasks stored in the database.
 
     Parameters
     ----------
-    dao: class (DAO)
-        Data Access Object (DAO). See the DAO protocol for more information.
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    fields: list of str
+        DAO fields of the tasks to be retrieved. If None, all the fields.
+    """
+
+    tasks_dao = await dao.get_all_tasks(fields)
+    tasks_ql = convertTasksDaoToGraphQL(tasks_dao)
+    return tasks_ql
+
+
+async def get_filtered_tasks(
+    dao: AsyncDAO,
+    filters: TaskFilter,
+    order: TaskOrder,
+    first: Optional[int],
+    after: Optional[str],
+    fields: Optional[list[str]] = None,
+) -> list[TaskOutput]:
+    """Asks the DAO to return the tasks satisfying some conditions, sorted and paginated.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    filters: TypedDict (TaskFilter)
+        Conditions the returned tasks must satisfy.
+    order: TaskOrder
+        Ordering of the returned tasks.
+    first: int
+        Maximum number of tasks to return. If None, all the tasks are returned.
+    after: str
+        Cursor of the last task of the previous page, if any.
+    fields: list of str
+        DAO fields of the tasks to be retrieved. If None, all the fields.
     """
 
-    tasks_dao = dao.get_all_tasks()
-    tasks_ql = [convertTaskDaoToGraphQL(task) for task in tasks_dao]
+    order_by, descending = convertOrderGraphQLToDao(order)
+    cursor = decode_cursor(after) if after is not None else None
+    tasks_dao = await dao.get_tasks(
+        filters,
+        order_by=order_by,
+        descending=descending,
+        first=first,
+        after=cursor,
+        fields=fields,
+    )
+    tasks_ql = convertTasksDaoToGraphQL(tasks_dao)
     return tasks_ql
 
 
-def create_graphql_app(dao: DAO):
+async def search_tasks(
+    dao: AsyncDAO,
+    text: str,
+    first: Optional[int],
+    after: Optional[str],
+    fields: Optional[list[str]] = None,
+) -> list[TaskMatch]:
+    """Asks the DAO to return the tasks matching a text, sorted by relevance and paginated.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    text: str
+        Words to be searched in the titles and descriptions.
+    first: int
+        Maximum number of tasks to return. If None, all the matching tasks are returned.
+    after: str
+        Cursor of the last match of the previous page, if any.
+    fields: list of str
+        DAO fields of the tasks to be retrieved. If None, all the fields.
+    """
+
+    cursor = decode_search_cursor(after) if after is not None else None
+    matches_dao = await dao.search_tasks(text, first=first, after=cursor, fields=fields)
+    return convertMatchesDaoToGraphQL(matches_dao)
+
+
+async def get_scheduled_tasks(
+    dao: AsyncDAO,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    fields: Optional[list[str]] = None,
+) -> list[TaskOutput]:
+    """Asks the DAO to return the tasks scheduled between two moments.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    start: datetime.datetime
+        Moment from which the tasks are returned, included. The time zone, if any, is
+        ignored, as the tasks have none.
+    end: datetime.datetime
+        Moment until which the tasks are returned, excluded.
+    fields: list of str
+        DAO fields of the tasks to be retrieved. If None, all the fields.
+    """
+
+    tasks_dao = await dao.get_scheduled_tasks(
+        start.replace(tzinfo=None), end.replace(tzinfo=None), fields=fields
+    )
+    return convertTasksDaoToGraphQL(tasks_dao)
+
+
+async def check_overlaps(
+    dao: AsyncDAO, task: OptionalFieldsDao, task_id: Optional[int] = None
+):
+    """Raise a ValueError if a task overlaps other scheduled tasks.
+
+    The check is not atomic with the following mutation: two tasks added at the same time
+    may overlap.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    task: TypedDict (OptionalFields)
+        Fields of the new task, or new fields of an updated task.
+    task_id: int
+        Id of the updated task, whose current date and times are used if not updated.
+    """
+
+    date = task.get("date")
+    start_time = task.get("start_time")
+    end_time = task.get("end_time")
+    if task_id is not None and None in (date, start_time, end_time):
+        current = await dao.get_task_by_id(
+            task_id, fields=("date", "start_time", "end_time")
+        )
+        date = date if date is not None else current.date
+        start_time = start_time if start_time is not None else current.start_time
+        end_time = end_time if end_time is not None else current.end_time
+    if date is None or start_time is None or end_time is None or end_time < start_time:
+        return
+
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    overlapping = await dao.get_scheduled_tasks(
+        datetime.datetime.combine(date, start_time),
+        datetime.datetime.combine(date, end_time),
+        fields=(),
+    )
+    task_ids = [str(task.id) for task in overlapping if task.id != task_id]
+    if task_ids:
+        raise ValueError(f"The task overlaps the tasks {', '.join(task_ids)}")
+
+
+async def task_stats(
+    dao: AsyncDAO, filters: TaskFilter, stats_cache: Optional[StatsCache] = None
+) -> TaskStats:
+    """Asks the DAO, or the cache of its statistics, for the number and the duration of the
+    tasks satisfying some conditions.
+
+    Parameters
+    ----------
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    filters: TypedDict (TaskFilter)
+        Conditions the counted tasks must satisfy.
+    stats_cache: StatsCache
+        If given, cache of the statistics of the DAO, updated by its mutations.
+    """
+
+    if stats_cache is not None:
+        groups_dao = await stats_cache.get(dao, filters)
+    else:
+        groups_dao = await dao.task_stats(filters)
+    return convertStatsDaoToGraphQL(groups_dao)
+
+
+# The times take few distinct values, and parsing one is slow
+@functools.lru_cache(maxsize=4096)
+def parse_time(timestamp: Optional[str]) -> Optional[datetime.time]:
+    """Convert a time received by the API (hh:mm) to a time object.
+    The seconds of the times returned by the API (hh:mm:ss) are also accepted.
+
+    Parameters
+    ----------
+    timestamp: str (hh:mm)
+        Time to be converted. If None or empty, None is returned.
+    """
+
+    if not timestamp:
+        return None
+    if timestamp.count(":") == 2:
+        return datetime.datetime.strptime(timestamp, "%H:%M:%S").time()
+    return datetime.datetime.strptime(timestamp, "%H:%M").time()
+
+
+def make_task_input(
+    title: str,
+    description: Optional[str],
+    date_timestamp: Optional[datetime.date],
+    start_timestamp: Optional[str],
+    end_timestamp: Optional[str],
+    goal: Optional[str],
+    status: Status,
+) -> TaskInDao:
+    """Convert the fields of a new task, as received by the API, to the DAO format.
+    See the `add` mutation for the meaning of the parameters.
+    """
+
+    task_ql = TaskInput(
+        title=title,
+        description=description,
+        date_timestamp=date_timestamp,
+        start_timestamp=parse_time(start_timestamp),
+        end_timestamp=parse_time(end_timestamp),
+        goal=goal,
+        status=status,
+    )
+    return convertTaskGraphqlToDao(task_ql)
+
+
+def make_task_update(
+    title: Optional[str],
+    description: Optional[str],
+    date_timestamp: Optional[float],
+    start_timestamp: Optional[str],
+    end_timestamp: Optional[str],
+    goal: Optional[str],
+    status: Optional[Status],
+) -> TaskUpdateDao:
+    """Convert the fields to update in a task, as received by the API, to the DAO format.
+    See the `update` mutation for the meaning of the parameters.
+    """
+
+    date = datetime.date.fromtimestamp(date_timestamp) if date_timestamp else None
+
+    task_ql = TaskUpdate(
+        title=title,
+        description=description,
+        date_timestamp=date,
+        start_timestamp=parse_time(start_timestamp),
+        end_timestamp=parse_time(end_timestamp),
+        goal=goal,
+        status=status,
+    )
+    return convertTaskUpdateGraphQLToDao(task_ql=task_ql)
+
+
+def merge_batch_results(
+    errors: dict[int, str], results_dao: list[TaskResultDao]
+) -> list[TaskResult]:
+    """Merge the items rejected by the API with the results of a batch operation of the DAO.
+
+    Parameters
+    ----------
+    errors: dict
+        Error message of each rejected item, indexed by the position of the item in the batch.
+    results_dao: list of TypedDict (TaskResult)
+        Results returned by the DAO for the accepted items, in the same order.
+    """
+
+    results: list[TaskResult] = []
+    accepted = iter(results_dao)
+    for position in range(len(errors) + len(results_dao)):
+        if position in errors:
+            results.append(TaskResult(task=None, error=errors[position]))
+        else:
+            results.append(convertTaskResultDaoToGraphQL(next(accepted)))
+    return results
+
+
+def create_graphql_app(
+    dao: AsyncDAO,
+    broker: Optional[EventBroker] = None,
+    document_cache_size: int = 1000,
+    persisted_queries_size: int = 10000,
+    data_version: Optional[DataVersion] = None,
+    response_cache_size: int = 1000,
+    metrics: Optional[MetricsRegistry] = None,
+    trace_resolvers: bool = False,
+    stats_cache: Optional[StatsCache] = None,
+) -> PersistedQueryRouter:
     """Factory function to create a GraphQL application.
 
+    The parsed and validated queries are cached, and the clients may send only the hash of
+    the queries already sent (automatic persisted queries). See the `document_cache` and
+    `persisted_queries` attributes of the returned router for their statistics.
+
+    If a data version is given, the responses of the queries have ETags and are cached, see
+    CachedResponseRouter.
+
     Parameters
     ----------
-    dao: class (DAO)
-        Data Access Object (DAO). See the DAO protocol for more information.
+    dao: class (AsyncDAO)
+        Asynchronous Data Access Object (DAO). See the AsyncDAO protocol for more information.
+    broker: EventBroker
+        Broker of the events of the mutations, see NotifyingDAO. If given, the changes of the
+        tasks can be subscribed to over WebSocket.
+    document_cache_size: int
+        Maximum number of parsed and validated queries kept in memory.
+    persisted_queries_size: int
+        Maximum number of persisted queries kept in memory.
+    data_version: DataVersion
+        Version of the data, bumped by every mutation of the DAO, see NotifyingDAO.
+    response_cache_size: int
+        Maximum number of query responses kept in memory, if a data version is given.
+        If 0, the responses have ETags but are not cached.
+    metrics: MetricsRegistry
+        If given, the duration and the errors of the operations, and the statistics of the
+        caches, are added to this registry.
+    trace_resolvers: bool
+        If True, the resolvers are added to the traces of the requests, see
+        backend.profiling. It slows down the resolution of every field.
+    stats_cache: StatsCache
+        Cache of the statistics of the tasks, updated by the mutations of the DAO, see
+        NotifyingDAO. If None, every `taskStats` query reads the DAO.
     """
 
-    def get_tasks(task_id: Optional[strawberry.ID] = None) -> list[TaskOutput]:
+    async def get_tasks(
+        info: Info,
+        task_id: Optional[strawberry.ID] = None,
+        status: Optional[Status] = None,
+        goal: Optional[str] = None,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+        order_by: TaskOrder = TaskOrder.ID_ASC,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> list[TaskOutput]:
         """Query to return tasks from the database.
 
         Parameters
         ----------
         task_id: int
-            Id of the task to be retrieved. If None, all tasks are retrieved.
+            Id of the task to be retrieved. If None, all tasks satisfying the other
+            parameters are retrieved.
+        status: Status
+            Optional, return only the tasks with this status.
+        goal: str
+            Optional, return only the tasks belonging to this goal.
+        date_from: datetime.date
+            Optional, return only the tasks on or after this date.
+        date_to: datetime.date
+            Optional, return only the tasks on or before this date.
+        order_by: TaskOrder
+            Ordering of the returned tasks. By default, they are sorted by id.
+        first: int
+            Optional, maximum number of tasks to return.
+        after: str
+            Optional, cursor of the last task of the previous page. Only the tasks following
+            it are returned.
         """
 
+        # Only the columns needed by the query are read and converted
+        fields = requested_fields(info)
+
         tasks: list[TaskOutput] = []
         if task_id is not None:
-            tasks = [get_task_by_id(dao, task_id)]
+            tasks = [await get_task_by_id(dao, task_id, fields)]
+            return tasks
+
+        filters = TaskFilter()
+        if status is not None:
+            filters["status"] = convertStatusGraphQLToDao(status)
+        if goal is not None:
+            filters["goal"] = goal
+        if date_from is not None:
+            filters["date_from"] = date_from
+        if date_to is not None:
+            filters["date_to"] = date_to
+
+        if (
+            filters
+            or order_by != TaskOrder.ID_ASC
+            or first is not None
+            or after is not None
+        ):
+            tasks = await get_filtered_tasks(
+                dao, filters, order_by, first, after, fields
+            )
         else:
-            tasks = get_all_tasks(dao)
+            tasks = await get_all_tasks(dao, fields)
 
         return tasks
 
+    async def get_matches(
+        info: Info, text: str, first: Optional[int] = None, after: Optional[str] = None
+    ) -> list[TaskMatch]:
+        """Query to search the tasks by the words of their title and description.
+
+        Parameters
+        ----------
+        text: str
+            Words to be searched. A task matches if it contains any of them. The words
+            shorter than 3 characters and the most common English words are ignored.
+        first: int
+            Optional, maximum number of tasks to return.
+        after: str
+            Optional, cursor of the last match of the previous page. Only the matches
+            following it are returned.
+        """
+
+        fields = requested_fields(info, nested="task")
+        return await search_tasks(dao, text, first, after, fields)
+
+    async def get_schedule(
+        info: Info, start: datetime.datetime, end: datetime.datetime
+    ) -> list[TaskOutput]:
+        """Query to return the tasks scheduled between two moments, e.g. in a week, sorted by
+        date and start time.
+
+        Parameters
+        ----------
+        start: datetime.datetime
+            Moment from which the tasks are returned, included.
+        end: datetime.datetime
+            Moment until which the tasks are returned, excluded.
+        """
+
+        fields = requested_fields(info)
+        return await get_scheduled_tasks(dao, start, end, fields)
+
+    async def get_stats(
+        goal: Optional[str] = None,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> TaskStats:
+        """Query to return the number and the duration of the tasks, grouped by status, goal
+        and day.
+
+        Parameters
+        ----------
+        goal: str
+            Optional, count only the tasks belonging to this goal.
+        date_from: datetime.date
+            Optional, count only the tasks on or after this date.
+        date_to: datetime.date
+            Optional, count only the tasks on or before this date.
+        """
+
+        filters = TaskFilter()
+        if goal is not None:
+            filters["goal"] = goal
+        if date_from is not None:
+            filters["date_from"] = date_from
+        if date_to is not None:
+            filters["date_to"] = date_to
+        return await task_stats(dao, filters, stats_cache)
+
     # TODO: start and end times are not timestamp anymore
-    def add_task(
+    async def add_task(
         title: str,
         description: Optional[str] = None,
         date_timestamp: Optional[datetime.date] = None,
@@ -78,6 +578,7 @@ def create_graphql_app(dao: DAO):
         end_timestamp: Optional[str] = None,
         goal: Optional[str] = None,
         status: Status = Status.OPEN,
+        reject_overlaps: bool = False,
     ) -> TaskOutput:
         """Mutation to add a new task to the database.
 
@@ -98,33 +599,25 @@ def create_graphql_app(dao: DAO):
         status: Status
             Status of the task (e.g., open, in progress,...).
             See the enumeration Status for the possible values.
+        reject_overlaps: bool
+            If True, the task is not added if it overlaps other scheduled tasks.
         """
 
-        start_time = (
-            datetime.datetime.strptime(start_timestamp, "%H:%M").time()
-            if start_timestamp
-            else None
-        )
-        end_time = (
-            datetime.datetime.strptime(end_timestamp, "%H:%M").time()
-            if end_timestamp
-            else None
-        )
-
-        task_ql = TaskInput(
+        task_dao = make_task_input(
             title=title,
             description=description,
             date_timestamp=date_timestamp,
-            start_timestamp=start_time,
-            end_timestamp=end_time,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
             goal=goal,
             status=status,
         )
-        task_dao = convertTaskGraphqlToDao(task_ql)
-        added_task = dao.add_task(task_dao)
+        if reject_overlaps:
+            await check_overlaps(dao, task_dao)
+        added_task = await dao.add_task(task_dao)
         return convertTaskDaoToGraphQL(added_task)
 
-    def rm_task(task_id: int) -> TaskOutput:
+    async def rm_task(info: Info, task_id: int) -> TaskOutput:
         """Mutation to remove a task to the database. It returns the deleted task.
 
         Parameters
@@ -133,10 +626,11 @@ def create_graphql_app(dao: DAO):
             Id of the task to be removed.
         """
 
-        removed_id = dao.rm_task(task_id=task_id)
+        removed_id = await dao.rm_task(task_id=task_id, fields=requested_fields(info))
         return convertTaskDaoToGraphQL(removed_id)
 
-    def update_task(
+    async def update_task(
+        info: Info,
         task_id: int,
         title: Optional[str] = None,
         description: Optional[str] = None,
@@ -145,6 +639,7 @@ def create_graphql_app(dao: DAO):
         end_timestamp: Optional[str] = None,
         goal: Optional[str] = None,
         status: Optional[Status] = None,
+        reject_overlaps: bool = False,
     ) -> TaskOutput:
         """Mutation to update an existing task. It returns the updated task.
 
@@ -170,34 +665,111 @@ def create_graphql_app(dao: DAO):
         status: Status
             Optional, new status of the task (e.g., open, in progress,...).
             See the enumeration Status for the possible values.
+        reject_overlaps: bool
+            If True, the task is not updated if it would overlap other scheduled tasks.
         """
 
-        date = datetime.date.fromtimestamp(date_timestamp) if date_timestamp else None
-        start_time = (
-            datetime.datetime.strptime(start_timestamp, "%H:%M").time()
-            if start_timestamp
-            else None
-        )
-        end_time = (
-            datetime.datetime.strptime(end_timestamp, "%H:%M").time()
-            if end_timestamp
-            else None
-        )
-
-        task_ql = TaskUpdate(
+        task_dao = make_task_update(
             title=title,
             description=description,
-            date_timestamp=date,
-            start_timestamp=start_time,
-            end_timestamp=end_time,
+            date_timestamp=date_timestamp,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
             goal=goal,
             status=status,
         )
-
-        task_dao = convertTaskUpdateGraphQLToDao(task_ql=task_ql)
-        task_updated = dao.update_task(task_id=task_id, new_fields=task_dao)
+        if reject_overlaps:
+            await check_overlaps(dao, task_dao, task_id)
+        task_updated = await dao.update_task(
+            task_id=task_id, new_fields=task_dao, fields=requested_fields(info)
+        )
         return convertTaskDaoToGraphQL(task_updated)
 
+    async def add_tasks(tasks: list[NewTask]) -> list[TaskResult]:
+        """Mutation to add several tasks to the database in a single transaction.
+        It returns, for each task, either the added task or an error.
+
+        Parameters
+        ----------
+        tasks: list of NewTask
+            Tasks to be added. See the `add` mutation for the meaning of the fields.
+        """
+
+        errors: dict[int, str] = {}
+        tasks_dao: list[TaskInDao] = []
+        for position, task in enumerate(tasks):
+            try:
+                tasks_dao.append(
+                    make_task_input(
+                        title=task.title,
+                        description=task.description,
+                        date_timestamp=task.date_timestamp,
+                        start_timestamp=task.start_timestamp,
+                        end_timestamp=task.end_timestamp,
+                        goal=task.goal,
+                        status=task.status,
+                    )
+                )
+            except ValueError as error:
+                errors[position] = str(error)
+
+        results_dao = await dao.add_tasks(tasks_dao) if tasks_dao else []
+        return merge_batch_results(errors, results_dao)
+
+    async def rm_tasks(task_ids: list[int]) -> list[TaskResult]:
+        """Mutation to remove several tasks from the database in a single transaction.
+        It returns, for each id, either the removed task or an error.
+
+        Parameters
+        ----------
+        task_ids: list of int
+            Ids of the tasks to be removed.
+        """
+
+        results_dao = await dao.rm_tasks(task_ids) if task_ids else []
+        return merge_batch_results({}, results_dao)
+
+    async def update_tasks(updates: list[TaskChanges]) -> list[TaskResult]:
+        """Mutation to update several tasks in a single transaction.
+        It returns, for each update, either the updated task or an error.
+
+        Parameters
+        ----------
+        updates: list of TaskChanges
+            Id of each task to be updated with the new values of its fields. See the `update`
+            mutation for the meaning of the fields.
+        """
+
+        errors: dict[int, str] = {}
+        updates_dao: list[tuple[int, TaskUpdateDao]] = []
+        for position, update in enumerate(updates):
+            try:
+                task_dao = make_task_update(
+                    title=update.title,
+                    description=update.description,
+                    date_timestamp=update.date_timestamp,
+                    start_timestamp=update.start_timestamp,
+                    end_timestamp=update.end_timestamp,
+                    goal=update.goal,
+                    status=update.status,
+                )
+                updates_dao.append((update.task_id, task_dao))
+            except ValueError as error:
+                errors[position] = str(error)
+
+        results_dao = await dao.update_tasks(updates_dao) if updates_dao else []
+        return merge_batch_results(errors, results_dao)
+
+    async def get_task_events() -> AsyncGenerator[list[TaskEvent], None]:
+        """Subscription to the changes of the tasks made by the following mutations.
+        It sends one list of events per mutation.
+        """
+
+        assert broker is not None
+        async with aclosing(broker.subscribe()) as messages:
+            async for events_dao in messages:
+                yield [convertEventDaoToGraphQL(event) for event in events_dao]
+
     @strawberry.type
     class Query:
         """Class to specify the possible queries."""
@@ -206,6 +778,22 @@ def create_graphql_app(dao: DAO):
             resolver=get_tasks, description="Retrieve a list of tasks"
         )
 
+        search_tasks: list[TaskMatch] = strawberry.field(
+            resolver=get_matches,
+            description="Search the tasks by the words of their title and description, "
+            "the most relevant first",
+        )
+
+        scheduled_tasks: list[TaskOutput] = strawberry.field(
+            resolver=get_schedule,
+            description="Tasks scheduled between two moments, by date and start time",
+        )
+
+        task_stats: TaskStats = strawberry.field(
+            resolver=get_stats,
+            description="Number and duration of the tasks, by status, goal and day",
+        )
+
     @strawberry.type
     class Mutation:
         """Class to specify the possible mutations."""
@@ -222,7 +810,92 @@ def create_graphql_app(dao: DAO):
             resolver=update_task, description="Update an existing task"
         )
 
-    schema = strawberry.Schema(query=Query, mutation=Mutation)
-    graphql_app = GraphQLRouter(schema)
+        add_many: list[TaskResult] = strawberry.field(
+            resolver=add_tasks, description="Add several tasks in a single transaction"
+        )
+
+        rm_many: list[TaskResult] = strawberry.field(
+            resolver=rm_tasks,
+            description="Remove several tasks in a single transaction",
+        )
+
+        update_many: list[TaskResult] = strawberry.field(
+            resolver=update_tasks,
+            description="Update several tasks in a single transaction",
+        )
+
+    @strawberry.type
+    class Subscription:
+        """Class to specify the possible subscriptions."""
+
+        task_events: list[TaskEvent] = strawberry.subscription(
+            resolver=get_task_events,
+            description="Changes of the tasks, one list of events per mutation",
+        )
+
+    document_cache = DocumentCache(document_cache_size)
+    extensions = [document_cache_extension(document_cache)]
+    if metrics is not None:
+        extensions.append(metrics_extension(metrics))
+    if trace_resolvers:
+        extensions.append(TracingExtension)
+    schema = strawberry.Schema(
+        query=Query,
+        mutation=Mutation,
+        subscription=Subscription if broker is not None else None,
+        extensions=extensions,
+    )
+    persisted_queries = PersistedQueries(persisted_queries_size)
+    graphql_app: PersistedQueryRouter
+    if data_version is not None:
+        graphql_app = CachedResponseRouter(
+            schema,
+            persisted_queries=persisted_queries,
+            document_cache=document_cache,
+            data_version=data_version,
+            response_cache=ResponseCache(response_cache_size),
+        )
+    else:
+        graphql_app = PersistedQueryRouter(
+            schema,
+            persisted_queries=persisted_queries,
+            document_cache=document_cache,
+        )
+
+    if metrics is not None:
+        metrics.register(
+            StatsCollector(
+                "graphql_document_cache",
+                "Cache of the parsed and validated queries",
+                document_cache.stats,
+                counters=("hits", "misses", "evictions"),
+            )
+        )
+        metrics.register(
+            StatsCollector(
+                "graphql_persisted_queries",
+                "Persisted queries",
+                persisted_queries.stats,
+                counters=("hits", "misses", "registrations"),
+            )
+        )
+        if isinstance(graphql_app, CachedResponseRouter):
+            metrics.register(
+                StatsCollector(
+                    "graphql_response_cache",
+                    "Cache of the query responses",
+                    graphql_app.response_cache.stats,
+                    counters=("hits", "misses", "not_modified", "invalidations"),
+                )
+            )
+        if stats_cache is not None:
+            metrics.register(
+                StatsCollector(
+                    "task_stats_cache",
+                    "Cache of the statistics of the tasks",
+                    stats_cache.stats,
+                    counters=("hits", "misses", "updates", "invalidations"),
+                )
+            )
 
     return graphql_app
@@ -0,0 +1,48 @@
+"""Liveness and readiness probes of the backend"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+
+def create_health_router(
+    ready: Callable[[], Awaitable[None]], timeout: float = 2.0
+) -> APIRouter:
+    """Factory function to create the router of the health probes.
+
+    - `GET /live` answers as soon as the process serves HTTP requests, without touching the
+      database: a failure means that the process must be restarted.
+    - `GET /ready` answers 200 if the backend can serve the requests, 503 otherwise: the
+      process must not receive traffic, but it does not need to be restarted.
+
+    Parameters
+    ----------
+    ready: callable
+        Coroutine function checking that the backend is ready, e.g. that the database is
+        reachable. It raises an exception otherwise.
+    timeout: float
+        Seconds after which the readiness check is considered failed.
+    """
+
+    router = APIRouter()
+
+    @router.get("/live")
+    async def live() -> dict[str, str]:
+        """Return 200 while the process is running."""
+        return {"status": "ok"}
+
+    @router.get("/ready")
+    async def is_ready() -> JSONResponse:
+        """Return 200 if the backend can serve the requests, 503 otherwise."""
+
+        try:
+            await asyncio.wait_for(ready(), timeout)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            reason = str(error) or type(error).__name__
+            logging.warning("Readiness check failed: %s", reason)
+            return JSONResponse({"status": "unavailable", "reason": reason}, 503)
+        return JSONResponse({"status": "ok"})
+
+    return router
@@ -0,0 +1,161 @@
+"""Metrics and traces of the GraphQL operations, and the /metrics endpoint"""
+
+from inspect import isawaitable
+import time
+from typing import Any, Awaitable, Callable, Iterator, Optional
+from fastapi import APIRouter, Response
+from graphql import OperationDefinitionNode
+from strawberry.extensions import SchemaExtension
+from strawberry.types import ExecutionContext
+from backend.metrics import CONTENT_TYPE, Counter, Histogram, MetricsRegistry
+from backend.profiling import Trace, current_trace
+
+# Label of the operations beyond the maximum number of distinct names
+_OTHER_OPERATION = "other"
+
+
+def _operation(execution_context: ExecutionContext) -> tuple[str, str]:
+    """Return the name and the type of the executed operation."""
+
+    document = execution_context.graphql_document
+    if document is None:
+        return "invalid", "unknown"
+
+    definition: Optional[OperationDefinitionNode] = None
+    for node in document.definitions:
+        if isinstance(node, OperationDefinitionNode) and (
+            execution_context.operation_name is None
+            or (node.name and node.name.value == execution_context.operation_name)
+        ):
+            definition = node
+            break
+    if definition is None:
+        return "invalid", "unknown"
+
+    name = definition.name.value if definition.name else "anonymous"
+    return name, definition.operation.value
+
+
+class _MetricsExtension(SchemaExtension):
+    """Schema extension measuring the duration and the errors of the operations."""
+
+    latency: Histogram
+    errors: Counter
+    # Names of the operations with their own labels
+    operations: set[str]
+    max_operations: int
+
+    def on_operation(self) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+        name, kind = _operation(self.execution_context)
+        if name not in self.operations:
+            # The names are chosen by the clients: their number is bounded
+            if len(self.operations) < self.max_operations:
+                self.operations.add(name)
+            else:
+                name = _OTHER_OPERATION
+        labels = (name, kind)
+        self.latency.observe(elapsed, labels)
+        if self.execution_context.errors:
+            self.errors.inc(labels)
+
+
+def metrics_extension(
+    registry: MetricsRegistry, max_operations: int = 100
+) -> type[SchemaExtension]:
+    """Return the schema extension adding the metrics of the operations to a registry.
+
+    - `graphql_operation_duration_seconds`: histogram of the duration of the operations,
+      from parsing to execution, by operation name and type.
+    - `graphql_operation_errors_total`: operations whose response has errors.
+
+    Parameters
+    ----------
+    registry: MetricsRegistry
+        Registry the metrics are added to.
+    max_operations: int
+        Maximum number of operation names with their own labels. The following ones are
+        labelled as "other".
+    """
+
+    latency = registry.register(
+        Histogram(
+            "graphql_operation_duration_seconds",
+            "Duration of the GraphQL operations",
+            label_names=("operation", "type"),
+        )
+    )
+    errors = registry.register(
+        Counter(
+            "graphql_operation_errors_total",
+            "GraphQL operations with errors",
+            label_names=("operation", "type"),
+        )
+    )
+    return type(
+        "MetricsExtension",
+        (_MetricsExtension,),
+        {
+            "latency": latency,
+            "errors": errors,
+            "operations": set(),
+            "max_operations": max_operations,
+        },
+    )
+
+
+class TracingExtension(SchemaExtension):
+    """Schema extension adding the resolvers of the root fields to the trace of the request,
+    see backend.profiling, and naming the trace after the operation.
+
+    The extension is called for every resolved field, also of the tasks: it should be used
+    only if the requests are traced.
+    """
+
+    def on_operation(self) -> Iterator[None]:
+        yield
+        trace = current_trace()
+        if trace is not None:
+            name, _ = _operation(self.execution_context)
+            trace.name = name
+
+    def resolve(self, _next: Callable, root: Any, info: Any, *args, **kwargs) -> Any:
+        trace = current_trace()
+        if trace is None or info.path.prev is not None:
+            return _next(root, info, *args, **kwargs)
+
+        start = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if isawaitable(result):
+            return self.__timed(result, trace, info.path.key, start)
+        trace.add("resolver", info.path.key, start, time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    async def __timed(result: Awaitable, trace: Trace, name: str, start: float) -> Any:
+        try:
+            return await result
+        finally:
+            trace.add("resolver", name, start, time.perf_counter() - start)
+
+
+def create_metrics_router(registry: MetricsRegistry) -> APIRouter:
+    """Factory function to create the router of the metrics endpoint.
+
+    Parameters
+    ----------
+    registry: MetricsRegistry
+        Metrics exposed by the endpoint.
+    """
+
+    router = APIRouter()
+
+    @router.get("")
+    async def get_metrics() -> Response:
+        """Return the metrics of the backend in the Prometheus text format."""
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+
+    return router
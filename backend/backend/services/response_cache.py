@@ -0,0 +1,253 @@
+"""HTTP caching of the GraphQL queries: ETags and server-side cache of the responses"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import secrets
+from typing import Any, Optional
+from fastapi import Request, Response
+from graphql import parse
+from strawberry.http import GraphQLHTTPResponse, GraphQLRequestData
+from strawberry.types import ExecutionResult
+from strawberry.types.graphql import OperationType
+from strawberry.unset import UNSET
+from strawberry.utils.operation import get_operation_type
+from backend.dao.interfaces import TaskEvent
+from backend.services.documents import PersistedQueryRouter
+
+# Key of a response: query, variables encoded as JSON, and operation name
+_ResponseKey = tuple[str, str, Optional[str]]
+
+
+class DataVersion:
+    """Monotonic version of the tasks, bumped by every mutation.
+
+    Register `bump` as listener of a NotifyingDAO. The version counts the mutations of this
+    process only, and starts again at every restart: the `epoch`, random, tells the versions
+    of different processes apart.
+    """
+
+    epoch: str
+    _value: int
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(4)
+        self._value = 0
+
+    @property
+    def value(self) -> int:
+        """Current version."""
+        return self._value
+
+    def bump(self, events: Optional[list[TaskEvent]] = None):
+        """Increase the version. The events of the mutation, if given, are ignored."""
+        # pylint: disable=unused-argument
+        self._value += 1
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    """Snapshot of the counters of a response cache."""
+
+    size: int
+    hits: int
+    misses: int
+    # Requests answered with 304 Not Modified
+    not_modified: int
+    # Times the cache was emptied because the version changed
+    invalidations: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the lookups found in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """Bounded cache of the encoded responses of the queries, for one version of the data.
+
+    The responses of older versions can never be returned again, so the whole cache is
+    emptied when the version changes. When the cache is full, the least recently used
+    response is evicted. The cache is used by the event loop thread only.
+    """
+
+    _responses: "OrderedDict[_ResponseKey, bytes]"
+    _max_size: int
+    _max_body_size: int
+    _version: int
+
+    def __init__(self, max_size: int = 1000, max_body_size: int = 1 << 20):
+        """
+        Parameters
+        ----------
+        max_size: int
+            Maximum number of responses in the cache. If 0, no response is cached.
+        max_body_size: int
+            Size in bytes of the largest cached response.
+        """
+
+        self._responses = OrderedDict()
+        self._max_size = max_size
+        self._max_body_size = max_body_size
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._invalidations = 0
+
+    def get(self, key: _ResponseKey, version: int) -> Optional[bytes]:
+        """Return the cached response of a query at a version, if any."""
+
+        self.__set_version(version)
+        body = self._responses.get(key)
+        if body is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._responses.move_to_end(key)
+        return body
+
+    def put(self, key: _ResponseKey, version: int, body: bytes):
+        """Store the response of a query at a version, unless it is too large."""
+
+        self.__set_version(version)
+        if self._max_size < 1 or len(body) > self._max_body_size:
+            return
+        self._responses[key] = body
+        self._responses.move_to_end(key)
+        if len(self._responses) > self._max_size:
+            self._responses.popitem(last=False)
+
+    def not_modified(self):
+        """Count a request answered with 304 Not Modified."""
+        self._not_modified += 1
+
+    def stats(self) -> ResponseCacheStats:
+        """Return a snapshot of the cache counters."""
+
+        return ResponseCacheStats(
+            size=len(self._responses),
+            hits=self._hits,
+            misses=self._misses,
+            not_modified=self._not_modified,
+            invalidations=self._invalidations,
+        )
+
+    def __set_version(self, version: int):
+        if version > self._version:
+            if self._responses:
+                self._responses.clear()
+                self._invalidations += 1
+            self._version = version
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Tell whether the value of an If-None-Match header matches an ETag."""
+
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+class CachedResponseRouter(PersistedQueryRouter):
+    """GraphQL router tagging the responses of the queries with the version of the data.
+
+    The ETag of a query response is computed from the query, its variables and the current
+    DataVersion, without executing the query. A request whose If-None-Match header matches
+    is answered with 304 Not Modified, and an identical query already answered at the same
+    version is answered from the ResponseCache: neither reaches the DAO. Mutations,
+    subscriptions and invalid requests are executed as usual.
+    """
+
+    data_version: DataVersion
+    response_cache: ResponseCache
+
+    def __init__(
+        self,
+        *args,
+        data_version: DataVersion,
+        response_cache: ResponseCache,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.data_version = data_version
+        self.response_cache = response_cache
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        # Parsed once by run, and again by the execution of the operation
+        state = request.request.state
+        request_data = getattr(state, "graphql_request", None)
+        if request_data is None:
+            request_data = await super().parse_http_body(request)
+            state.graphql_request = request_data
+        return request_data
+
+    async def process_result(
+        self, request: Request, result: ExecutionResult
+    ) -> GraphQLHTTPResponse:
+        # Responses with errors, possibly temporary, are not cached
+        request.state.graphql_errors = bool(result.errors)
+        return await super().process_result(request, result)
+
+    async def run(
+        self, request: Request, context: Any = UNSET, root_value: Any = UNSET
+    ) -> Response:
+        key = await self.__query_key(request)
+        if key is None:
+            return await super().run(request, context=context, root_value=root_value)
+
+        version = self.data_version.value
+        digest = hashlib.blake2b("\0".join(map(str, key)).encode(), digest_size=8)
+        etag = f'"{self.data_version.epoch}-{version}-{digest.hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and _etag_matches(if_none_match, etag):
+            self.response_cache.not_modified()
+            return Response(status_code=304, headers=headers)
+
+        body = self.response_cache.get(key, version)
+        if body is not None:
+            return Response(body, media_type="application/json", headers=headers)
+
+        response = await super().run(request, context=context, root_value=root_value)
+        # A mutation during the execution may have changed the data read by the query
+        if (
+            response.status_code == 200
+            and version == self.data_version.value
+            and not getattr(request.state, "graphql_errors", True)
+        ):
+            response.headers.update(headers)
+            self.response_cache.put(key, version, response.body)
+        return response
+
+    async def __query_key(self, request: Request) -> Optional[_ResponseKey]:
+        """Return the cache key of a request executing a query, None for other requests."""
+
+        request_adapter = self.request_adapter_class(request)
+        if request_adapter.method not in (
+            "GET",
+            "POST",
+        ) or self.should_render_graphiql(request_adapter):
+            return None
+        try:
+            request_data = await self.parse_http_body(request_adapter)
+            if request_data.query is None:
+                return None
+            if self.document_cache is not None:
+                document = self.document_cache.parse(request_data.query)
+            else:
+                document = parse(request_data.query)
+            operation_type = get_operation_type(document, request_data.operation_name)
+        # Reported by the execution of the operation
+        except Exception:  # pylint: disable=broad-exception-caught
+            return None
+        if operation_type != OperationType.QUERY:
+            return None
+
+        variables = json.dumps(request_data.variables, sort_keys=True)
+        return (request_data.query, variables, request_data.operation_name)
@@ -4,15 +4,28 @@ import datetime
 from enum import Enum
 from typing import Optional
 import strawberry
+from backend.services.cursors import encode_cursor, encode_search_cursor
 
 
 @strawberry.enum
 class Status(Enum):
-    """Possible values for the state of a task."""
+    """Possible values for the state of a task.
+    The values are the statuses stored by the DAO.
+    """
 
-    DONE = 0
-    PROGRESS = 1
-    OPEN = 2
+    DONE = "DONE"
+    PROGRESS = "PROGRESS"
+    OPEN = "OPEN"
+
+
+@strawberry.enum
+class TaskOrder(Enum):
+    """Possible orderings of a list of tasks. Ties are broken by id."""
+
+    ID_ASC = 0
+    ID_DESC = 1
+    DATE_ASC = 2
+    DATE_DESC = 3
 
 
 @strawberry.type
@@ -35,10 +48,156 @@ class TaskInput(OptionalFields):
 
 
 @strawberry.type
-class TaskOutput(TaskInput):
-    """Task fields as outputted to the outside world."""
+class TaskOutput:
+    """Task fields as outputted to the outside world.
+
+    The task records returned by the DAO are resolved by this type as they are, without
+    copies: the attributes have the names of the DAO fields, and the values of Status are the
+    statuses of the DAO.
+    """
+
+    id: int
+    title: str
+    description: Optional[str] = None
+    date: Optional[datetime.date] = strawberry.field(name="dateTimestamp", default=None)
+    start_time: Optional[datetime.time] = strawberry.field(
+        name="startTimestamp", default=None
+    )
+    end_time: Optional[datetime.time] = strawberry.field(
+        name="endTimestamp", default=None
+    )
+    goal: Optional[str] = None
+    status: Status = Status.OPEN
+
+    @strawberry.field(description="Opaque position of the task, to be used as `after`")
+    def cursor(self) -> str:
+        """Cursor pointing to this task in any ordering."""
+        return encode_cursor(self.id, self.date)
+
+
+@strawberry.type
+class TaskMatch:
+    """Task found by a search. The matches returned by the DAO are resolved as they are, as
+    by TaskOutput.
+    """
+
+    task: TaskOutput
+    score: float = strawberry.field(
+        description="Relevance of the task, the higher the better. Comparable only among "
+        "the results of the same search"
+    )
+
+    @strawberry.field(description="Opaque position of the match, to be used as `after`")
+    def cursor(self) -> str:
+        """Cursor pointing to this match in the results of the search."""
+        return encode_search_cursor(self.score, self.task.id)
+
+
+@strawberry.type
+class StatsTotals:
+    """Number and duration of a set of tasks. The statistics returned by the DAO are resolved
+    as they are, as by TaskOutput.
+    """
+
+    count: int
+    timed: int = strawberry.field(
+        name="timedCount",
+        description="Tasks with a start and an end time, the end not before the start",
+    )
+    # A float, because the sums may not fit the 32 bits of the GraphQL integers
+    duration: float = strawberry.field(
+        name="durationSeconds",
+        description="Sum of the durations of the timed tasks, from start to end time, in "
+        "whole seconds",
+    )
+
+
+@strawberry.type
+class StatusStats(StatsTotals):
+    """Statistics of the tasks with the same status."""
+
+    status: Status
+
+
+@strawberry.type
+class GoalStats(StatsTotals):
+    """Statistics of the tasks with the same goal."""
+
+    goal: Optional[str]
+
+
+@strawberry.type
+class DayStats(StatsTotals):
+    """Statistics of the tasks of the same day."""
+
+    date: Optional[datetime.date]
+
+
+@strawberry.type
+class StatsGroup(StatsTotals):
+    """Statistics of the tasks with the same date, goal and status."""
+
+    date: Optional[datetime.date]
+    goal: Optional[str]
+    status: Status
+
+
+@strawberry.type
+class TaskStats:
+    """Number and duration of the tasks, in total and by status, goal and day. The lists are
+    sorted by status, goal or date, the tasks without goal or date last.
+    """
+
+    total: StatsTotals
+    by_status: list[StatusStats]
+    by_goal: list[GoalStats]
+    by_day: list[DayStats]
+    groups: list[StatsGroup] = strawberry.field(
+        description="Statistics by date, goal and status together"
+    )
+
+
+@strawberry.enum
+class TaskEventKind(Enum):
+    """Possible kinds of change of a task.
+    The values are the kinds of the DAO events.
+    """
+
+    ADDED = "ADDED"
+    UPDATED = "UPDATED"
+    REMOVED = "REMOVED"
+
+
+@strawberry.type
+class TaskDelta:
+    """Changed fields of a task, the others are null. See TaskOutput for the fields."""
 
     id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[datetime.date] = strawberry.field(name="dateTimestamp", default=None)
+    start_time: Optional[datetime.time] = strawberry.field(
+        name="startTimestamp", default=None
+    )
+    end_time: Optional[datetime.time] = strawberry.field(
+        name="endTimestamp", default=None
+    )
+    goal: Optional[str] = None
+    status: Optional[Status] = None
+
+
+@strawberry.type
+class TaskEvent:
+    """Change of a task made by a mutation."""
+
+    kind: TaskEventKind
+    task: TaskDelta = strawberry.field(
+        description="All the fields of an added task, the updated fields of an updated "
+        "task, only the id of a removed task"
+    )
+    changed_fields: list[str] = strawberry.field(
+        description="Names of the fields set in `task`, besides the id"
+    )
 
 
 @strawberry.type
@@ -47,3 +206,38 @@ class TaskUpdate(OptionalFields):
 
     title: Optional[str]
     status: Optional[Status]
+
+
+@strawberry.type
+class TaskResult:
+    """Outcome of one item of a batch mutation. Exactly one of the fields is not null."""
+
+    task: Optional[TaskOutput] = None
+    error: Optional[str] = None
+
+
+@strawberry.input
+class NewTask:
+    """Fields of a task to be added by a batch mutation. See the `add` mutation."""
+
+    title: str
+    description: Optional[str] = None
+    date_timestamp: Optional[datetime.date] = None
+    start_timestamp: Optional[str] = None
+    end_timestamp: Optional[str] = None
+    goal: Optional[str] = None
+    status: Status = Status.OPEN
+
+
+@strawberry.input
+class TaskChanges:
+    """Fields of a task to be updated by a batch mutation. See the `update` mutation."""
+
+    task_id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date_timestamp: Optional[float] = None
+    start_timestamp: Optional[str] = None
+    end_timestamp: Optional[str] = None
+    goal: Optional[str] = None
+    status: Optional[Status] = None
@@ -0,0 +1,153 @@
+"""Statistics of the tasks, kept up to date by the mutations"""
+
+from dataclasses import dataclass
+import datetime
+from typing import Optional
+from backend.dao.interfaces import (
+    EVENT_ADDED,
+    EVENT_UPDATED,
+    AsyncDAO,
+    TaskEvent,
+    TaskFilter,
+    TaskStats,
+    task_duration,
+)
+
+# Date, goal and status of a group of tasks
+_GroupKey = tuple[Optional[datetime.date], Optional[str], str]
+
+# Fields whose changes move a task to another group or change its duration
+_GROUP_FIELDS = frozenset(("date", "start_time", "end_time", "goal", "status"))
+
+
+def _day(date: Optional[datetime.date]) -> Optional[datetime.date]:
+    # The DAOs may return the dates given to the mutations, possibly datetimes
+    return date.date() if isinstance(date, datetime.datetime) else date
+
+
+@dataclass(frozen=True)
+class StatsCacheStats:
+    """Snapshot of the counters of a statistics cache."""
+
+    # Groups of tasks in the cache, 0 if not loaded
+    groups: int
+    hits: int
+    misses: int
+    # Mutations counted in the cache without reading the database
+    updates: int
+    invalidations: int
+
+
+class StatsCache:
+    """Statistics of all the tasks, by date, goal and status, updated by the mutations.
+
+    Register `apply` as listener of a NotifyingDAO. The groups of all the tasks are read once
+    with DAO.task_stats, and the statistics of any filter on the date, goal or status are
+    computed from them without queries. The added tasks are counted in their groups, and
+    the updates that change neither the group nor the times of a task are ignored. The
+    events of the other updates and of the removals lack the previous fields of the tasks:
+    they invalidate the cache, read again by the next query.
+
+    The cache sees the mutations of this process only, and is used by the event loop thread
+    only.
+    """
+
+    # Number, timed number and duration of the tasks of each group, None if not loaded
+    _groups: Optional[dict[_GroupKey, list[int]]]
+    # Incremented by every change. A read started before a change must not fill the cache.
+    _generation: int
+
+    def __init__(self):
+        self._groups = None
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._updates = 0
+        self._invalidations = 0
+
+    def apply(self, events: list[TaskEvent]):
+        """Update the statistics with the events of a mutation."""
+
+        for event in events:
+            if event.kind == EVENT_UPDATED and _GROUP_FIELDS.isdisjoint(event.fields):
+                continue
+            self._generation += 1
+            if self._groups is None:
+                continue
+            if event.kind != EVENT_ADDED:
+                self._groups = None
+                self._invalidations += 1
+                continue
+
+            task = event.task
+            key = (_day(task.date), task.goal, task.status)
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = [0, 0, 0]
+            group[0] += 1
+            duration = task_duration(task.start_time, task.end_time)
+            if duration is not None:
+                group[1] += 1
+                group[2] += duration
+            self._updates += 1
+
+    async def get(self, dao: AsyncDAO, filters: TaskFilter) -> list[TaskStats]:
+        """Return the statistics of the tasks satisfying some conditions, as returned by
+        DAO.task_stats, reading all the groups from the DAO if they are not cached.
+
+        Parameters
+        ----------
+        dao: class (AsyncDAO)
+            DAO whose mutations are applied to this cache.
+        filters: TypedDict (TaskFilter)
+            Conditions the counted tasks must satisfy. See TaskFilter for more details.
+        """
+
+        groups = self._groups
+        if groups is not None:
+            self._hits += 1
+        else:
+            self._misses += 1
+            generation = self._generation
+            rows = await dao.task_stats(TaskFilter())
+            groups = {}
+            for row in rows:
+                groups[(_day(row.date), row.goal, row.status)] = [
+                    row.count,
+                    row.timed,
+                    row.duration,
+                ]
+            if generation == self._generation:
+                self._groups = groups
+
+        status = filters.get("status")
+        goal = filters.get("goal")
+        date_from = filters.get("date_from")
+        date_to = filters.get("date_to")
+        with_date_only = date_from is not None or date_to is not None
+        results = []
+        for (date, group_goal, group_status), group in groups.items():
+            if status is not None and group_status != status:
+                continue
+            if goal is not None and group_goal != goal:
+                continue
+            if with_date_only:
+                if date is None:
+                    continue
+                if date_from is not None and date < date_from:
+                    continue
+                if date_to is not None and date > date_to:
+                    continue
+            results.append(TaskStats(date, group_goal, group_status, *group))
+        return results
+
+    def stats(self) -> StatsCacheStats:
+        """Return a snapshot of the cache counters."""
+
+        return StatsCacheStats(
+            groups=len(self._groups) if self._groups is not None else 0,
+            hits=self._hits,
+            misses=self._misses,
+            updates=self._updates,
+            invalidations=self._invalidations,
+        )
@@ -0,0 +1,4 @@
+"""Benchmarks of the backend.
+
+Run them from the backend folder, e.g. `python -m benchmarks.graphql_load --help`.
+"""
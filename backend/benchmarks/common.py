@@ -0,0 +1,194 @@
+"""Helpers shared by the benchmarks: statistics, reports and comparison of runs"""
+
+import datetime
+import json
+import math
+import platform
+import random
+import resource
+import subprocess
+import sys
+from typing import Any, Optional
+from backend.dao.interfaces import DAO, TaskInput
+
+STATUSES = ("OPEN", "PROGRESS", "DONE")
+GOALS = (None, "work", "home", "sport", "study")
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Return a percentile of already sorted values, interpolating between the closest ones.
+
+    Parameters
+    ----------
+    sorted_values: list of float
+        Values sorted in ascending order.
+    fraction: float
+        Percentile as a fraction between 0 and 1, e.g. 0.95 for the 95th percentile.
+    """
+
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def latency_stats(latencies: list[float]) -> dict[str, float]:
+    """Return mean and percentiles, in milliseconds, of latencies given in seconds."""
+
+    values = sorted(latency * 1000 for latency in latencies)
+    mean = sum(values) / len(values) if values else math.nan
+    return {
+        "mean_ms": mean,
+        "p50_ms": percentile(values, 0.50),
+        "p95_ms": percentile(values, 0.95),
+        "p99_ms": percentile(values, 0.99),
+        "max_ms": values[-1] if values else math.nan,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident memory of the process, in MiB."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+def random_task(rng: random.Random, number: int) -> TaskInput:
+    """Return a new task with random fields.
+
+    Parameters
+    ----------
+    rng: random.Random
+        Random generator, seeded to make the runs reproducible.
+    number: int
+        Number of the task, used in its title.
+    """
+
+    task = TaskInput(title=f"Task {number}", status=rng.choice(STATUSES))
+    goal = rng.choice(GOALS)
+    if goal is not None:
+        task["goal"] = goal
+    if rng.random() < 0.8:
+        task["date"] = datetime.date(2024, 1, 1) + datetime.timedelta(
+            days=rng.randrange(365)
+        )
+    if rng.random() < 0.5:
+        task["description"] = "Description of the task " * rng.randrange(1, 8)
+    if rng.random() < 0.5:
+        start = rng.randrange(8, 18)
+        task["start_time"] = datetime.time(start, 0)
+        task["end_time"] = datetime.time(start + 1, 30)
+    return task
+
+
+def populate(dao: DAO, size: int, seed: int = 0, batch_size: int = 10000):
+    """Add random tasks to a DAO.
+
+    Parameters
+    ----------
+    dao: class (DAO)
+        Data Access Object (DAO) to be filled.
+    size: int
+        Number of tasks to add.
+    seed: int
+        Seed of the random generator.
+    batch_size: int
+        Number of tasks added by each transaction.
+    """
+
+    rng = random.Random(seed)
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        dao.add_tasks([random_task(rng, start + offset) for offset in range(count)])
+
+
+def metadata(extra: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """Return the description of the environment a benchmark runs in."""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    meta = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    meta.update(extra or {})
+    return meta
+
+
+def save_report(path: str, meta: dict[str, Any], results: list[dict[str, Any]]):
+    """Save the results of a benchmark as JSON."""
+
+    with open(path, "w", encoding="utf-8") as report:
+        json.dump({"meta": meta, "results": results}, report, indent=2)
+
+
+def print_table(results: list[dict[str, Any]], columns: list[str]):
+    """Print some columns of the results as an aligned table."""
+
+    def format_value(value: Any) -> str:
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return str(value)
+
+    rows = [
+        [format_value(result.get(column)) for column in columns] for result in results
+    ]
+    widths = [
+        max([len(column)] + [len(row[index]) for row in rows])
+        for index, column in enumerate(columns)
+    ]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+def compare_reports(baseline_path: str, candidate_path: str, keys: list[str]):
+    """Print the ratio candidate/baseline of the metrics of two saved runs.
+
+    Results are matched by the values of `keys`, e.g. scenario, size and concurrency.
+    """
+
+    with open(baseline_path, encoding="utf-8") as report:
+        baseline = json.load(report)["results"]
+    with open(candidate_path, encoding="utf-8") as report:
+        candidate = json.load(report)["results"]
+
+    def key(result: dict[str, Any]) -> tuple:
+        return tuple(result.get(name) for name in keys)
+
+    baseline_by_key = {key(result): result for result in baseline}
+    rows = []
+    for result in candidate:
+        reference = baseline_by_key.get(key(result))
+        if reference is None:
+            continue
+        row = {name: result.get(name) for name in keys}
+        for metric, value in result.items():
+            if metric in keys or not isinstance(value, (int, float)):
+                continue
+            reference_value = reference.get(metric)
+            if isinstance(reference_value, (int, float)) and reference_value:
+                row[metric] = value / reference_value
+        rows.append(row)
+
+    if not rows:
+        print("No matching results")
+        return
+    columns = list(rows[0])
+    print("Ratio candidate / baseline (lower is better for latencies and memory)")
+    print_table(rows, columns)
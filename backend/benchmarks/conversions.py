@@ -0,0 +1,154 @@
+"""Micro-benchmarks of the conversions applied to every task of a response.
+
+Examples, from the backend folder:
+
+    python -m benchmarks.conversions --rows 100000
+    python -m benchmarks.conversions --output new.json
+    python -m benchmarks.conversions compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import gc
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+from backend.dao.interfaces import TASK_FIELDS
+from backend.dao.memory_dao import Memory
+from backend.dao.threaded_dao import ThreadedDAO
+from backend.services.converters import convertTasksDaoToGraphQL
+from backend.services.graphql import create_graphql_app
+from benchmarks.common import (
+    compare_reports,
+    metadata,
+    print_table,
+    random_task,
+    save_report,
+)
+from benchmarks.graphql_load import QUERY_ALL
+
+REPORT_COLUMNS = ["benchmark", "rows", "best_s", "per_row_us", "peak_alloc_mb"]
+
+
+def mysql_rows(count: int, seed: int) -> list[dict[str, Any]]:
+    """Return rows as returned by the MySQL dictionary cursor, with times as timedelta."""
+
+    rng = random.Random(seed)
+    rows = []
+    for number in range(count):
+        task = random_task(rng, number)
+        row: dict[str, Any] = {"id": number + 1}
+        row.update({field: task.get(field) for field in TASK_FIELDS})
+        for field in ("start_time", "end_time"):
+            value = row[field]
+            if value is not None:
+                row[field] = datetime.timedelta(hours=value.hour, minutes=value.minute)
+        rows.append(row)
+    return rows
+
+
+def measure(
+    function: Callable[[], Any], repeat: int, trace_memory: bool
+) -> tuple[float, float]:
+    """Return the best time over `repeat` runs and the peak allocated memory, in MiB."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    peak = float("nan")
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return best, peak
+
+
+def benchmarks(rows: int, seed: int) -> dict[str, Callable[[], Any]]:
+    """Return the functions to be measured, indexed by name."""
+
+    sql_rows = mysql_rows(rows, seed)
+    memory = Memory()
+    rng = random.Random(seed)
+    memory.add_tasks([random_task(rng, number) for number in range(rows)])
+    tasks = memory.get_all_tasks()
+    schema = create_graphql_app(ThreadedDAO(memory, 1)).schema
+
+    functions: dict[str, Callable[[], Any]] = {
+        "memory_row_to_task": memory.get_all_tasks,
+        "dao_to_graphql": lambda: convertTasksDaoToGraphQL(tasks),
+        # Whole execution of a query, without the serialization of the response
+        "graphql_execute": lambda: asyncio.run(schema.execute(QUERY_ALL)),
+    }
+
+    try:
+        # pylint: disable=import-outside-toplevel
+        from backend.dao.mysql_dao import Mysql
+    except ImportError:
+        print("MySQL connector not installed: skipping the MySQL conversions")
+    else:
+        # Decoding of the dictionary rows of the pure connector and of the tuple rows of the
+        # fast mode, see MysqlConfig.fast_mode
+        functions["mysql_sql_to_task"] = lambda: [
+            Mysql.convert_sql_to_task(**row) for row in sql_rows
+        ]
+        columns = ("id",) + TASK_FIELDS
+        tuple_rows = [tuple(row[column] for column in columns) for row in sql_rows]
+        functions["mysql_rows_to_tasks"] = lambda: Mysql.convert_rows_to_tasks(
+            columns, tuple_rows
+        )
+
+    return functions
+
+
+def main(argv: Optional[list[str]] = None):
+    """Entry point of the micro-benchmarks."""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    subparsers = parser.add_subparsers(dest="command")
+    compare = subparsers.add_parser("compare", help="Compare two saved runs")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracing of allocations"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        compare_reports(args.baseline, args.candidate, ["benchmark", "rows"])
+        return
+
+    results = []
+    for name, function in benchmarks(args.rows, args.seed).items():
+        best, peak = measure(function, args.repeat, not args.no_memory)
+        results.append(
+            {
+                "benchmark": name,
+                "rows": args.rows,
+                "best_s": best,
+                "per_row_us": best / args.rows * 1e6,
+                "peak_alloc_mb": peak,
+            }
+        )
+
+    print_table(results, REPORT_COLUMNS)
+    if args.output:
+        meta = metadata({"benchmark": "conversions", "arguments": vars(args)})
+        save_report(args.output, meta, results)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Load test of the GraphQL API.
+
+The requests go through the real FastAPI application, called in-process through the ASGI
+interface, so that no server and no database are needed. The DAO is a local stand-in
+(in-memory or SQLite) filled with random tasks.
+
+Examples, from the backend folder:
+
+    python -m benchmarks.graphql_load --sizes 1000,100000 --concurrency 1,10,50
+    python -m benchmarks.graphql_load --output new.json
+    python -m benchmarks.graphql_load compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Callable, Optional
+from fastapi import FastAPI
+from backend.dao.interfaces import DAO
+from backend.dao.memory_dao import Memory
+from backend.dao.sqlite_dao import Sqlite, SqliteConfig
+from backend.dao.threaded_dao import ThreadedDAO
+from backend.services.graphql import create_graphql_app
+from benchmarks.common import (
+    compare_reports,
+    latency_stats,
+    metadata,
+    peak_rss_mb,
+    populate,
+    print_table,
+    save_report,
+)
+
+QUERY_PAGE = """query QueryPage {
+  queryTask(status: OPEN, first: 50) { id title status dateTimestamp goal }
+}"""
+
+QUERY_BY_ID = """query QueryById($taskId: ID!) {
+  queryTask(taskId: $taskId) { id title status description dateTimestamp goal }
+}"""
+
+# Same fields as queryAllTasks in the frontend
+QUERY_ALL = """query QueryAll {
+  queryTask {
+    id title status description dateTimestamp startTimestamp endTimestamp goal
+  }
+}"""
+
+ADD = """mutation Add($title: String!) {
+  add(title: $title, status: OPEN, goal: "work", startTimestamp: "09:00") { id title }
+}"""
+
+UPDATE = """mutation Update($taskId: Int!) {
+  update(taskId: $taskId, status: DONE) { id status }
+}"""
+
+RM = """mutation Rm($taskId: Int!) {
+  rm(taskId: $taskId) { id title }
+}"""
+
+REPORT_COLUMNS = [
+    "scenario",
+    "size",
+    "concurrency",
+    "requests",
+    "errors",
+    "throughput_rps",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "peak_rss_mb",
+]
+
+
+async def post_graphql(
+    app: FastAPI, query: str, variables: Optional[dict[str, Any]] = None
+) -> tuple[int, bytes]:
+    """Send a GraphQL request to the application through ASGI and return status and body."""
+
+    body = json.dumps({"query": query, "variables": variables or {}}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/query",
+        "raw_path": b"/query",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    request_sent = False
+    status = 0
+    chunks: list[bytes] = []
+
+    async def receive() -> dict[str, Any]:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def succeeded(status: int, body: bytes) -> bool:
+    """Return True if a GraphQL response has no errors."""
+    return status == 200 and b'"errors"' not in body
+
+
+async def run_scenario(
+    app: FastAPI,
+    requests: int,
+    concurrency: int,
+    make_request: Callable[[int], tuple[str, Optional[dict[str, Any]]]],
+    on_response: Optional[Callable[[bytes], None]] = None,
+) -> dict[str, Any]:
+    """Send `requests` requests with `concurrency` clients and return the statistics.
+
+    Parameters
+    ----------
+    app: FastAPI
+        Application under test.
+    requests: int
+        Total number of requests.
+    concurrency: int
+        Number of requests in flight at the same time.
+    make_request: callable
+        Function returning query and variables of the n-th request.
+    on_response: callable
+        Optional function called with the body of each successful response.
+    """
+
+    latencies: list[float] = []
+    errors = 0
+    next_request = 0
+
+    async def client():
+        nonlocal errors, next_request
+        while next_request < requests:
+            number = next_request
+            next_request += 1
+            query, variables = make_request(number)
+            start = time.perf_counter()
+            status, body = await post_graphql(app, query, variables)
+            latencies.append(time.perf_counter() - start)
+            if not succeeded(status, body):
+                errors += 1
+            elif on_response is not None:
+                on_response(body)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    result: dict[str, Any] = {
+        "requests": requests,
+        "errors": errors,
+        "duration_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed > 0 else 0.0,
+    }
+    result.update(latency_stats(latencies))
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def create_dao(kind: str, directory: str, size: int) -> DAO:
+    """Return an empty DAO of the given kind: "memory" or "sqlite"."""
+
+    if kind == "memory":
+        return Memory()
+    if kind == "sqlite":
+        path = os.path.join(directory, f"benchmark_{size}.db")
+        return Sqlite(SqliteConfig(path=path))
+    raise ValueError(f"Unknown DAO '{kind}'")
+
+
+async def benchmark_size(
+    dao_kind: str, size: int, levels: list[int], args: argparse.Namespace
+) -> list[dict[str, Any]]:
+    """Run all the scenarios on a table with `size` tasks."""
+
+    results: list[dict[str, Any]] = []
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        dao = create_dao(dao_kind, directory, size)
+        start = time.perf_counter()
+        populate(dao, size, seed=args.seed)
+        print(f"Populated {size} tasks in {time.perf_counter() - start:.1f} s")
+
+        app = FastAPI()
+        router = create_graphql_app(ThreadedDAO(dao, max_workers=args.workers))
+        app.include_router(router, prefix="/query")
+        gc.collect()
+
+        for concurrency in levels:
+            added_ids: list[int] = []
+
+            def remember_id(body: bytes):
+                added_ids.append(json.loads(body)["data"]["add"]["id"])
+
+            scenarios: list[tuple[str, Callable, Optional[Callable]]] = [
+                ("query_page", lambda _: (QUERY_PAGE, None), None),
+                (
+                    "query_by_id",
+                    lambda _: (QUERY_BY_ID, {"taskId": str(rng.randint(1, size))}),
+                    None,
+                ),
+                ("add", lambda n: (ADD, {"title": f"Added {n}"}), remember_id),
+                (
+                    "update",
+                    lambda _: (UPDATE, {"taskId": rng.randint(1, size)}),
+                    None,
+                ),
+                # Remove the tasks just added, so that the table size does not change
+                ("rm", lambda n: (RM, {"taskId": added_ids[n]}), None),
+            ]
+            if size <= args.full_list_max_size:
+                scenarios.insert(0, ("query_all", lambda _: (QUERY_ALL, None), None))
+
+            for name, make_request, on_response in scenarios:
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                requests = args.requests
+                if name == "query_all":
+                    requests = max(1, min(requests, args.full_list_requests))
+                if name == "rm":
+                    requests = min(requests, len(added_ids))
+                    if requests == 0:
+                        continue
+
+                result = await run_scenario(
+                    app, requests, concurrency, make_request, on_response
+                )
+                result = {
+                    "scenario": name,
+                    "dao": dao_kind,
+                    "size": size,
+                    "concurrency": concurrency,
+                    **result,
+                }
+                print_table([result], REPORT_COLUMNS)
+                results.append(result)
+
+        if router.document_cache is not None:
+            stats = router.document_cache.stats()
+            print(
+                f"Document cache: {stats.hit_rate:.1%} hits, "
+                f"{stats.parse_seconds * 1000:.1f} ms parsing, "
+                f"{stats.validation_seconds * 1000:.1f} ms validating"
+            )
+
+        close = getattr(dao, "close", None)
+        if close is not None:
+            close()
+
+    return results
+
+
+def parse_list(value: str) -> list[int]:
+    """Parse a comma separated list of integers, e.g. "1,10,50"."""
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Optional[list[str]] = None):
+    """Entry point of the load test."""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    subparsers = parser.add_subparsers(dest="command")
+    compare = subparsers.add_parser("compare", help="Compare two saved runs")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+
+    parser.add_argument("--dao", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--sizes", type=parse_list, default=[1000, 100000, 1000000])
+    parser.add_argument("--concurrency", type=parse_list, default=[1, 10, 50])
+    parser.add_argument(
+        "--requests", type=int, default=500, help="Requests per scenario"
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=None,
+        help="Comma separated scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--full-list-max-size",
+        type=int,
+        default=100000,
+        help="Largest table for which the full list is queried",
+    )
+    parser.add_argument(
+        "--full-list-requests",
+        type=int,
+        default=20,
+        help="Requests of the full list scenario",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="DAO threads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        compare_reports(
+            args.baseline, args.candidate, ["scenario", "dao", "size", "concurrency"]
+        )
+        return
+
+    results: list[dict[str, Any]] = []
+    for size in args.sizes:
+        results += asyncio.run(benchmark_size(args.dao, size, args.concurrency, args))
+
+    print()
+    print_table(results, REPORT_COLUMNS)
+    if args.output:
+        meta = metadata({"benchmark": "graphql_load", "arguments": vars(args)})
+        save_report(args.output, meta, results)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Comparison of the row decoding modes of the MySQL DAO, see MysqlConfig.fast_mode.
+
+Unlike the other benchmarks, this one needs a MySQL server. The tasks are stored in a
+dedicated table, migrated, emptied and filled at the beginning of the run.
+
+Examples, from the backend folder:
+
+    DATABASE_PASSWORD=... python -m benchmarks.mysql_modes --rows 100000
+    DATABASE_PASSWORD=... python -m benchmarks.mysql_modes --output new.json
+    python -m benchmarks.mysql_modes compare old.json new.json
+"""
+
+import argparse
+import os
+import random
+from typing import Any, Callable, Optional
+from backend.dao.mysql_dao import Mysql, MysqlConfig
+from benchmarks.common import (
+    compare_reports,
+    metadata,
+    populate,
+    print_table,
+    save_report,
+)
+from benchmarks.conversions import measure
+
+REPORT_COLUMNS = ["benchmark", "mode", "rows", "best_s", "peak_alloc_mb"]
+
+
+def create_dao(args: argparse.Namespace, fast_mode: bool) -> Mysql:
+    """Return a MySQL DAO using the benchmark table."""
+
+    config = MysqlConfig(
+        password=os.environ["DATABASE_PASSWORD"],
+        host=args.host,
+        port=args.port,
+        fast_mode=fast_mode,
+    )
+    config.table = args.table
+    return Mysql(config)
+
+
+def benchmarks(dao: Mysql, rows: int, seed: int) -> dict[str, Callable[[], Any]]:
+    """Return the reads to be measured, indexed by name."""
+
+    rng = random.Random(seed)
+    task_ids = [task.id for task in dao.get_all_tasks(fields=[])]
+    return {
+        "get_all_tasks": dao.get_all_tasks,
+        "get_all_tasks_titles": lambda: dao.get_all_tasks(fields=["title"]),
+        "get_tasks_page": lambda: dao.get_tasks({"status": "OPEN"}, first=50),
+        "get_task_by_id": lambda: [
+            dao.get_task_by_id(rng.choice(task_ids)) for _ in range(min(rows, 1000))
+        ],
+    }
+
+
+def main(argv: Optional[list[str]] = None):
+    """Entry point of the comparison."""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    subparsers = parser.add_subparsers(dest="command")
+    compare = subparsers.add_parser("compare", help="Compare two saved runs")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--table", default="tasks_benchmark")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracing of allocations"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        compare_reports(args.baseline, args.candidate, ["benchmark", "mode", "rows"])
+        return
+
+    dao = create_dao(args, fast_mode=True)
+    dao.migrate()
+    dao.rm_tasks([task.id for task in dao.get_all_tasks(fields=[])])
+    populate(dao, args.rows, seed=args.seed)
+
+    results = []
+    for mode, fast_mode in (("pure", False), ("fast", True)):
+        dao = create_dao(args, fast_mode)
+        for name, function in benchmarks(dao, args.rows, args.seed).items():
+            best, peak = measure(function, args.repeat, not args.no_memory)
+            results.append(
+                {
+                    "benchmark": name,
+                    "mode": mode,
+                    "rows": args.rows,
+                    "best_s": best,
+                    "peak_alloc_mb": peak,
+                }
+            )
+
+    print_table(results, REPORT_COLUMNS)
+    if args.output:
+        meta = metadata({"benchmark": "mysql_modes", "arguments": vars(args)})
+        save_report(args.output, meta, results)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
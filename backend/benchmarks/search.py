@@ -0,0 +1,165 @@
+"""Latency of the full-text search of the DAOs without a search engine.
+
+The tasks have titles and descriptions drawn from a vocabulary with a Zipf distribution, as
+in natural language: a few words are in many tasks, most words in a few. The searches of a
+rare word, a common word and of several words are compared to the scan of all the tasks done
+by the clients before the search existed.
+
+Examples, from the backend folder:
+
+    python -m benchmarks.search --sizes 10000,100000 --dao memory,sqlite
+    python -m benchmarks.search --output new.json
+    python -m benchmarks.search compare old.json new.json
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Optional
+from backend.dao.interfaces import DAO
+from backend.dao.memory_dao import Memory
+from backend.dao.sqlite_dao import Sqlite, SqliteConfig
+from benchmarks.common import (
+    compare_reports,
+    latency_stats,
+    metadata,
+    print_table,
+    random_task,
+    save_report,
+)
+
+REPORT_COLUMNS = ["dao", "rows", "search", "matches", "mean_ms", "p50_ms", "p99_ms"]
+
+VOCABULARY_SIZE = 5000
+
+
+def vocabulary(size: int) -> list[str]:
+    """Return distinct made-up words, the first ones being the most frequent."""
+    return [f"word{number}x" for number in range(size)]
+
+
+def random_text(rng: random.Random, words: list[str], weights: list[float], count: int):
+    """Return a text of random words drawn with the given weights."""
+    return " ".join(rng.choices(words, weights, k=count))
+
+
+def populate_texts(dao: DAO, size: int, seed: int, batch_size: int = 10000):
+    """Add random tasks with titles and descriptions made of words of the vocabulary."""
+
+    rng = random.Random(seed)
+    words = vocabulary(VOCABULARY_SIZE)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    for start in range(0, size, batch_size):
+        tasks = []
+        for number in range(start, min(size, start + batch_size)):
+            task = random_task(rng, number)
+            task["title"] = random_text(rng, words, weights, rng.randint(2, 6))
+            if rng.random() < 0.7:
+                task["description"] = random_text(
+                    rng, words, weights, rng.randint(5, 30)
+                )
+            tasks.append(task)
+        dao.add_tasks(tasks)
+
+
+def searches(dao: DAO, first: int) -> dict[str, Callable[[], int]]:
+    """Return the measured searches, indexed by name, returning the number of matches."""
+
+    words = vocabulary(VOCABULARY_SIZE)
+    rare, common = words[-1], words[0]
+
+    def scan() -> int:
+        # Search on the client, as before search_tasks
+        return sum(
+            1
+            for task in dao.get_all_tasks()
+            if rare in task.title or rare in (task.description or "")
+        )
+
+    return {
+        "rare_word": lambda: len(dao.search_tasks(rare, first=first)),
+        "common_word": lambda: len(dao.search_tasks(common, first=first)),
+        "three_words": lambda: len(
+            dao.search_tasks(f"{words[10]} {words[100]} {words[1000]}", first=first)
+        ),
+        "scan_rare_word": scan,
+    }
+
+
+def create_dao(kind: str, directory: str, size: int) -> DAO:
+    """Return an empty DAO of the given kind."""
+
+    if kind == "memory":
+        return Memory()
+    if kind == "sqlite":
+        return Sqlite(SqliteConfig(path=os.path.join(directory, f"search-{size}.db")))
+    raise ValueError(f"Unknown DAO '{kind}'")
+
+
+def main(argv: Optional[list[str]] = None):
+    """Entry point of the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    subparsers = parser.add_subparsers(dest="command")
+    compare = subparsers.add_parser("compare", help="Compare two saved runs")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--dao", default="memory,sqlite")
+    parser.add_argument("--first", type=int, default=20, help="Size of the pages")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        compare_reports(args.baseline, args.candidate, ["dao", "rows", "search"])
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in args.dao.split(","):
+            for size in [int(size) for size in args.sizes.split(",")]:
+                dao = create_dao(kind, directory, size)
+                populate_texts(dao, size, args.seed)
+                for name, function in searches(dao, args.first).items():
+                    matches = function()
+                    # The scan is much slower: fewer runs are enough
+                    repeat = (
+                        max(1, args.repeat // 10)
+                        if name.startswith("scan")
+                        else args.repeat
+                    )
+                    latencies = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        function()
+                        latencies.append(time.perf_counter() - start)
+                    stats = latency_stats(latencies)
+                    results.append(
+                        {
+                            "dao": kind,
+                            "rows": size,
+                            "search": name,
+                            "matches": matches,
+                            "mean_ms": stats["mean_ms"],
+                            "p50_ms": stats["p50_ms"],
+                            "p99_ms": stats["p99_ms"],
+                        }
+                    )
+                close = getattr(dao, "close", None)
+                if close is not None:
+                    close()
+
+    print_table(results, REPORT_COLUMNS)
+    if args.output:
+        meta = metadata({"benchmark": "search", "arguments": vars(args)})
+        save_report(args.output, meta, results)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Tests of the bulk import of the exported files"""
+
+import datetime
+import unittest
+from backend.dao.interfaces import TaskOutput
+from backend.dao.memory_dao import Memory
+from backend.services.bulk_import import ImportFormat, import_tasks
+from backend.services.export import format_csv, format_ndjson
+
+
+def _exported_task() -> TaskOutput:
+    # As returned by the MySQL DAO, whose dates are datetimes
+    return TaskOutput(
+        id=7,
+        title="Dated task",
+        description="Exported from MySQL",
+        date=datetime.datetime(2024, 1, 2),
+        start_time=datetime.time(9, 30),
+        end_time=datetime.time(10, 45),
+        goal="Work",
+        status="DONE",
+    )
+
+
+class ExportImportTest(unittest.TestCase):
+    """The files written by /export can be imported back."""
+
+    def assert_imported(self, dao: Memory):
+        (task,) = dao.get_all_tasks()
+        self.assertEqual(task.title, "Dated task")
+        self.assertEqual(task.description, "Exported from MySQL")
+        self.assertEqual(task.date, datetime.date(2024, 1, 2))
+        self.assertEqual(task.start_time, datetime.time(9, 30))
+        self.assertEqual(task.end_time, datetime.time(10, 45))
+        self.assertEqual(task.goal, "Work")
+        self.assertEqual(task.status, "DONE")
+
+    def test_ndjson_with_datetime_date(self):
+        exported = format_ndjson([_exported_task()])
+        self.assertIn('"dateTimestamp": "2024-01-02"', exported)
+
+        dao = Memory()
+        report = import_tasks(dao, exported.splitlines(), ImportFormat.NDJSON)
+        self.assertEqual((report.imported, report.rejected), (1, 0))
+        self.assert_imported(dao)
+
+    def test_csv_with_datetime_date(self):
+        exported = format_csv([_exported_task()], header=True)
+
+        dao = Memory()
+        report = import_tasks(dao, exported.splitlines(keepends=True), ImportFormat.CSV)
+        self.assertEqual((report.imported, report.rejected), (1, 0))
+        self.assert_imported(dao)
+
+    def test_date_with_midnight_time(self):
+        # Written by the exports of older versions
+        line = (
+            '{"id": 7, "title": "Dated task", "description": "Exported from MySQL", '
+            '"dateTimestamp": "2024-01-02T00:00:00", "startTimestamp": "09:30:00", '
+            '"endTimestamp": "10:45:00", "goal": "Work", "status": "DONE"}'
+        )
+
+        dao = Memory()
+        report = import_tasks(dao, [line], ImportFormat.NDJSON)
+        self.assertEqual((report.imported, report.rejected), (1, 0))
+        self.assert_imported(dao)
+
+
+class CsvImportTest(unittest.TestCase):
+    """The CSV records are split as by the csv module."""
+
+    HEADER = "title,description,status\n"
+
+    def import_csv(self, text: str):
+        dao = Memory()
+        report = import_tasks(
+            dao, (self.HEADER + text).splitlines(keepends=True), ImportFormat.CSV
+        )
+        return dao, report
+
+    def test_quote_in_unquoted_field(self):
+        dao, report = self.import_csv('Monitor,5" screen,OPEN\nCable,2 m,DONE\n')
+        self.assertEqual((report.imported, report.rejected), (2, 0))
+        titles = [(task.title, task.description) for task in dao.get_all_tasks()]
+        self.assertEqual(titles, [("Monitor", '5" screen'), ("Cable", "2 m")])
+
+    def test_quoted_line_break(self):
+        dao, report = self.import_csv(
+            'Report,"First line\nSecond ""quoted"" line",OPEN\nNext,,DONE\n'
+        )
+        self.assertEqual((report.imported, report.rejected), (2, 0))
+        self.assertEqual(
+            dao.get_all_tasks()[0].description, 'First line\nSecond "quoted" line'
+        )
+
+    def test_unterminated_quoted_field(self):
+        _, report = self.import_csv('Good,,OPEN\nBad,"Never closed,OPEN\nMore,,OPEN\n')
+        self.assertEqual((report.imported, report.rejected), (1, 1))
+        self.assertEqual(report.rejected_rows[0].line, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests of the DAO decorator caching the reads"""
+
+import unittest
+from backend.dao.caching_dao import CachingDAO
+from backend.dao.memory_dao import Memory
+
+
+class InterleavingMemory(Memory):
+    """Memory DAO running a callback inside the first update, after writing the task and
+    before returning it, as if another update had been interleaved."""
+
+    def __init__(self):
+        super().__init__()
+        self.interleaved = None
+
+    def update_task(self, task_id, new_fields, fields=None):
+        updated_task = super().update_task(task_id, new_fields, fields)
+        if self.interleaved is not None:
+            interleaved, self.interleaved = self.interleaved, None
+            interleaved()
+        return updated_task
+
+
+class CachingDAOTest(unittest.TestCase):
+    """The cached tasks are those of the wrapped DAO."""
+
+    def setUp(self):
+        self.memory = InterleavingMemory()
+        self.dao = CachingDAO(self.memory)
+        self.task_id = self.dao.add_task({"title": "Task", "status": "OPEN"}).id
+
+    def test_interleaved_updates(self):
+        self.memory.interleaved = lambda: self.dao.update_task(
+            self.task_id, {"title": "Second"}
+        )
+        stale = self.dao.update_task(self.task_id, {"title": "First"})
+        self.assertEqual(stale.title, "First")
+
+        self.assertEqual(self.dao.get_task_by_id(self.task_id).title, "Second")
+        self.assertEqual(self.dao.get_all_tasks()[0].title, "Second")
+
+    def test_update_invalidates_cached_task(self):
+        self.assertEqual(self.dao.get_task_by_id(self.task_id).title, "Task")
+        self.dao.update_task(self.task_id, {"title": "Updated"}, fields=["title"])
+        self.assertEqual(self.dao.get_task_by_id(self.task_id).title, "Updated")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""Tests of the publish/subscribe of the changes of the tasks"""
+
+import unittest
+from backend.dao.interfaces import EVENT_REMOVED, TaskEvent, TaskOutput
+from backend.services.events import EventBroker, SubscriberTooSlowError
+
+
+def _removed(task_id: int) -> list[TaskEvent]:
+    return [TaskEvent(EVENT_REMOVED, TaskOutput(task_id), ())]
+
+
+class EventBrokerTest(unittest.IsolatedAsyncioTestCase):
+    """The subscribers receive the events published after they subscribed."""
+
+    async def test_events_published_before_first_iteration(self):
+        broker = EventBroker()
+        subscription = broker.subscribe()
+        self.assertEqual(broker.subscribers, 1)
+
+        broker.publish(_removed(1))
+        self.assertEqual(await anext(subscription), _removed(1))
+
+        await subscription.aclose()
+        self.assertEqual(broker.subscribers, 0)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(subscription)
+
+    async def test_slow_subscriber(self):
+        broker = EventBroker(max_pending=2)
+        subscription = broker.subscribe()
+        for task_id in range(3):
+            broker.publish(_removed(task_id))
+
+        self.assertEqual(broker.subscribers, 0)
+        with self.assertRaises(SubscriberTooSlowError):
+            await anext(subscription)
+
+
+if __name__ == "__main__":
+    unittest.main()
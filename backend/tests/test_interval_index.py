@@ -0,0 +1,60 @@
+"""Tests of the index of the time spans of the tasks, against a scan of all the spans"""
+
+import random
+import unittest
+from backend.dao.interval_index import IntervalIndex
+
+
+def _overlapping(spans: dict[int, tuple[int, int]], start: int, end: int) -> list[int]:
+    if start == end:
+        # An empty span overlaps the intervals strictly containing it
+        found = [
+            task_id for task_id, (low, high) in spans.items() if low < start < high
+        ]
+    else:
+        found = [
+            task_id
+            for task_id, (low, high) in spans.items()
+            if low < end and start < high
+        ]
+    return sorted(found, key=lambda task_id: (spans[task_id][0], task_id))
+
+
+class IntervalIndexTest(unittest.TestCase):
+    """The index returns the same tasks as a scan, in the same order."""
+
+    def test_against_scan(self):
+        rnd = random.Random(5)
+        index = IntervalIndex(seed=1)
+        spans: dict[int, tuple[int, int]] = {}
+        for step in range(2000):
+            if spans and rnd.random() < 0.3:
+                task_id = rnd.choice(list(spans))
+                index.remove(task_id)
+                del spans[task_id]
+            else:
+                start = rnd.randrange(100)
+                end = start + rnd.choice([0, 1, 5, 30])
+                index.add(step, start, end)
+                spans[step] = (start, end)
+            self.assertEqual(len(index), len(spans))
+
+            start = rnd.randrange(-5, 140)
+            end = start + rnd.choice([0, 1, 10, 50])
+            self.assertEqual(
+                index.overlapping(start, end), _overlapping(spans, start, end)
+            )
+
+    def test_invalid_span(self):
+        with self.assertRaises(ValueError):
+            IntervalIndex().add(1, 10, 9)
+
+    def test_remove_missing(self):
+        index = IntervalIndex()
+        index.add(1, 0, 10)
+        index.remove(2)
+        self.assertEqual(index.overlapping(0, 10), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests of the MySQL DAO, run only if a server is configured by the environment variables:
+MYSQL_TEST_PASSWORD, and optionally MYSQL_TEST_HOST and MYSQL_TEST_PORT. The table
+tasks_test is created if missing and emptied."""
+
+import datetime
+import os
+import unittest
+
+PASSWORD = os.environ.get("MYSQL_TEST_PASSWORD")
+
+
+@unittest.skipIf(PASSWORD is None, "No MySQL server configured")
+class MysqlTest(unittest.TestCase):
+    """Behaviour of the DAO on a real server."""
+
+    def setUp(self):
+        # Imported here so that the other tests do not need the MySQL connector
+        # pylint: disable=import-outside-toplevel
+        from backend.dao.mysql_dao import Mysql, MysqlConfig
+
+        config = MysqlConfig(
+            password=str(PASSWORD),
+            host=os.environ.get("MYSQL_TEST_HOST", "localhost"),
+            port=int(os.environ.get("MYSQL_TEST_PORT", "3306")),
+            pool_max_size=2,
+        )
+        config.table = "tasks_test"
+        self.dao = Mysql(config)
+        self.dao.migrate()
+        self.pool = self.dao._pool  # pylint: disable=protected-access
+        connection = self.pool.acquire()
+        try:
+            self.execute(connection, f"DELETE FROM {config.table}")
+        finally:
+            self.pool.release(connection)
+
+    def tearDown(self):
+        self.dao.close()
+
+    @staticmethod
+    def execute(connection, statement: str) -> list[tuple]:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(statement)
+            return cursor.fetchall() if cursor.with_rows else []
+        finally:
+            cursor.close()
+
+    def count(self, connection) -> int:
+        ((count,),) = self.execute(connection, "SELECT COUNT(*) FROM tasks_test")
+        return count
+
+    def test_migrations_applied_once(self):
+        # pylint: disable=import-outside-toplevel
+        from backend.dao.mysql_migrations import SCHEMA_VERSION
+
+        self.assertEqual(self.dao.migrate(), [])
+        self.assertEqual(self.dao.schema_version(), SCHEMA_VERSION)
+
+    def test_write_visible_to_other_connection(self):
+        reader = self.pool.acquire()
+        writer = self.pool.acquire()
+        before = self.count(reader)
+        self.pool.release(reader)
+
+        self.execute(
+            writer, "INSERT INTO tasks_test (title, status) VALUES ('Task', 'OPEN')"
+        )
+        writer.commit()
+        self.pool.release(writer)
+
+        connections = [self.pool.acquire(), self.pool.acquire()]
+        try:
+            self.assertEqual(
+                [self.count(connection) for connection in connections],
+                [before + 1, before + 1],
+            )
+        finally:
+            for connection in connections:
+                self.pool.release(connection)
+
+    def test_written_tasks_as_read(self):
+        new_task = {
+            "title": "Task",
+            "status": "OPEN",
+            "date": datetime.date(2024, 1, 2),
+        }
+        added_task = self.dao.add_task(new_task)
+        self.assertEqual(added_task, self.dao.get_task_by_id(added_task.id))
+
+        updated_task = self.dao.update_task(
+            added_task.id, {"date": datetime.date(2024, 1, 3)}, fields=["date"]
+        )
+        self.assertEqual(updated_task.date, datetime.datetime(2024, 1, 3))
+
+        (result,) = self.dao.add_tasks([new_task])
+        self.assertEqual(result["task"], self.dao.get_task_by_id(result["task"].id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""Tests of the pool of MySQL connections, with connections simulated in memory"""
+
+import unittest
+import mysql.connector.errors
+from backend.dao.mysql_pool import ConnectionPool
+
+
+class FakeDatabase:
+    """Committed value of a single row."""
+
+    def __init__(self):
+        self.value = 0
+
+
+class FakeConnection:
+    """Connection reading with the snapshots of the REPEATABLE READ transactions: without
+    autocommit, the first read starts a transaction whose reads all see the same snapshot.
+    """
+
+    def __init__(self, database: FakeDatabase, autocommit: bool = False):
+        self.database = database
+        self.autocommit = autocommit
+        self.in_transaction = False
+        self.snapshot = None
+        self.healthy = True
+        self.closed = False
+
+    def read(self) -> int:
+        if self.autocommit:
+            return self.database.value
+        if not self.in_transaction:
+            self.in_transaction = True
+            self.snapshot = self.database.value
+        return self.snapshot
+
+    def write(self, value: int):
+        self.database.value = value
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def ping(self, reconnect: bool = False):
+        # pylint: disable=unused-argument
+        if not self.healthy:
+            raise mysql.connector.errors.InterfaceError("Lost connection")
+
+    def close(self):
+        self.closed = True
+
+
+class PoolVisibilityTest(unittest.TestCase):
+    """The reads on a pooled connection see the commits made through the others."""
+
+    def test_write_visible_to_other_connection(self):
+        database = FakeDatabase()
+        pool = ConnectionPool(lambda: FakeConnection(database), max_size=2)
+
+        reader = pool.acquire()
+        writer = pool.acquire()
+        self.assertIsNot(reader, writer)
+        self.assertEqual(reader.read(), 0)
+        pool.release(reader)
+
+        writer.write(1)
+        writer.commit()
+        pool.release(writer)
+
+        # Both connections are checked out again, the reader among them
+        connections = [pool.acquire(), pool.acquire()]
+        self.assertIn(reader, connections)
+        self.assertEqual([connection.read() for connection in connections], [1, 1])
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    """Checkouts, timeouts and replacements of the connections."""
+
+    def setUp(self):
+        self.database = FakeDatabase()
+        self.opened: list[FakeConnection] = []
+
+    def factory(self) -> FakeConnection:
+        connection = FakeConnection(self.database, autocommit=True)
+        self.opened.append(connection)
+        return connection
+
+    def test_reuse_released_connection(self):
+        pool = ConnectionPool(self.factory, max_size=2)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(len(self.opened), 1)
+
+        stats = pool.stats()
+        self.assertEqual((stats.size, stats.idle, stats.in_use), (1, 0, 1))
+        self.assertEqual(stats.checkouts, 2)
+
+    def test_fill(self):
+        pool = ConnectionPool(self.factory, min_size=2, max_size=3)
+        pool.fill()
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.stats().idle, 2)
+
+    def test_timeout(self):
+        pool = ConnectionPool(self.factory, max_size=1, timeout=0.05)
+        pool.acquire()
+        with self.assertRaises(mysql.connector.errors.PoolError):
+            pool.acquire()
+        self.assertEqual(pool.stats().timeouts, 1)
+
+    def test_discard(self):
+        pool = ConnectionPool(self.factory, max_size=1, timeout=0.05)
+        connection = pool.acquire()
+        pool.release(connection, discard=True)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats().size, 0)
+
+        # The slot of the discarded connection is free again
+        self.assertIsNot(pool.acquire(), connection)
+        self.assertEqual(len(self.opened), 2)
+
+    def test_broken_connection_replaced(self):
+        pool = ConnectionPool(self.factory, max_size=1)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.healthy = False
+
+        with self.assertLogs(level="WARNING"):
+            replacement = pool.acquire()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats().replaced, 1)
+
+    def test_rollback_on_error(self):
+        pool = ConnectionPool(lambda: FakeConnection(self.database), max_size=1)
+        with self.assertRaises(RuntimeError):
+            with pool.connection() as connection:
+                connection.read()
+                raise RuntimeError("Failed request")
+        self.assertFalse(connection.in_transaction)
+        self.assertIs(pool.acquire(), connection)
+
+    def test_close(self):
+        pool = ConnectionPool(self.factory, max_size=2)
+        connection = pool.acquire()
+        pool.release(connection)
+        pool.close()
+        self.assertTrue(connection.closed)
+        with self.assertRaises(mysql.connector.errors.PoolError):
+            pool.acquire()
+
+
+if __name__ == "__main__":
+    unittest.main()
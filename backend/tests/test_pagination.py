@@ -0,0 +1,141 @@
+"""Tests of the keyset pagination of DAO.get_tasks, against the sorted list of all the tasks"""
+
+import datetime
+import os
+import random
+import tempfile
+import unittest
+from typing import Optional
+from backend.dao.interfaces import (
+    DAO,
+    ORDER_BY_DATE,
+    ORDER_BY_ID,
+    TaskCursor,
+    TaskFilter,
+    TaskOutput,
+)
+from backend.dao.memory_dao import Memory
+from backend.dao.sqlite_dao import Sqlite, SqliteConfig
+
+FILTERS: list[TaskFilter] = [
+    {},
+    {"status": "OPEN"},
+    {"goal": "Work", "status": "DONE"},
+    {"date_from": datetime.date(2024, 1, 3), "date_to": datetime.date(2024, 1, 6)},
+    {"goal": "Home", "date_from": datetime.date(2024, 1, 5)},
+]
+
+
+def _matches(task: TaskOutput, filters: TaskFilter) -> bool:
+    if "status" in filters and task.status != filters["status"]:
+        return False
+    if "goal" in filters and task.goal != filters["goal"]:
+        return False
+    if "date_from" in filters and (
+        task.date is None or task.date < filters["date_from"]
+    ):
+        return False
+    if "date_to" in filters and (task.date is None or task.date > filters["date_to"]):
+        return False
+    return True
+
+
+def _sorted(
+    tasks: list[TaskOutput], order_by: str, descending: bool
+) -> list[TaskOutput]:
+    # In ascending order, the tasks without date come first
+    if order_by == ORDER_BY_DATE:
+        return sorted(
+            tasks,
+            key=lambda task: (
+                task.date is not None,
+                task.date or datetime.date.min,
+                task.id,
+            ),
+            reverse=descending,
+        )
+    return sorted(tasks, key=lambda task: task.id, reverse=descending)
+
+
+class DAOTests:
+    """Holder of the base test case, so that it is not run by itself."""
+
+    class Pagination(unittest.TestCase):
+        """Checks of a DAO, run by the test cases of the implementations."""
+
+        dao: DAO
+
+        def add_random_tasks(self, count: int = 120):
+            rnd = random.Random(7)
+            for _ in range(count):
+                task = {
+                    "title": "Task",
+                    "status": rnd.choice(["OPEN", "PROGRESS", "DONE"]),
+                    "goal": rnd.choice([None, "Work", "Home"]),
+                }
+                if rnd.random() < 0.8:
+                    # Few distinct dates, so that the ties are broken by the id
+                    task["date"] = datetime.date(2024, 1, 1) + datetime.timedelta(
+                        days=rnd.randrange(8)
+                    )
+                self.dao.add_task(task)
+
+        def paginate(
+            self, filters: TaskFilter, order_by: str, descending: bool, page_size: int
+        ) -> list[TaskOutput]:
+            tasks: list[TaskOutput] = []
+            after: Optional[TaskCursor] = None
+            while True:
+                page = self.dao.get_tasks(
+                    filters, order_by, descending, page_size, after
+                )
+                tasks.extend(page)
+                if len(page) < page_size:
+                    return tasks
+                after = TaskCursor(id=page[-1].id, date=page[-1].date)
+
+        def test_pages_against_sorted_tasks(self):
+            self.add_random_tasks()
+            all_tasks = self.dao.get_all_tasks()
+            for filters in FILTERS:
+                for order_by in (ORDER_BY_ID, ORDER_BY_DATE):
+                    for descending in (False, True):
+                        expected = _sorted(
+                            [task for task in all_tasks if _matches(task, filters)],
+                            order_by,
+                            descending,
+                        )
+                        for page_size in (1, 7, 1000):
+                            with self.subTest(
+                                filters=filters,
+                                order_by=order_by,
+                                descending=descending,
+                                page_size=page_size,
+                            ):
+                                self.assertEqual(
+                                    self.paginate(
+                                        filters, order_by, descending, page_size
+                                    ),
+                                    expected,
+                                )
+
+
+class MemoryPaginationTest(DAOTests.Pagination):
+    """Pagination of the memory DAO."""
+
+    def setUp(self):
+        self.dao = Memory()
+
+
+class SqlitePaginationTest(DAOTests.Pagination):
+    """Pagination of the SQLite DAO."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.dao = Sqlite(SqliteConfig(path=os.path.join(directory.name, "tasks.db")))
+        self.addCleanup(self.dao.close)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests of the HTTP caching of the GraphQL queries"""
+
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.dao.memory_dao import Memory
+from backend.dao.notifying_dao import NotifyingDAO
+from backend.dao.threaded_dao import ThreadedDAO
+from backend.services.graphql import create_graphql_app
+from backend.services.response_cache import DataVersion, ResponseCache
+
+QUERY = {"query": "{queryTask{id title}}"}
+ADD = {"query": 'mutation{add(title:"Task"){id}}'}
+
+
+class CountingMemory(Memory):
+    """Memory DAO counting the reads of all the tasks."""
+
+    reads = 0
+
+    def get_all_tasks(self, fields=None):
+        self.reads += 1
+        return super().get_all_tasks(fields)
+
+
+class ETagTest(unittest.TestCase):
+    """The query responses are tagged with the version of the data."""
+
+    def setUp(self):
+        self.memory = CountingMemory()
+        version = DataVersion()
+        dao = NotifyingDAO(ThreadedDAO(self.memory, 1), listeners=[version.bump])
+        self.router = create_graphql_app(dao, data_version=version)
+        app = FastAPI()
+        app.include_router(self.router, prefix="/query")
+        self.client = TestClient(app)
+        self.client.post("/query", json=ADD)
+
+    def test_not_modified(self):
+        response = self.client.post("/query", json=QUERY)
+        etag = response.headers["etag"]
+        self.assertEqual(response.json()["data"]["queryTask"][0]["title"], "Task")
+
+        response = self.client.post(
+            "/query", json=QUERY, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.memory.reads, 1)
+        self.assertEqual(self.router.response_cache.stats().not_modified, 1)
+
+    def test_cached_response(self):
+        first = self.client.post("/query", json=QUERY)
+        second = self.client.post("/query", json=QUERY)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.headers["etag"], first.headers["etag"])
+        self.assertEqual(self.memory.reads, 1)
+
+    def test_mutation_changes_etag(self):
+        etag = self.client.post("/query", json=QUERY).headers["etag"]
+        self.client.post("/query", json=ADD)
+
+        response = self.client.post(
+            "/query", json=QUERY, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assertEqual(len(response.json()["data"]["queryTask"]), 2)
+        self.assertEqual(self.memory.reads, 2)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """The cached responses are those of the current version."""
+
+    def test_new_version_empties_cache(self):
+        cache = ResponseCache()
+        key = ("{queryTask{id}}", "{}", None)
+        cache.put(key, 1, b"response")
+        self.assertEqual(cache.get(key, 1), b"response")
+        self.assertIsNone(cache.get(key, 2))
+        self.assertEqual(cache.stats().invalidations, 1)
+
+    def test_bounded_size(self):
+        cache = ResponseCache(max_size=2, max_body_size=8)
+        for query in ("a", "b", "c"):
+            cache.put((query, "{}", None), 1, b"response")
+        cache.put(("large", "{}", None), 1, b"too large response")
+        self.assertEqual(cache.stats().size, 2)
+        self.assertIsNone(cache.get(("a", "{}", None), 1))
+        self.assertIsNone(cache.get(("large", "{}", None), 1))
+
+
+if __name__ == "__main__":
+    unittest.main()